@@ -0,0 +1,257 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+"""Benchmarks of interface detection on router snapshots from `tests/tests_roots`
+
+Run all benchmarks and compare them with the committed baseline:
+
+```
+python -m benchmarks.bench --output results.json
+```
+
+Times are the best of `--repeat` runs in milliseconds, which is the least affected by other processes.
+Times are too noisy to fail on them by default (e.g. when the machine is busy), they are compared with
+the baseline only with `--check-times`, relatively to `calibration`, time of simple workload (reading files
+of the snapshot) measured together with the benchmark, so results from slower machine are comparable.
+Number of file operations (see `benchmarks/syscalls.py`)
+and peak of allocated memory are measured in separate runs, so the instrumentation doesn't affect times.
+Vendor database is mocked (same as in tests), so results don't depend on installed `pci.ids`.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+import typing
+
+import turrishw
+import turrishw.identity
+import turrishw.sysfs
+import turrishw.turrishw
+import turrishw.utils
+
+from .syscalls import SyscallCounter
+
+ROOTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "tests", "tests_roots")
+BASELINE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "baseline.json")
+
+DEFAULT_REPEAT = 7
+DEFAULT_MARGIN = 0.3  # 30 %
+# differences smaller than this are always just a noise
+TIME_SLACK_MS = 1.0
+MEMORY_SLACK = 16 * 1024
+
+CALIBRATION_LOOPS = 20
+FILTER_TYPES = ["eth"]
+# metrics compared with baseline, times only on request
+COMPARED = ("file_operations", "memory_peak")
+COMPARED_TIMES = ("get_model", "get_ifaces", "get_ifaces_filtered")
+
+Result = typing.Dict[str, typing.Any]
+
+
+def roots() -> typing.List[str]:
+    return sorted(e[: -len(".tar.gz")] for e in os.listdir(ROOTS_DIR) if e.endswith(".tar.gz"))
+
+
+def extract(root: str, path: str) -> str:
+    with tarfile.open(os.path.join(ROOTS_DIR, f"{root}.tar.gz")) as tar:
+        tar.extractall(path=path)
+    return path
+
+
+def _reset():
+    """Forget everything cached between calls, so every run is cold"""
+    turrishw.configure_cache()
+    turrishw.invalidate()
+    turrishw.identity.forget()
+
+
+def _calibration_workload(root_path: str):
+    model = os.path.join(root_path, "sys/firmware/devicetree/base/model")
+    for _ in range(CALIBRATION_LOOPS):
+        os.listdir(os.path.join(root_path, "sys/class/net"))
+        for _ in range(10):
+            fd = os.open(model, os.O_RDONLY)
+            os.read(fd, 4096)
+            os.close(fd)
+
+
+def _run_phases() -> typing.Dict[str, float]:
+    """Run detection split into phases, return time of every phase (in seconds)"""
+    times = {}
+    start = time.perf_counter()
+    turrishw.get_model()
+    times["model"] = time.perf_counter() - start
+
+    with turrishw.sysfs.session():
+        start = time.perf_counter()
+        ifaces = turrishw.turrishw._classify_interfaces()
+        times["classify"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        turrishw.utils.collect_attributes(ifaces)
+        times["attributes"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    turrishw.turrishw._output(turrishw.turrishw._make_table(ifaces, None), False)
+    times["output"] = time.perf_counter() - start
+    return times
+
+
+def _timed(func: typing.Callable[[], typing.Any]) -> float:
+    _reset()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def _no_gc():
+    # same as `timeit`, garbage collection depends on the whole process (e.g. pytest), not on the measured code
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _best_ms(values: typing.List[float]) -> float:
+    return round(min(values) * 1000, 3)
+
+
+def measure(root_path: str, repeat: int = DEFAULT_REPEAT) -> Result:
+    """Measure detection on extracted snapshot"""
+    saved = turrishw.utils.TURRISHW_FILE_ROOT, turrishw.utils.get_vendor_from_db
+    turrishw.utils.TURRISHW_FILE_ROOT = root_path
+    turrishw.utils.get_vendor_from_db = lambda vendor: vendor
+    # snapshots contain interfaces which turrishw warns about, don't measure logging
+    logging.disable(logging.WARNING)
+    try:
+        # warm up: import board module, compile regular expressions, ...
+        turrishw.get_ifaces()
+
+        calls = {
+            "get_model": lambda: turrishw.get_model(),
+            "get_ifaces": lambda: turrishw.get_ifaces(),
+            "get_ifaces_filtered": lambda: turrishw.get_ifaces(filter_types=FILTER_TYPES),
+        }
+        phases: typing.Dict[str, typing.List[float]] = {}
+        with _no_gc():
+            result: Result = {name: _best_ms([_timed(func) for _ in range(repeat)]) for name, func in calls.items()}
+            result["calibration"] = _best_ms([_timed(lambda: _calibration_workload(root_path)) for _ in range(repeat)])
+            for _ in range(repeat):
+                _reset()
+                for phase, value in _run_phases().items():
+                    phases.setdefault(phase, []).append(value)
+        result["phases"] = {phase: _best_ms(values) for phase, values in phases.items()}
+
+        _reset()
+        with SyscallCounter() as counter:
+            result["interfaces"] = len(turrishw.get_ifaces())
+        result["file_operations"] = counter.total
+        result["opens"] = counter.calls["open"] + counter.calls["os.open"]
+
+        _reset()
+        tracemalloc.start()
+        try:
+            turrishw.get_ifaces()
+            result["memory_peak"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    finally:
+        turrishw.utils.TURRISHW_FILE_ROOT, turrishw.utils.get_vendor_from_db = saved
+        logging.disable(logging.NOTSET)
+        _reset()
+
+    return result
+
+
+def compare(result: Result, baseline: Result, margin: float = DEFAULT_MARGIN, times: bool = False) -> typing.List[str]:
+    """Return descriptions of metrics which are worse than the baseline by more than `margin`
+
+    times: Compare also times (see `COMPARED_TIMES`), not only file operations and memory.
+    """
+    regressions = []
+    for metric in COMPARED_TIMES + COMPARED if times else COMPARED:
+        if metric not in baseline or metric not in result:
+            continue
+        if metric.startswith("get_"):
+            # scale baseline to the speed of this machine
+            scale = result["calibration"] / baseline["calibration"] if baseline.get("calibration") else 1.0
+            limit = baseline[metric] * scale * (1 + margin) + TIME_SLACK_MS
+        else:
+            slack = MEMORY_SLACK if metric == "memory_peak" else 0
+            limit = baseline[metric] * (1 + margin) + slack
+        if result[metric] > limit:
+            regressions.append(f"{metric}: {result[metric]} > {baseline[metric]} (limit {limit:.3f})")
+    return regressions
+
+
+def load_baseline(path: str = BASELINE) -> typing.Dict[str, Result]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save(results: typing.Dict[str, Result], path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark turrishw on router snapshots.")
+    parser.add_argument("roots", nargs="*", help="snapshots to use (all by default)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="number of timed runs")
+    parser.add_argument("--output", help="store results as JSON")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline to compare results with")
+    parser.add_argument("--margin", type=float, default=DEFAULT_MARGIN, help="allowed regression (0.3 = 30 %%)")
+    parser.add_argument("--check-times", action="store_true", help="fail also when times regress")
+    parser.add_argument("--update-baseline", action="store_true", help="store results as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    results: typing.Dict[str, Result] = {}
+    failed = False
+    for root in args.roots or roots():
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results[root] = measure(extract(root, tmpdir), args.repeat)
+        regressions = compare(results[root], baseline.get(root, {}), args.margin, args.check_times)
+        failed = failed or bool(regressions)
+        print(f"{root}: {json.dumps(results[root], sort_keys=True)}")
+        for regression in regressions:
+            print(f"  REGRESSION {regression}")
+
+    if args.output:
+        save(results, args.output)
+    if args.update_baseline:
+        save({**baseline, **results}, args.baseline)
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import pytest
+
+from . import bench
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("turrishw benchmarks")
+    group.addoption("--bench-repeat", type=int, default=bench.DEFAULT_REPEAT, help="number of timed runs")
+    group.addoption("--bench-margin", type=float, default=bench.DEFAULT_MARGIN, help="allowed regression")
+    group.addoption("--bench-output", default=None, help="store results as JSON")
+    group.addoption("--bench-check-times", action="store_true", help="fail also when times regress")
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    results = {}
+    yield results
+    output = request.config.getoption("--bench-output")
+    if output and results:
+        bench.save(results, output)
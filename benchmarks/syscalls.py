@@ -0,0 +1,70 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+"""Estimate number of filesystem syscalls made by Python code
+
+Calls of `os` functions and `open()` are counted and weighted by the number of syscalls they make on Linux:
+  - `open()` of text file and `readline()`: openat, fstat, ioctl, lseek, read, close
+  - `os.scandir()`/`os.listdir()`: openat, fstat, getdents64 (twice), close
+"""
+
+import builtins
+import collections
+import io
+import os
+
+WEIGHTS = {
+    "open": 6,
+    "os.open": 1,
+    "os.read": 1,
+    "os.close": 1,
+    "os.stat": 1,
+    "os.lstat": 1,
+    "os.readlink": 1,
+    "os.scandir": 5,
+    "os.listdir": 5,
+}
+
+
+class SyscallCounter:
+    def __init__(self):
+        self.calls = collections.Counter()
+        self._saved = []
+
+    @property
+    def total(self) -> int:
+        return sum(WEIGHTS[name] * count for name, count in self.calls.items())
+
+    def _wrap(self, module, attr: str, name: str):
+        orig = getattr(module, attr)
+
+        def wrapper(*args, **kwargs):
+            self.calls[name] += 1
+            return orig(*args, **kwargs)
+
+        self._saved.append((module, attr, orig))
+        setattr(module, attr, wrapper)
+
+    def __enter__(self):
+        self._wrap(builtins, "open", "open")
+        self._wrap(io, "open", "open")
+        for name in WEIGHTS:
+            if name.startswith("os."):
+                self._wrap(os, name[3:], name)
+        return self
+
+    def __exit__(self, *exc):
+        for module, attr, orig in reversed(self._saved):
+            setattr(module, attr, orig)
+        self._saved.clear()
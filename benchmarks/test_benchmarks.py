@@ -0,0 +1,34 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import pytest
+
+from . import bench
+
+BASELINE = bench.load_baseline()
+
+
+@pytest.mark.parametrize("root", bench.roots())
+def test_benchmark(root, tmp_path, request, bench_results):
+    result = bench.measure(bench.extract(root, str(tmp_path)), request.config.getoption("--bench-repeat"))
+    bench_results[root] = result
+
+    assert result["interfaces"] > 0
+    regressions = bench.compare(
+        result,
+        BASELINE.get(root, {}),
+        request.config.getoption("--bench-margin"),
+        request.config.getoption("--bench-check-times"),
+    )
+    assert not regressions, f"{root} regressed against baseline: {regressions}"
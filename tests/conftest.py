@@ -0,0 +1,72 @@
+# Copyright 2018-2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import functools
+import os
+import tarfile
+
+import pytest
+
+import turrishw
+import turrishw.fs
+import turrishw.utils
+
+
+@pytest.fixture
+def set_root(request, monkeypatch, tmpdir):
+    root = request.param
+    roots_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "tests_roots")
+    result_json = os.path.join(roots_dir, root + ".json")
+    root_tar = os.path.join(roots_dir, root + ".tar.gz")
+    tdir = str(tmpdir)
+    with tarfile.open(root_tar) as tar:
+        tar.extractall(path=tdir)
+
+    with monkeypatch.context() as m:
+        m.setattr(turrishw.utils, "TURRISHW_FILE_ROOT", tdir)
+        yield result_json
+
+
+@functools.lru_cache(maxsize=None)
+def _tar_backend(path: str) -> turrishw.fs.TarBackend:
+    # snapshots are only read, so every tarball is loaded once per test run
+    return turrishw.fs.TarBackend(path)
+
+
+@pytest.fixture
+def tar_root(request):
+    """Same as `set_root`, but the snapshot is read directly from the tarball (see `turrishw.fs.TarBackend`)
+
+    It's much faster than extracting the snapshot, use `set_root` only for tests which modify the snapshot
+    or need real files (e.g. to keep directories open).
+    """
+    root = request.param
+    roots_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "tests_roots")
+    turrishw.configure_backend(_tar_backend(os.path.join(roots_dir, root + ".tar.gz")))
+    try:
+        yield os.path.join(roots_dir, root + ".json")
+    finally:
+        turrishw.configure_backend()
+
+
+@pytest.fixture
+def mock_pci_db(monkeypatch):
+    """Mocks queries over records in file `/usr/share/hwdata/pci.ids`
+    on router."""
+
+    PCI_MAPPINGS = {"02df": "Marvell", "168c": "Qualcomm Atheros", "14c3": "MEDIATEK Corp."}
+
+    with monkeypatch.context() as m:
+        m.setattr(turrishw.utils, "get_vendor_from_db", lambda x: PCI_MAPPINGS.get(x))
+        yield m
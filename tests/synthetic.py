@@ -0,0 +1,312 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+"""Generator of synthetic `sys/` and `proc/` trees of Turris routers
+
+Tree is generated from `Board` description together with expected output of `turrishw.get_ifaces()`,
+so detection can be tested on configurations much larger than the snapshots of real routers
+(thousands of VLANs, tens of modems, ...).
+
+Only files which are read by turrishw are generated. Paths follow the real routers, see `tests_roots`.
+"""
+
+import os
+import typing
+from dataclasses import dataclass
+
+# vendor of all PCI cards, it has to be known to `mock_pci_db` fixture
+PCI_VENDOR = ("168c", "Qualcomm Atheros")
+PCI_ID = "168C:003C"
+
+MODELS = {
+    "omnia": "Turris Omnia",
+    "mox": "CZ.NIC Turris Mox Board",
+    "turris1x": "Turris 1.x",
+    "omnia_ng": "CZ.NIC Turris Omnia NG",
+}
+
+MOX_SWITCH_PORTS = {"topaz": 4, "peridot": 8}
+# Wi-Fi cards, Mox has SDIO card and the second one on PCI module
+RADIO_SLOTS = {"omnia": 3, "turris1x": 2, "omnia_ng": 5}
+
+DEVICE_TREE = "sys/firmware/devicetree/base"
+
+Expected = typing.Dict[str, typing.Dict[str, typing.Any]]
+
+
+@dataclass
+class Board:
+    """Description of synthetic router"""
+
+    model: str  # key of `MODELS`
+    vlans: int = 0  # number of VLANs on every wired port
+    modems: int = 0  # number of USB LTE modems (QMI)
+    radios: int = 0  # number of Wi-Fi cards, limited by slots of the board
+    mox_modules: typing.Tuple[str, ...] = ()  # Mox modules in order of connection, e.g. ("pci", "peridot", "sfp")
+
+    def validate(self):
+        """Raise `ValueError` when the board can't be built, e.g. it has more radios than slots"""
+        if self.model not in MODELS:
+            raise ValueError(f"unknown model {self.model}")
+        if self.mox_modules and self.model != "mox":
+            raise ValueError("only Mox has modules")
+
+        switches = sum(1 for e in self.mox_modules if e in MOX_SWITCH_PORTS)
+        radios = 1 + ("pci" in self.mox_modules) if self.model == "mox" else RADIO_SLOTS[self.model]
+        for what, count, limit in [
+            ("radios", self.radios, radios),
+            ("modems", self.modems, 0 if self.model == "omnia_ng" else 64),
+            ("switches", switches, 3),
+        ]:
+            if count > limit:
+                raise ValueError(f"{self.model} supports at most {limit} {what}, got {count}")
+
+    @property
+    def name(self) -> str:
+        modules = "".join(f"-{e}" for e in self.mox_modules)
+        return f"{self.model}{modules}-v{self.vlans}-m{self.modems}-r{self.radios}"
+
+
+class _Tree:
+    def __init__(self, root: str):
+        self.root = root
+        self.expected: Expected = {}
+        self._counter = 0
+        self._ports: typing.List[str] = []
+
+    def write(self, path: str, content: str):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def symlink(self, path: str, target: str):
+        """Create symlink with target relative to the link, same as in sysfs"""
+        path = os.path.join(self.root, path)
+        target = os.path.join(self.root, target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(target, exist_ok=True)
+        os.symlink(os.path.relpath(target, os.path.dirname(path)), path)
+
+    def netdev(
+        self,
+        name: str,
+        device: str,
+        expected: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        label: typing.Optional[str] = None,
+        of_node: typing.Optional[str] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """Add network interface to `device` (path in `sys/devices`), return its attributes
+
+        `expected` is the output of turrishw for the interface (without state, MAC address, ...),
+        `None` for interfaces which are not reported.
+        """
+        self._counter += 1
+        macaddr = f"02:00:00:00:{self._counter >> 8 & 0xFF:02x}:{self._counter & 0xFF:02x}"
+        up = self._counter % 2 == 0
+        path = f"sys/devices/{device}/net/{name}"
+
+        self.write(f"{path}/address", f"{macaddr}\n")
+        self.write(f"{path}/operstate", "up\n" if up else "down\n")
+        self.write(f"{path}/speed", "1000\n" if up else "-1\n")
+        self.symlink(f"sys/class/net/{name}", path)
+        if not device.startswith("virtual/"):
+            self.symlink(f"{path}/device", f"sys/devices/{device}")
+        if label is not None:
+            # label is null-terminated string in device tree
+            node = f"{DEVICE_TREE}/{of_node or 'ports/' + name}"
+            self.write(f"{node}/label", f"{label}\x00")
+            self.symlink(f"{path}/of_node", node)
+
+        attrs = {"state": "up" if up else "down", "macaddr": macaddr, "link_speed": 1000 if up else 0}
+        if expected is not None:
+            self.expected[name] = {"module_id": 0, **expected, **attrs}
+        return attrs
+
+    def port(self, name: str, device: str, expected: typing.Dict[str, typing.Any], **kwargs):
+        """Add wired port, it gets VLANs of the board"""
+        self.netdev(name, device, {"type": "eth", **expected}, **kwargs)
+        self._ports.append(name)
+
+    def radio(self, name: str, device: str, expected: typing.Dict[str, typing.Any], pci: bool = True):
+        slot_path = f"{device}/net/{name}".split("/", 1)[1]  # without `platform/`
+        self.netdev(name, device, {"type": "wifi", **expected, "slot_path": slot_path})
+        os.makedirs(os.path.join(self.root, f"sys/devices/{device}/net/{name}/phy80211"))
+        if pci:
+            self.write(f"sys/devices/{device}/vendor", f"0x{PCI_VENDOR[0]}\n")
+            self.write(f"sys/devices/{device}/uevent", f"DRIVER=ath10k_pci\nPCI_CLASS=28000\nPCI_ID={PCI_ID}\n")
+            self.expected[name].update(vendor=PCI_VENDOR[1], pci_id=PCI_ID)
+
+    def modem(self, name: str, usb_device: str, cdc_wdm: str, expected: typing.Dict[str, typing.Any]):
+        """Add QMI modem on USB device (e.g. `.../usb1/1-1/1-1.2`), `slot_path` has to be set in `expected`"""
+        interface = f"{usb_device}/{os.path.basename(usb_device)}:1.4"
+        self.netdev(name, interface, {"type": "wwan", **expected, "qmi_device": f"/dev/{cdc_wdm}"})
+        os.makedirs(os.path.join(self.root, f"sys/devices/{interface}/net/{name}/qmi"))
+        self.symlink(f"sys/devices/{interface}/driver", "sys/bus/usb/drivers/qmi_wwan")
+        self.symlink(f"sys/class/usbmisc/{cdc_wdm}", f"sys/devices/{interface}/usbmisc/{cdc_wdm}")
+
+    def vlans(self, count: int):
+        """Add `count` VLANs to every wired port"""
+        config = ["VLAN Dev name\t | VLAN ID", "Name-Type: VLAN_NAME_TYPE_RAW_PLUS_VID_NO_PAD"]
+        for parent in self._ports:
+            for vlan_id in range(1, count + 1):
+                name = f"{parent}.{vlan_id}"
+                parent_expected = self.expected[parent]
+                expected = {k: parent_expected[k] for k in ("type", "bus", "slot", "module_id")}
+                self.netdev(name, f"virtual/net/{name}", {**expected, "vlan_id": vlan_id})
+                self.write(f"proc/net/vlan/{name}", "")
+                config.append(f"{name:<14} | {vlan_id}  | {parent}")
+        self.write("proc/net/vlan/config", "\n".join(config) + "\n")
+
+    def virtual(self, *names: str):
+        for name in names:
+            self.netdev(name, f"virtual/net/{name}")
+
+
+def _omnia(tree: _Tree, board: Board):
+    regs = "platform/soc/soc:internal-regs"
+    for idx in range(5):
+        device = f"{regs}/f1072004.mdio/mdio_bus/f1072004.mdio-mii/f1072004.mdio-mii:10"
+        tree.port(f"lan{idx}", device, {"bus": "eth", "slot": f"LAN{idx}"}, label=f"lan{idx}")
+    tree.port("eth2", f"{regs}/f1034000.ethernet", {"bus": "eth", "slot": "WAN"})
+    # CPU ports connected to the switch
+    tree.netdev("eth0", f"{regs}/f1070000.ethernet")
+    tree.netdev("eth1", f"{regs}/f1030000.ethernet")
+
+    for idx in range(board.radios):
+        slot = idx + 1
+        device = f"platform/soc/soc:pcie/pci0000:00/0000:00:0{slot}.0/0000:0{slot}:00.0"
+        tree.radio(f"wlan{idx}", device, {"bus": "pci", "slot": str(slot)})
+
+    # modems are connected through USB hub in mPCIe slot 3
+    hub = f"{regs}/f1058000.usb/usb1/1-1"
+    for idx in range(board.modems):
+        tree.modem(
+            f"wwan{idx}",
+            f"{hub}/1-1.{idx + 1}",
+            f"cdc-wdm{board.modems - idx - 1}",  # control devices are paired in arbitrary order
+            {"bus": "pci", "slot": "3", "slot_path": f"/sys/devices/{hub}"},
+        )
+
+
+def _turris1x(tree: _Tree, board: Board):
+    soc = "platform/soc@ffe00000"
+    for idx in range(1, 6):
+        device = f"{soc}/ffe24520.mdio/mdio_bus/mdio@ffe24520/mdio@ffe24520:10"
+        tree.port(f"lan{idx}", device, {"bus": "eth", "slot": f"LAN{idx}"}, label=f"lan{idx}")
+    tree.port("eth2", f"{soc}/ffe26000.ethernet", {"bus": "eth", "slot": "WAN"})
+    tree.netdev("eth0", f"{soc}/ffe24000.ethernet")
+    tree.netdev("eth1", f"{soc}/ffe25000.ethernet")
+
+    pcie = [
+        "platform/ffe09000.pcie/pci0001:02/0001:02:00.0/0001:03:00.0",
+        "platform/ffe0a000.pcie/pci0002:04/0002:04:00.0/0002:05:00.0",
+    ]
+    for idx in range(board.radios):
+        tree.radio(f"wlan{idx}", pcie[idx], {"bus": "pci", "slot": "0"})
+
+    # modems are connected through USB hub in front USB 3.0 port of Turris 1.1
+    hub = "platform/ffe08000.pcie/pci0002:00/0002:00:00.0/0002:01:00.0/usb3/3-1"
+    for idx in range(board.modems):
+        tree.modem(
+            f"wwan{idx}",
+            f"{hub}/3-1.{idx + 1}",
+            f"cdc-wdm{board.modems - idx - 1}",
+            {"bus": "usb", "slot": "USB Front", "slot_path": f"/sys/devices/{hub}"},
+        )
+
+
+def _omnia_ng(tree: _Tree, board: Board):
+    slots = ["ETH0", "ETH1", "ETH2", "ETH3", "SFP0", "SFP1"]
+    for idx, slot in enumerate(slots):
+        tree.port(f"eth{idx}", f"platform/soc@0/3a5{idx * 4:02x}000.dp{idx + 1}", {"bus": "eth", "slot": slot})
+
+    for idx in range(board.radios):
+        if idx == 0:
+            tree.radio("wlan0", "platform/soc@0/c000000.wifi", {"bus": "wifi", "slot": "0"}, pci=False)
+        else:
+            slot = idx - 1
+            device = f"platform/soc@0/20000000.pci/pci0002:00/0002:00:0{slot}.0/0002:0{idx}:00.0"
+            tree.radio(f"wlan{idx}", device, {"bus": "pci", "slot": str(slot)})
+
+
+def _mox(tree: _Tree, board: Board):
+    regs = "platform/soc/soc:internal-regs@d0000000"
+    modules = board.mox_modules
+    for seq, module in enumerate(modules):
+        device = f"{regs}/d0010600.spi/spi_master/spi0/spi0.1/moxtet-{module}.{seq}"
+        tree.symlink(f"sys/bus/moxtet/devices/moxtet-{module}.{seq}", f"sys/devices/{device}")
+
+    def rank(module: str) -> int:
+        return modules.index(module) + 1 if module in modules else 0
+
+    tree.port("eth0", f"{regs}/d0030000.ethernet", {"bus": "eth", "slot": "ETH0"})
+
+    switches = [(seq + 1, e) for seq, e in enumerate(modules) if e in MOX_SWITCH_PORTS]
+    port = 1
+    device = switch_node = ""
+    for switch_id, (module_id, module) in enumerate(switches):
+        addr = 10 + switch_id
+        device = f"{regs}/d0032004.mdio/mdio_bus/d0032004.mdio-mii/d0032004.mdio-mii:{addr}"
+        switch_node = f"soc/internal-regs@d0000000/mdio@32004/switch{switch_id}@{addr}"
+        tree.symlink(f"sys/devices/{device}/of_node", f"{DEVICE_TREE}/{switch_node}")
+        for idx in range(MOX_SWITCH_PORTS[module]):
+            name = f"lan{port}"
+            expected = {"bus": "eth", "slot": f"LAN{port}", "module_id": module_id}
+            tree.port(name, device, expected, label=name, of_node=f"{switch_node}/ports/port@{idx + 1}")
+            port += 1
+
+    sfp = {"bus": "sfp", "slot": "SFP", "module_id": rank("sfp")}
+    if "sfp" in modules and switches:
+        # SFP module behind switches is port of the last switch
+        tree.port("sfp", device, sfp, label="sfp", of_node=f"{switch_node}/ports/port@10")
+        tree.netdev("eth1", f"{regs}/d0040000.ethernet")  # connected to switches
+    elif "sfp" in modules:
+        tree.port("eth1", f"{regs}/d0040000.ethernet", sfp)
+    else:
+        tree.netdev("eth1", f"{regs}/d0040000.ethernet")
+
+    for idx in range(board.radios):
+        if idx == 0:
+            device = f"{regs}/d00d0000.sdhci/mmc_host/mmc1/mmc1:0001/mmc1:0001:1"
+            tree.radio("mlan0", device, {"bus": "sdio", "slot": "0"}, pci=False)
+        else:
+            device = f"{regs}/d0070000.pcie/pci0000:00/0000:00:00.0/0000:01:00.0"
+            tree.radio("wlan0", device, {"bus": "pci", "slot": "0", "module_id": rank("pci")})
+
+    # modems are connected through USB hub in USB port on the CPU module
+    hub = f"{regs}/d0058000.usb/usb3/3-1"
+    for idx in range(board.modems):
+        tree.modem(
+            f"wwan{idx}",
+            f"{hub}/3-1.{idx + 1}",
+            f"cdc-wdm{board.modems - idx - 1}",
+            {"bus": "usb", "slot": "0", "slot_path": f"/sys/devices/{hub}"},
+        )
+
+
+_BUILDERS = {"omnia": _omnia, "mox": _mox, "turris1x": _turris1x, "omnia_ng": _omnia_ng}
+
+
+def build(root: str, board: Board) -> Expected:
+    """Generate tree of the board in `root`, return expected output of `turrishw.get_ifaces()`"""
+    board.validate()
+
+    tree = _Tree(root)
+    tree.write("sys/firmware/devicetree/base/model", f"{MODELS[board.model]}\x00")
+    tree.write("etc/turris-version", "7.0.0\n")
+    _BUILDERS[board.model](tree, board)
+    tree.virtual("lo", "br-lan")
+    tree.vlans(board.vlans)
+    return tree.expected
@@ -0,0 +1,67 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+import concurrent.futures
+import json
+
+import pytest
+
+import turrishw
+from turrishw.watch import LinkWatcher
+
+from .test_watch import IF_OPER_UP, ReplaySource, link_message
+
+
+@pytest.mark.parametrize("tar_root", ["omnia", "mox-abc-wwan-7.0", "turris-6.0-vlans"], indirect=True)
+def test_get_ifaces_async(tar_root, mock_pci_db):
+    async def detect():
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            return (
+                await turrishw.get_ifaces_async(executor=executor, batch_size=3),
+                [e.name async for e in turrishw.iter_interfaces_async(["eth"])],
+            )
+
+    ifaces, eth_names = asyncio.run(detect())
+    with open(tar_root) as f:
+        expected = json.load(f)
+    assert ifaces == expected
+    assert list(ifaces.keys()) == list(expected.keys())
+    assert eth_names == [name for name, data in expected.items() if data["type"] == "eth"]
+    assert ifaces == turrishw.get_ifaces()
+
+
+@pytest.mark.parametrize("tar_root", ["turris-6.0-vlans"], indirect=True)
+def test_detect_async_sessions(tar_root, mock_pci_db):
+    async def detect():
+        with turrishw.sysfs.session():
+            # concurrent detections don't share the global session, each has its own
+            return await asyncio.gather(turrishw.get_ifaces_async(batch_size=2), turrishw.get_ifaces_async())
+
+    with turrishw.collect_stats() as stats:
+        first, second = asyncio.run(detect())
+    assert first == second == turrishw.get_ifaces()
+    assert {"model", "enumerate", "vlans", "attributes"} <= stats.phases.keys()
+    assert stats.calls["attributes"] == 2
+    assert turrishw.sysfs.current_session() is None
+
+
+@pytest.mark.parametrize("set_root", ["omnia-lan2-flapping"], indirect=True)
+def test_events_async(set_root, mock_pci_db):
+    async def collect(watcher):
+        return [changes async for changes in watcher.events_async(timeout=0)]
+
+    watcher = LinkWatcher(ReplaySource([link_message("lan2", IF_OPER_UP)]), coalesce=0)
+    changes = asyncio.run(collect(watcher))
+    assert [{name: iface.state for name, iface in e.items()} for e in changes] == [{"lan2": "up"}]
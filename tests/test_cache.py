@@ -0,0 +1,88 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import pathlib
+
+import pytest
+
+import turrishw
+import turrishw.utils
+
+
+@pytest.fixture
+def cache():
+    yield turrishw.configure_cache
+    turrishw.configure_cache()
+
+
+def _write_sys(iface: str, attr: str, value: str):
+    path = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net", iface, attr)
+    path.write_text(value + "\n")
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_cache_disabled_by_default(set_root, mock_pci_db):
+    assert turrishw.get_ifaces()["lan3"]["state"] == "up"
+    _write_sys("lan3", "operstate", "down")
+    assert turrishw.get_ifaces()["lan3"]["state"] == "down"
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_cache_invalidate(set_root, mock_pci_db, cache):
+    cache(ttl=60)
+
+    ifaces = turrishw.get_ifaces()
+    assert ifaces["lan3"]["state"] == "up"
+    assert ifaces["lan3"]["link_speed"] == 1000
+
+    _write_sys("lan3", "operstate", "down")
+    _write_sys("lan3", "address", "d8:58:d7:00:00:01")
+    assert turrishw.get_ifaces() == ifaces
+
+    # only dynamic attributes of given interface are re-read
+    turrishw.invalidate("lan3")
+    ifaces = turrishw.get_ifaces()
+    assert ifaces["lan3"]["state"] == "down"
+    assert ifaces["lan3"]["link_speed"] == 0
+    assert ifaces["lan3"]["macaddr"] == "d8:58:d7:00:92:9d"
+
+    turrishw.invalidate()
+    assert turrishw.get_ifaces()["lan3"]["macaddr"] == "d8:58:d7:00:00:01"
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_cache_dynamic_ttl(set_root, mock_pci_db, cache):
+    cache(ttl=60, dynamic_ttl=0)
+
+    assert turrishw.get_ifaces()["lan3"]["state"] == "up"
+    _write_sys("lan3", "operstate", "down")
+    _write_sys("lan3", "address", "d8:58:d7:00:00:01")
+
+    ifaces = turrishw.get_ifaces()
+    assert ifaces["lan3"]["state"] == "down"
+    assert ifaces["lan3"]["macaddr"] == "d8:58:d7:00:92:9d"
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_cache_returns_copies(tar_root, mock_pci_db, cache):
+    cache(ttl=60)
+
+    ifaces = turrishw.get_ifaces()
+    expected = turrishw.get_ifaces()
+    ifaces["lan3"]["state"] = "down"
+    ifaces["lan3"]["slot"] = "WAN"
+    del ifaces["lan1"]
+
+    assert turrishw.get_ifaces() == expected
+    assert turrishw.get_ifaces(filter_types=["wifi"]) == {"wlan0": expected["wlan0"]}
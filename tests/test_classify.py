@@ -0,0 +1,56 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import pytest
+
+from turrishw import mox, omnia, turris1x
+from turrishw.classify import Action, Profile, Rule
+
+
+def test_first_matching_rule_wins():
+    profile = Profile(
+        "test",
+        [
+            Rule("usb", also="1-1.1", bus="usb", slot="USB 1"),
+            Rule("usb", action=Action.IGNORE),
+            Rule("1-1.1", bus="pci", slot="1"),
+        ],
+    )
+    assert profile.match("/sys/devices/usb/1-1.1/net/eth0") == (profile.rules[0], None, True)
+    assert profile.match("/sys/devices/usb/1-1.2/net/eth0") == (profile.rules[1], None, True)
+    assert profile.match("/sys/devices/pci/1-1.1/net/eth0") == (profile.rules[2], None, True)
+    assert profile.match("/sys/devices/platform/net/eth0") == (None, None, False)
+
+
+@pytest.mark.parametrize(
+    "profile,path,rule_idx,slot,extracted",
+    [
+        (
+            omnia.PROFILE,
+            "/sys/devices/platform/soc/soc:pcie/pci0000:00/0000:00:02.0/0000:02:00.0/net/wlan1",
+            2,
+            "2",
+            True,
+        ),
+        (omnia.PROFILE, "/sys/devices/platform/soc/soc:pcie/pci0000:00/0000:00:07.0/net/wlan1", 2, None, False),
+        (omnia.PROFILE, "/sys/devices/platform/soc/soc:internal-regs/f1030000.ethernet/net/eth1", 7, None, True),
+        (omnia.PROFILE, "/sys/devices/virtual/net/br-lan", 8, None, True),
+        (mox.PROFILE, "/sys/devices/platform/soc/d0070000.pcie/pci0000:00/usb3/3-2/3-2:1.0/net/eth2", 4, "2", True),
+        (mox.PROFILE, "/sys/devices/platform/soc/d0070000.pcie/pci0000:00/0000:00:00.0/net/wlan0", 5, None, True),
+        (turris1x.PROFILE, "/sys/devices/platform/ffe0a000.pcie/pci0002:00/usb3/3-1/3-1:1.0/net/eth2", 8, None, True),
+        (turris1x.PROFILE, "/sys/devices/platform/ffe0a000.pcie/pci0002:00/usb3/3-3/3-3:1.0/net/eth2", 9, None, True),
+    ],
+)
+def test_board_profiles(profile, path, rule_idx, slot, extracted):
+    assert profile.match(path) == (profile.rules[rule_idx], slot, extracted)
@@ -0,0 +1,104 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import pathlib
+
+import pytest
+
+import turrishw.cli
+import turrishw.utils
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_json(tar_root, mock_pci_db, capsys):
+    assert turrishw.cli.main(["--json", "--type", "wifi,wwan"]) == 0
+    with open(tar_root) as f:
+        expected = {name: data for name, data in json.load(f).items() if data["type"] in ("wifi", "wwan")}
+    assert json.loads(capsys.readouterr().out) == expected
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_table(tar_root, mock_pci_db, capsys):
+    assert turrishw.cli.main(["--iface", "lan3", "--iface", "eth2"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "NAME  TYPE  BUS  SLOT  STATE  LINK_SPEED  MACADDR",
+        "eth2  eth   eth  WAN   down   0           d8:58:d7:00:92:9e",
+        "lan3  eth   eth  LAN3  up     1000        d8:58:d7:00:92:9d",
+    ]
+
+    assert turrishw.cli.main(["--iface", "wlan9"]) == 1
+    assert "unknown interface: wlan9" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_watch(set_root, mock_pci_db, monkeypatch, capsys):
+    sys_net = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net")
+
+    def lan1_up():
+        (sys_net / "lan1/operstate").write_text("up\n")
+        (sys_net / "lan1/speed").write_text("100\n")
+
+    def eth2_removed():
+        (sys_net / "eth2").unlink()
+
+    def stop():
+        raise KeyboardInterrupt
+
+    ticks = iter([lambda: None, lan1_up, eth2_removed, stop])
+    monkeypatch.setattr(turrishw.cli.time, "sleep", lambda _: next(ticks)())
+
+    assert turrishw.cli.main(["--json", "--watch", "--interval", "0", "--type", "eth"]) == 0
+    initial, *changes = capsys.readouterr().out.split("\n}\n")
+    assert "lan1" in json.loads(initial + "}")
+    changes = [json.loads(line) for line in changes[0].splitlines()]
+    assert [{name: data and data["state"] for name, data in e.items()} for e in changes] == [
+        {"lan1": "up"},
+        {"eth2": None},
+    ]
+
+
+@pytest.mark.parametrize("set_root", ["mox-abc-wwan-7.0"], indirect=True)
+def test_record_snapshot(set_root, mock_pci_db, tmp_path, capsys):
+    snapshot = str(tmp_path / "mox.json.gz")
+    assert turrishw.cli.main(["--json", "--record", snapshot]) == 0
+    recorded = capsys.readouterr().out
+
+    turrishw.utils.TURRISHW_FILE_ROOT = "/nonexistent"
+    assert turrishw.cli.main(["--json", "--snapshot", snapshot]) == 0
+    assert capsys.readouterr().out == recorded
+    with open(set_root) as f:
+        assert json.loads(recorded) == json.load(f)
+
+    assert turrishw.cli.main(["--snapshot", str(tmp_path / "missing.json")]) == 1
+    assert "can't load snapshot" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_stats(tar_root, mock_pci_db, capsys):
+    assert turrishw.cli.main(["--json", "--stats"]) == 0
+    out, err = capsys.readouterr()
+    with open(tar_root) as f:
+        assert json.loads(out) == json.load(f)
+    assert err.startswith("turrishw: total ")
+    assert "classify.omnia" in err
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_publish(tar_root, mock_pci_db, tmp_path, capsys):
+    published = str(tmp_path / "ifaces")
+    # all interfaces are published even when only some of them are printed
+    assert turrishw.cli.main(["--type", "wifi", "--publish", published]) == 0
+    assert "wlan0" in capsys.readouterr().out
+    assert turrishw.load_published_ifaces(path=published) == turrishw.get_ifaces()
@@ -0,0 +1,90 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import pathlib
+
+import pytest
+
+import turrishw
+import turrishw.utils
+from turrishw.counters import FIELDS, Counters, port_labels
+from turrishw.interface import Interface
+
+HEADER = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast"
+    "|bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+
+def _write_net_dev(counters: dict):
+    lines = [HEADER]
+    for name, (rx_bytes, rx_packets, tx_bytes, tx_packets) in counters.items():
+        lines.append(f"{name:>6}: {rx_bytes} {rx_packets} 1 2 0 0 0 0 {tx_bytes} {tx_packets} 3 4 0 0 0 0\n")
+    path = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "proc/net/dev")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(lines))
+
+
+def test_port_labels():
+    ifaces = [
+        Interface("lan1", "eth", "eth", "LAN1", ""),
+        Interface("lan1.100", "eth", "eth", "LAN1", "", vlan_id=100),
+        Interface("wlan0", "wifi", "pci", "2", ""),
+        Interface("eth2", "eth", "usb", "USB Front", ""),
+        Interface("wwan0", "wwan", "usb", "0", "", module_id=1),
+        Interface("wwan1", "wwan", "usb", "0", "", module_id=2),
+    ]
+    assert port_labels(ifaces) == {
+        "eth2": "USB Front",
+        "lan1": "LAN1",
+        "lan1.100": "LAN1.100",
+        "wlan0": "PCI 2",
+        "wwan0": "USB 0 (wwan0)",
+        "wwan1": "USB 0 (wwan1)",
+    }
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_counters(set_root, mock_pci_db):
+    counters = Counters(size=3)
+    assert dict(zip(counters.names, counters.labels, strict=True))["eth2"] == "WAN"
+    assert "lo" not in counters.names and "br-lan" not in counters.names
+
+    _write_net_dev({"lo": (5, 5, 5, 5), "eth2": (1000, 10, 2000, 20), "lan1": (0, 0, 0, 0)})
+    counters.sample(now=10.0)
+    assert counters.rate("WAN", "rx_bytes") is None  # single sample
+    assert counters.value("WAN", "tx_packets") == 20
+    assert counters.totals()["WAN"] == dict(zip(FIELDS, (1000, 10, 1, 2, 2000, 20, 3, 4), strict=True))
+
+    # lan1 disappeared, WAN counters were reset
+    _write_net_dev({"eth2": (500, 5, 6000, 60), "lan2": (100, 1, 0, 0)})
+    counters.sample(now=12.0)
+    assert counters.rate("WAN", "rx_bytes") == 250.0
+    assert counters.rate("WAN", "tx_bytes") == 2000.0
+    assert counters.rate("LAN1", "rx_bytes") == 0.0
+    assert counters.rate("LAN2", "rx_packets") == 0.5
+
+    # ring buffer keeps only the last 3 samples
+    for idx, now in enumerate((13.0, 14.0)):
+        _write_net_dev({"eth2": (1500 + idx * 1000, 5, 6000, 60)})
+        counters.sample(now=now)
+    assert len(counters) == 3
+    assert counters.rate("WAN", "rx_bytes") == 1000.0
+    assert counters.rate("WAN", "rx_bytes", window=2) == 1000.0
+    assert counters.rate("WAN", "rx_bytes", window=10) == 1000.0  # limited by the stored samples
+    assert counters.value("WAN", "rx_bytes", age=2) == 500
+    with pytest.raises(IndexError):
+        counters.value("WAN", "rx_bytes", age=3)
+    assert counters.rates()["LAN2"]["rx_bytes"] == 0.0
@@ -0,0 +1,166 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import pathlib
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import turrishw
+import turrishw.daemon
+import turrishw.utils
+from turrishw.daemon import Daemon
+
+from .test_watch import IF_OPER_UP, link_message
+
+
+class QueueSource:
+    """Source of link events which are sent by the test, waits for them same as netlink socket would"""
+
+    def __init__(self):
+        self.datagrams = []
+        self.ready = threading.Condition()
+
+    def send(self, datagram: bytes):
+        with self.ready:
+            self.datagrams.append(datagram)
+            self.ready.notify()
+
+    def recv(self, timeout=None):
+        with self.ready:
+            self.ready.wait_for(lambda: self.datagrams, timeout)
+            return self.datagrams.pop(0) if self.datagrams else None
+
+    def close(self):
+        pass
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition was not met in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "turrishw.sock")
+
+
+@pytest.mark.parametrize("tar_root", ["omnia", "mox-abc-wwan-7.0", "mox-ac-6.0-vlans"], indirect=True)
+def test_daemon_serves_ifaces(tar_root, mock_pci_db, socket_path):
+    with open(tar_root) as f:
+        expected = json.load(f)
+
+    with Daemon(socket_path, interval=0.05, poll=True):
+        ifaces = turrishw.daemon.get_ifaces(path=socket_path)
+        assert ifaces == expected
+        assert list(ifaces.keys()) == list(expected.keys())
+        assert turrishw.daemon.get_ifaces(["wifi"], path=socket_path) == turrishw.get_ifaces(["wifi"])
+        objects = turrishw.daemon.get_ifaces(as_objects=True, path=socket_path)
+        detected = turrishw.get_ifaces(as_objects=True)
+        assert objects == detected
+        # parent is not compared by `==`
+        assert {name: iface.parent for name, iface in objects.items()} == {
+            name: iface.parent for name, iface in detected.items()
+        }
+        assert turrishw.daemon.call("rescan", socket_path) is None
+        assert turrishw.daemon.get_ifaces(path=socket_path) == expected
+    assert not pathlib.Path(socket_path).exists()
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_daemon_polling(set_root, mock_pci_db, socket_path):
+    with Daemon(socket_path, interval=0.01, poll=True):
+        assert turrishw.daemon.get_ifaces(path=socket_path)["lan3"]["state"] == "up"
+        pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net/lan3/operstate").write_text("down\n")
+        _wait_for(lambda: turrishw.daemon.get_ifaces(path=socket_path)["lan3"]["state"] == "down")
+        assert turrishw.daemon.get_ifaces(path=socket_path)["lan3"]["link_speed"] == 0
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_daemon_survives_failed_update(set_root, mock_pci_db, socket_path, monkeypatch):
+    refresh_dynamic = turrishw.turrishw.refresh_dynamic
+    failures = []
+
+    def failing(*args, **kwargs):
+        if not failures:
+            failures.append(True)
+            raise ValueError("unexpected content")
+        return refresh_dynamic(*args, **kwargs)
+
+    monkeypatch.setattr(turrishw.turrishw, "refresh_dynamic", failing)
+    with Daemon(socket_path, interval=0.01, poll=True):
+        _wait_for(lambda: failures)
+        pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net/lan3/operstate").write_text("down\n")
+        _wait_for(lambda: turrishw.daemon.get_ifaces(path=socket_path)["lan3"]["state"] == "down")
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_daemon_link_events(tar_root, mock_pci_db, socket_path):
+    source = QueueSource()
+    with Daemon(socket_path, interval=0.05, source=source):
+        assert turrishw.daemon.get_ifaces(path=socket_path)["lan2"]["state"] == "down"
+        source.send(link_message("lan2", IF_OPER_UP))
+        _wait_for(lambda: turrishw.daemon.get_ifaces(path=socket_path)["lan2"]["state"] == "up")
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_daemon_protocol(tar_root, mock_pci_db, socket_path):
+    with Daemon(socket_path, interval=0.05, poll=True):
+        with pytest.raises(RuntimeError, match="unknown method"):
+            turrishw.daemon.call("unknown", socket_path)
+
+        # malformed requests are answered with error, connection is kept open
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            f = sock.makefile("rwb")
+            for request in (b"not json\n", b"[]\n", b'{"method": "get_ifaces"}\n'):
+                f.write(request)
+                f.flush()
+                response = json.loads(f.readline())
+                assert ("error" in response) == (request != b'{"method": "get_ifaces"}\n')
+            assert response["result"] == turrishw.get_ifaces()
+            f.close()
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_client_fallback(tar_root, mock_pci_db, socket_path):
+    with pytest.raises(OSError):
+        turrishw.daemon.get_ifaces(path=socket_path)
+    assert turrishw.daemon.get_ifaces(path=socket_path, fallback=True) == turrishw.get_ifaces()
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_cli_daemon(tar_root, socket_path):
+    snapshot = os.path.join(os.path.dirname(tar_root), "omnia.tar.gz")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "turrishw", "--daemon", "--socket", socket_path, "--snapshot", snapshot],
+        stderr=subprocess.PIPE,
+    )
+    try:
+        _wait_for(lambda: os.path.exists(socket_path), timeout=30)
+        assert turrishw.daemon.get_ifaces(path=socket_path) == turrishw.get_ifaces()
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0, proc.stderr.read()
+        proc.stderr.close()
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,85 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import pathlib
+
+import pytest
+
+import turrishw.utils
+from turrishw.flaps import FlapDetector
+
+
+def _write_sys(iface: str, attr: str, value: int):
+    pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net", iface, attr).write_text(f"{value}\n")
+
+
+@pytest.mark.parametrize("set_root", ["omnia-lan2-flapping"], indirect=True)
+def test_flap_detector(set_root, mock_pci_db):
+    # newer kernels count link ups and downs separately
+    _write_sys("lan1", "carrier_up_count", 1)
+    _write_sys("lan1", "carrier_down_count", 0)
+
+    with FlapDetector(size=5) as detector:
+        assert "lan2" in detector.names and "LAN2" in detector.labels
+        detector.sample(now=100.0)
+        report = detector.report()
+        assert report["LAN2"].changes_per_minute is None
+        assert report["LAN2"].last_change is None
+
+        # lan2 goes down and up every 10 seconds, lan1 is stable
+        for step in range(1, 4):
+            _write_sys("lan2", "carrier_changes", step * 2)
+            detector.sample(now=100.0 + step * 10)
+        report = detector.report()
+        assert report["LAN2"].carrier_changes == 6
+        assert report["LAN2"].changes == 6
+        assert report["LAN2"].changes_per_minute == 12.0
+        assert report["LAN2"].last_change == 130.0
+        assert (report["LAN2"].up_count, report["LAN2"].down_count) == (None, None)
+        assert report["LAN1"] == ("lan1", 0, 0, 0.0, None, 1, 0)
+        assert detector.flapping() == ["LAN2"]
+        assert detector.flapping(threshold=20) == []
+
+        # interface can't be read for a while (it's re-created), its counter starts from zero again
+        counter = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net/lan2/carrier_changes")
+        counter.unlink()
+        detector.sample(now=140.0)
+        assert detector.report()["LAN2"].carrier_changes == 6
+        _write_sys("lan2", "carrier_changes", 1)
+        detector.sample(now=150.0)
+
+        # only the last 5 samples (110 - 150 s) are kept
+        report = detector.report()
+        assert report["LAN2"].changes == 5
+        assert report["LAN2"].changes_per_minute == 7.5
+        assert report["LAN2"].last_change == 150.0
+
+
+@pytest.mark.parametrize("set_root", ["omnia-lan2-flapping"], indirect=True)
+def test_flap_detector_no_baseline(set_root, mock_pci_db):
+    # counter can't be read on the first sample, the first value read later is just the baseline
+    counter = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net/lan2/carrier_changes")
+    counter.unlink()
+    with FlapDetector(size=5) as detector:
+        detector.sample(now=100.0)
+        detector.sample(now=110.0)
+        assert detector.report()["LAN2"] == ("lan2", 0, 0, 0.0, None, None, None)
+
+        _write_sys("lan2", "carrier_changes", 12)
+        detector.sample(now=120.0)
+        assert detector.report()["LAN2"] == ("lan2", 12, 0, 0.0, None, None, None)
+
+        _write_sys("lan2", "carrier_changes", 14)
+        detector.sample(now=130.0)
+        assert detector.report()["LAN2"] == ("lan2", 14, 2, 4.0, 130.0, None, None)
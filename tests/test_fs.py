@@ -0,0 +1,171 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import errno
+import gc
+import json
+import weakref
+
+import pytest
+
+import turrishw
+import turrishw.fs
+import turrishw.utils
+from turrishw.fs import Link, MemoryBackend
+
+OMNIA = {
+    "sys/firmware/devicetree/base/model": "Turris Omnia\x00",
+    "sys/class/net/eth2": Link("../../devices/platform/soc/soc:internal-regs/f1034000.ethernet/net/eth2"),
+    "sys/class/net/lo": Link("../../devices/virtual/net/lo"),
+    "sys/devices/platform/soc/soc:internal-regs/f1034000.ethernet/net/eth2/address": "d8:58:d7:00:92:9e\n",
+    "sys/devices/platform/soc/soc:internal-regs/f1034000.ethernet/net/eth2/operstate": "up\n",
+    "sys/devices/platform/soc/soc:internal-regs/f1034000.ethernet/net/eth2/speed": "1000\n",
+    "sys/devices/platform/soc/soc:internal-regs/f1034000.ethernet/net/eth2/queues": None,
+    "sys/devices/virtual/net/lo/address": "00:00:00:00:00:00\n",
+    "sys/devices/virtual/net/lo/operstate": "unknown\n",
+    "proc/net/vlan/config": "",
+}
+
+
+def test_memory_backend():
+    backend = MemoryBackend(OMNIA, root="/snapshot")
+    eth2 = "/snapshot/sys/class/net/eth2"
+
+    assert backend.read(f"{eth2}/operstate") == "up\n"
+    assert backend.read(f"{eth2}/address", 2) == "d8"
+    assert backend.read_first_line("/snapshot/sys/firmware/devicetree/base/model") == "Turris Omnia\x00"
+    assert backend.listdir("/snapshot/sys/class/net") == ["eth2", "lo"]
+    assert backend.list_links("/snapshot/sys/class/net") == ["eth2", "lo"]
+    assert backend.list_links(eth2) == []
+    assert backend.glob("/snapshot/proc/net/vlan", "*.*") == []
+    assert backend.is_dir(f"{eth2}/queues")
+    assert not backend.is_dir(f"{eth2}/speed")
+    assert backend.exists(f"{eth2}/../../../../../../virtual/net/lo/operstate")
+    assert not backend.exists(f"{eth2}/phy80211")
+    assert not backend.exists("/elsewhere/sys")
+
+    device = "/snapshot/sys/devices/platform/soc/soc:internal-regs/f1034000.ethernet/net/eth2"
+    assert backend.resolve_link(eth2) == device
+    assert backend.resolve_link(device) == device
+
+    for func, path, code in [
+        (backend.read, f"{eth2}/vendor", errno.ENOENT),
+        (backend.read, eth2, errno.EISDIR),
+        (backend.read, f"{eth2}/speed/value", errno.ENOTDIR),
+        (backend.readlink, f"{eth2}/speed", errno.EINVAL),
+        (backend.listdir, f"{eth2}/speed", errno.ENOTDIR),
+    ]:
+        with pytest.raises(OSError) as e:
+            func(path)
+        assert e.value.errno == code
+
+
+def test_memory_backend_loop():
+    backend = MemoryBackend({"a": Link("b"), "b": Link("/a")})
+    with pytest.raises(OSError) as e:
+        backend.read("/a")
+    assert e.value.errno == errno.ELOOP
+    assert backend.readlink("/b") == "/a"
+
+    with pytest.raises(ValueError):
+        MemoryBackend({"a": "file", "a/b": "file"})
+
+
+def test_configure_backend(mock_pci_db):
+    turrishw.configure_backend(MemoryBackend(OMNIA, root="/snapshot"))
+    try:
+        assert turrishw.utils.TURRISHW_FILE_ROOT == "/snapshot"
+        assert turrishw.get_model() == "OMNIA"
+        assert turrishw.get_ifaces() == {
+            "eth2": {
+                "type": "eth",
+                "bus": "eth",
+                "state": "up",
+                "slot": "WAN",
+                "module_id": 0,
+                "macaddr": "d8:58:d7:00:92:9e",
+                "link_speed": 1000,
+            }
+        }
+    finally:
+        turrishw.configure_backend()
+    assert turrishw.fs.get_backend() is turrishw.fs.OS
+    assert turrishw.utils.TURRISHW_FILE_ROOT == "/"
+
+
+def test_configure_backend_releases_backend(mock_pci_db):
+    backend = MemoryBackend(OMNIA, root="/snapshot")
+    ref = weakref.ref(backend)
+    turrishw.configure_backend(backend)
+    try:
+        assert turrishw.get_model() == "OMNIA"
+        with turrishw.record():
+            turrishw.get_ifaces()
+    finally:
+        turrishw.configure_backend()
+    del backend
+    gc.collect()
+    # neither the identity of the board nor anything else keeps the snapshot in memory
+    assert ref() is None
+
+
+@pytest.mark.parametrize(
+    "tar_root",
+    ["mox-abc-wwan-7.0", "mox1", "omnia-6.0-vlans", "turris-1.1-wwan-7.0", "omnia_ng-prototype"],
+    indirect=True,
+)
+def test_tar_backend(tar_root, mock_pci_db):
+    with open(tar_root) as f:
+        expected = json.load(f)
+    ifaces = turrishw.get_ifaces()
+    assert ifaces == expected
+    assert list(ifaces.keys()) == list(expected.keys())
+
+
+@pytest.mark.parametrize("set_root", ["omnia", "mox-abc-wwan-7.0", "turris-1.1-wwan-7.0"], indirect=True)
+def test_record_and_replay(set_root, mock_pci_db, tmp_path):
+    expected = turrishw.get_ifaces()
+    with turrishw.record() as recorder:
+        assert turrishw.get_ifaces() == expected
+    assert turrishw.fs.get_backend() is turrishw.fs.OS
+
+    # only files which were read are recorded, stored snapshot is deterministic
+    snapshot = recorder.snapshot()
+    assert "sys/class/net/eth0" in snapshot["links"]
+    assert all(e.startswith(("sys/", "proc/", "etc/")) for e in [*snapshot["files"], *snapshot["links"]])
+    recorder.save(str(tmp_path / "first.json.gz"))
+    recorder.save(str(tmp_path / "second.json.gz"))
+    assert (tmp_path / "first.json.gz").read_bytes() == (tmp_path / "second.json.gz").read_bytes()
+
+    # every interface reads its state
+    profile = {(op, path): count for op, path, count, _ in recorder.profile(by_attribute=True)}
+    assert profile[("read", "operstate")] == len(expected)
+
+    turrishw.configure_backend(MemoryBackend.load(str(tmp_path / "first.json.gz")))
+    try:
+        replayed = turrishw.get_ifaces()
+    finally:
+        turrishw.configure_backend()
+    assert replayed == expected
+    assert list(replayed.keys()) == list(expected.keys())
+
+
+def test_backend_is_abstract():
+    class Incomplete(turrishw.fs.Backend):
+        def read(self, path: str, size: int = -1) -> str:
+            return ""
+
+    for cls in (turrishw.fs.Backend, Incomplete):
+        with pytest.raises(TypeError):
+            cls()
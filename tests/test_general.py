@@ -12,44 +12,18 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import dataclasses
 import json
-import os
-import tarfile
+import pathlib
+import shutil
 
 import pytest
 
 import turrishw.utils
 
 
-@pytest.fixture
-def set_root(request, monkeypatch, tmpdir):
-    root = request.param
-    roots_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "tests_roots")
-    result_json = os.path.join(roots_dir, root + ".json")
-    root_tar = os.path.join(roots_dir, root + ".tar.gz")
-    tdir = str(tmpdir)
-    with tarfile.open(root_tar) as tar:
-        tar.extractall(path=tdir)
-
-    with monkeypatch.context() as m:
-        m.setattr(turrishw.utils, "TURRISHW_FILE_ROOT", tdir)
-        yield result_json
-
-
-@pytest.fixture
-def mock_pci_db(monkeypatch):
-    """Mocks queries over records in file `/usr/share/hwdata/pci.ids`
-    on router."""
-
-    PCI_MAPPINGS = {"02df": "Marvell", "168c": "Qualcomm Atheros", "14c3": "MEDIATEK Corp."}
-
-    with monkeypatch.context() as m:
-        m.setattr(turrishw.utils, "get_vendor_from_db", lambda x: PCI_MAPPINGS.get(x))
-        yield m
-
-
 @pytest.mark.parametrize(
-    "set_root",
+    "tar_root",
     [
         "mox1",
         "mox2",
@@ -68,8 +42,8 @@ def mock_pci_db(monkeypatch):
     ],
     indirect=True,
 )
-def test_get_interfaces(set_root, mock_pci_db):
-    with open(set_root) as file:
+def test_get_interfaces(tar_root, mock_pci_db):
+    with open(tar_root) as file:
         thw_ifaces = turrishw.get_ifaces()
         json_data = json.load(file)
         assert json_data == thw_ifaces
@@ -79,14 +53,150 @@ def test_get_interfaces(set_root, mock_pci_db):
 
 
 @pytest.mark.parametrize(
-    "set_root,filter_types",
+    "tar_root,filter_types",
     [("omnia", ["eth"]), ("omnia", ["wifi"]), ("mox1", ["wifi", "wwan"]), ("mox1", [])],
-    indirect=["set_root"],
+    indirect=["tar_root"],
 )
-def test_get_interfaces_filter(set_root, filter_types, mock_pci_db):
-    with open(set_root) as file:
+def test_get_interfaces_filter(tar_root, filter_types, mock_pci_db):
+    with open(tar_root) as file:
         thw_ifaces = turrishw.get_ifaces(filter_types=filter_types)
         mock_json_data = json.load(file)
         filtered_json_data = {name: data for name, data in mock_json_data.items() if data["type"] in filter_types}
 
         assert filtered_json_data == thw_ifaces
+
+
+@pytest.mark.parametrize("tar_root", ["omnia-6.0-vlans"], indirect=True)
+def test_get_interfaces_as_objects(tar_root, mock_pci_db):
+    ifaces = turrishw.get_ifaces(as_objects=True)
+    assert all(isinstance(iface, turrishw.Interface) for iface in ifaces.values())
+    assert [iface.name for iface in turrishw.iter_interfaces()] == [*ifaces.keys()]
+
+    # serialized interfaces are the same as the old `asdict()` based ones, including order of keys
+    for iface in ifaces.values():
+        legacy = {k: v for k, v in dataclasses.asdict(iface).items() if v is not None and k not in ("name", "parent")}
+        assert list(iface.to_dict().items()) == list(legacy.items())
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_refresh_dynamic(set_root, mock_pci_db, monkeypatch):
+    table = turrishw.get_topology()
+    assert [*table.keys()] == [*turrishw.get_ifaces().keys()]
+    assert turrishw.refresh_dynamic(table) == {}
+
+    sys_net = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net")
+    (sys_net / "lan3/operstate").write_text("down\n")
+    (sys_net / "lan1/operstate").write_text("up\n")
+    (sys_net / "lan1/speed").write_text("100\n")
+    (sys_net / "eth2").unlink()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("static attributes should not be re-read")
+
+    monkeypatch.setattr(pathlib.Path, "resolve", fail)
+    monkeypatch.setattr(turrishw.utils, "get_iface_vendor", fail)
+    monkeypatch.setattr(turrishw.utils, "parse_uevent", fail)
+
+    changes = turrishw.refresh_dynamic(table)
+    assert {name: iface and (iface.state, iface.link_speed) for name, iface in changes.items()} == {
+        "lan1": ("up", 100),
+        "lan3": ("down", 0),
+        "eth2": None,
+    }
+    assert "eth2" not in table
+    assert table["lan1"].link_speed == 100
+
+
+@pytest.mark.parametrize("set_root", ["mox1"], indirect=True)
+def test_get_platform(set_root, monkeypatch):
+    platform = turrishw.get_platform()
+    assert platform.model == "MOX"
+    assert platform.dt_model == "CZ.NIC Turris Mox Board"
+    assert platform.moxtet_modules == ("moxtet-pci.0", "moxtet-peridot.1", "moxtet-peridot.2", "moxtet-sfp.3")
+
+    # identity is resolved only once
+    def detect(root):
+        raise AssertionError("platform should not be detected again")
+
+    monkeypatch.setattr(turrishw.PlatformIdentity, "detect", detect)
+    assert turrishw.get_platform() is platform
+    assert turrishw.get_model() == "MOX"
+
+    monkeypatch.undo()
+    version = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "etc/turris-version")
+    version.parent.mkdir()
+    version.write_text("7.2.3\n")
+    assert turrishw.get_platform().tos_version is None
+    assert turrishw.get_platform(refresh=True).tos_version == "7.2.3"
+    assert turrishw.utils.get_TOS_major_version() == 7
+
+
+def test_parse_vlan_config():
+    config = (
+        "VLAN Dev name\t | VLAN ID\n"
+        "Name-Type: VLAN_NAME_TYPE_RAW_PLUS_VID_NO_PAD\n"
+        "eth2.100       | 100  | eth2\n"
+        "vlan200        | 200  | lan1\n"
+    )
+    assert turrishw.utils.parse_vlan_config(config) == {
+        "eth2.100": turrishw.utils.Vlan(100, "eth2"),
+        "vlan200": turrishw.utils.Vlan(200, "lan1"),
+    }
+
+
+@pytest.mark.parametrize("set_root", ["omnia-6.0-vlans"], indirect=True)
+def test_custom_vlan_names(set_root, mock_pci_db):
+    with open(set_root) as file:
+        expected = json.load(file)
+    expected["wan100"] = expected.pop("eth2.100")
+
+    # rename eth2.100 to wan100, only /proc/net/vlan/config knows its parent
+    root = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT)
+    (root / "sys/devices/virtual/net/eth2.100").rename(root / "sys/devices/virtual/net/wan100")
+    (root / "sys/class/net/eth2.100").unlink()
+    (root / "sys/class/net/wan100").symlink_to("../../devices/virtual/net/wan100")
+    (root / "proc/net/vlan/eth2.100").rename(root / "proc/net/vlan/wan100")
+    (root / "proc/net/vlan/config").write_text(
+        "VLAN Dev name\t | VLAN ID\n"
+        "Name-Type: VLAN_NAME_TYPE_RAW_PLUS_VID_NO_PAD\n"
+        "wan100         | 100  | eth2\n"
+        "lan1.253       | 253  | lan1\n"
+        "lan2.253       | 253  | lan2\n"
+    )
+
+    assert turrishw.get_ifaces() == expected
+
+
+@pytest.mark.parametrize("set_root", ["omnia-6.0-vlans"], indirect=True)
+def test_vlan_attributes_from_parent(set_root, mock_pci_db, monkeypatch):
+    with open(set_root) as file:
+        expected = json.load(file)
+    expected["eth2.100.200"] = {**expected["eth2.100"], "vlan_id": 200}
+    expected["wlan0.5"] = {**expected["wlan0"], "vlan_id": 5, "state": "down", "link_speed": 0}
+    del expected["wlan0.5"]["slot_path"]
+
+    # stacked VLAN (QinQ) and VLAN on the wifi card, kernel names them <parent>.<vlan id> by default
+    root = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT)
+    virtual = root / "sys/devices/virtual/net"
+    for name, template in (("eth2.100.200", "eth2.100"), ("wlan0.5", "lan1.253")):
+        shutil.copytree(virtual / template, virtual / name, symlinks=True)
+        (root / "sys/class/net" / name).symlink_to(f"../../devices/virtual/net/{name}")
+        (root / "proc/net/vlan" / name).touch()
+    (virtual / "wlan0.5/address").write_text(expected["wlan0.5"]["macaddr"] + "\n")
+
+    # VLANs have no device, so vendor and PCI id are not read for them
+    vendors = []
+    get_iface_vendor = turrishw.utils.get_iface_vendor
+    monkeypatch.setattr(turrishw.utils, "get_iface_vendor", lambda name: vendors.append(name) or get_iface_vendor(name))
+
+    ifaces = turrishw.get_ifaces()
+    assert ifaces == expected
+    assert ifaces["wlan0.5"]["vendor"] == "Qualcomm Atheros"
+    assert not [name for name in vendors if "." in name]
+
+    topology = turrishw.get_topology()
+    assert (topology["eth2.100.200"].parent, topology["eth2.100"].parent, topology["eth2"].parent) == (
+        "eth2.100",
+        "eth2",
+        None,
+    )
@@ -0,0 +1,96 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import os
+import re
+import subprocess
+import sys
+import typing
+
+import pytest
+
+import turrishw.utils
+
+# Budget for time spent in turrishw modules themselves (sum of their "self" times reported by `-X importtime`).
+# Standard library modules are not counted, they are mostly shared with the caller anyway.
+IMPORT_TIME_BUDGET_US = 50_000
+RUNS = 3
+
+
+def _run(*args: str, env: typing.Optional[typing.Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env)
+
+
+def _self_import_time() -> int:
+    # lines look like: `import time:       413 |       1569 |     turrishw.utils`
+    stderr = _run("-X", "importtime", "-c", "import turrishw").stderr
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if name.strip().split(".")[0] == "turrishw":
+            total += int(self_us)
+    return total
+
+
+def test_import_time_budget():
+    # take the best run, so the test isn't affected by other processes
+    best = min(_self_import_time() for _ in range(RUNS))
+    assert 0 < best < IMPORT_TIME_BUDGET_US
+
+
+def test_lazy_imports():
+    code = "import sys, turrishw; turrishw.get_model(); print(' '.join(sys.modules))"
+    modules = set(_run("-c", code).stdout.split())
+    assert "turrishw.turrishw" in modules
+
+    lazy = {
+        "mox",
+        "omnia",
+        "omnia_ng",
+        "turris1x",
+        "classify",
+        "pciids",
+        "usb",
+        "cli",
+        "watch",
+        "aio",
+        "daemon",
+        "publish",
+    }
+    assert not {f"turrishw.{e}" for e in lazy} & modules
+
+
+def test_lazy_patterns():
+    code = "import turrishw.utils, turrishw.usb; print(turrishw.utils._pattern.cache_info().currsize)"
+    assert _run("-c", code).stdout.split() == ["0"]
+
+    from turrishw import usb
+
+    for pattern in (turrishw.utils.WIFI_PATH_REGEX, turrishw.utils.QMI_PATH_REGEX, turrishw.utils.VENDOR):
+        assert isinstance(pattern, re.Pattern)
+    assert turrishw.utils.VENDOR is turrishw.utils.VENDOR
+    assert usb.USB_INTERFACE_REGEX.match("1-1.2:1.4")
+    with pytest.raises(AttributeError):
+        turrishw.utils.NO_SUCH_REGEX  # noqa: B018
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_board_module_imported_on_demand(set_root):
+    code = "import sys, turrishw; turrishw.get_ifaces(); print(' '.join(sys.modules))"
+    env = {**os.environ, "TURRISHW_ROOT": turrishw.utils.TURRISHW_FILE_ROOT}
+    modules = set(_run("-c", code, env=env).stdout.split())
+    assert "turrishw.omnia" in modules
+    assert not {"turrishw.mox", "turrishw.omnia_ng", "turrishw.turris1x"} & modules
@@ -0,0 +1,64 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import threading
+
+import pytest
+
+import turrishw
+import turrishw.utils
+
+
+@pytest.fixture
+def parallel():
+    turrishw.configure_parallel(workers=4, threshold=0)
+    yield
+    turrishw.configure_parallel()
+
+
+@pytest.mark.parametrize("tar_root", ["omnia-6.0-vlans", "mox-ad-6.0-vlans"], indirect=True)
+def test_parallel_collection(tar_root, mock_pci_db, parallel, monkeypatch):
+    threads = set()
+    read_iface_attributes = turrishw.utils.read_iface_attributes
+
+    def record(iface):
+        threads.add(threading.current_thread().name)
+        return read_iface_attributes(iface)
+
+    monkeypatch.setattr(turrishw.utils, "read_iface_attributes", record)
+
+    with open(tar_root) as f:
+        expected = json.load(f)
+    ifaces = turrishw.get_ifaces()
+    assert ifaces == expected
+    assert list(ifaces.keys()) == list(expected.keys())
+    assert all(name.startswith("turrishw") for name in threads)
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_serial_below_threshold(tar_root, mock_pci_db, monkeypatch):
+    turrishw.configure_parallel(workers=4)  # omnia has less interfaces than the default threshold
+    try:
+        threads = set()
+        read_iface_attributes = turrishw.utils.read_iface_attributes
+        monkeypatch.setattr(
+            turrishw.utils,
+            "read_iface_attributes",
+            lambda iface: threads.add(threading.current_thread().name) or read_iface_attributes(iface),
+        )
+        turrishw.get_ifaces()
+        assert threads == {threading.current_thread().name}
+    finally:
+        turrishw.configure_parallel()
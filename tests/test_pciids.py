@@ -0,0 +1,167 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import os
+
+import pytest
+
+import turrishw.pciids
+import turrishw.utils
+
+PCI_IDS = """\
+#
+#	List of PCI ID's
+#
+# Syntax:
+# vendor  vendor_name
+#	device  device_name				<-- single tab
+#		subvendor subdevice  subsystem_name	<-- two tabs
+
+11ab  Marvell Technology Group Ltd.
+	11ab  Bogus device with the same id as vendor
+	2a55  88W8864 [Avastar] 802.11ac Wireless
+168c  Qualcomm Atheros
+	003c  QCA986x/988x 802.11ac Wireless Network Adapter
+		168c 3223  Killer Wireless-N 1103 Half-size Mini PCIe Card
+14c3  MEDIATEK Corp.
+	7915  MT7915E 802.11ax PCI Express Wireless Network Adapter
+
+# List of known device classes, subclasses and programming interfaces
+
+C 00  Unclassified device
+	00  Non-VGA unclassified device
+"""
+
+
+@pytest.fixture
+def pci_db(tmp_path, monkeypatch):
+    path = tmp_path / "pci.ids"
+    path.write_text(PCI_IDS)
+    turrishw.utils.forget_vendors()
+    monkeypatch.setattr(turrishw.utils, "PCI_VENDORS_DB", str(path))
+    monkeypatch.setattr(turrishw.utils, "PCI_VENDORS_DB_INDEX", str(tmp_path / "cache" / "pci.ids.idx"))
+    yield path
+    turrishw.utils.forget_vendors()
+
+
+def test_vendor_lookup(pci_db):
+    assert turrishw.utils.get_vendor_from_db("168c") == "Qualcomm Atheros"
+    assert turrishw.utils.get_vendor_from_db("11ab") == "Marvell Technology Group Ltd."
+    assert turrishw.utils.get_vendor_from_db("14c3") == "MEDIATEK Corp."
+    # unknown vendor falls back to the hex number, device lines are not mistaken for vendors
+    assert turrishw.utils.get_vendor_from_db("2a55") == "2a55"
+    assert turrishw.utils.get_vendor_from_db("003c") == "003c"
+    # classes are not vendors
+    assert turrishw.utils.get_vendor_from_db("00") == "00"
+
+
+def test_device_and_subsystem_lookup(pci_db):
+    assert turrishw.utils.get_device_from_db("168c", "003c") == "QCA986x/988x 802.11ac Wireless Network Adapter"
+    assert turrishw.utils.get_device_from_db("11ab", "11ab") == "Bogus device with the same id as vendor"
+    assert turrishw.utils.get_device_from_db("168c", "7915") is None
+    assert (
+        turrishw.utils.get_subsystem_from_db("168c", "003c", "168c", "3223")
+        == "Killer Wireless-N 1103 Half-size Mini PCIe Card"
+    )
+    assert turrishw.utils.get_subsystem_from_db("14c3", "7915", "168c", "3223") is None
+
+
+def test_db_is_parsed_once(pci_db, monkeypatch):
+    calls = []
+    orig = turrishw.pciids.PciIds.from_file
+
+    def from_file(path):
+        calls.append(path)
+        return orig(path)
+
+    monkeypatch.setattr(turrishw.pciids.PciIds, "from_file", from_file)
+    for ven in ("168c", "11ab", "14c3", "dead"):
+        turrishw.utils.get_vendor_from_db(ven)
+    turrishw.utils.get_device_from_db("168c", "003c")
+
+    assert calls == [str(pci_db)]
+
+
+def test_db_reloaded_when_changed(pci_db):
+    device = "MT7915E 802.11ax PCI Express Wireless Network Adapter"
+    assert turrishw.utils.get_device_from_db("14c3", "7915") == device
+    assert turrishw.utils.get_vendor_from_db("14c3") == "MEDIATEK Corp."
+
+    pci_db.write_text(PCI_IDS.replace("MEDIATEK Corp.", "MediaTek Inc.").replace(device, "MT7915"))
+    assert turrishw.utils.get_device_from_db("14c3", "7915") == "MT7915"
+    assert turrishw.utils.get_vendor_from_db("14c3") == "MediaTek Inc."
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_vendor_updated_between_detections(tar_root, pci_db):
+    assert turrishw.get_ifaces()["wlan0"]["vendor"] == "Qualcomm Atheros"
+    pci_db.write_text(PCI_IDS.replace("Qualcomm Atheros", "Qualcomm"))
+    assert turrishw.get_ifaces()["wlan0"]["vendor"] == "Qualcomm"
+
+
+def _new_process():
+    """Drop all in-process caches as if the library was loaded by another process"""
+    turrishw.utils.forget_vendors()
+
+
+def test_index_is_reused_by_other_processes(pci_db, monkeypatch):
+    assert turrishw.utils.get_vendor_from_db("168c") == "Qualcomm Atheros"
+    assert os.path.exists(turrishw.utils.PCI_VENDORS_DB_INDEX)
+
+    _new_process()
+
+    def from_file(path):
+        raise AssertionError("pci.ids should not be parsed when index is fresh")
+
+    monkeypatch.setattr(turrishw.pciids.PciIds, "from_file", from_file)
+    db = turrishw.pciids.load(turrishw.utils.PCI_VENDORS_DB, turrishw.utils.PCI_VENDORS_DB_INDEX)
+    assert isinstance(db, turrishw.pciids.MappedPciIds)
+
+    assert turrishw.utils.get_vendor_from_db("168c") == "Qualcomm Atheros"
+    assert turrishw.utils.get_vendor_from_db("11ab") == "Marvell Technology Group Ltd."
+    assert turrishw.utils.get_vendor_from_db("14c3") == "MEDIATEK Corp."
+    assert turrishw.utils.get_vendor_from_db("0000") == "0000"
+    assert turrishw.utils.get_vendor_from_db("ffff") == "ffff"
+    assert turrishw.utils.get_vendor_from_db("xyz") == "xyz"
+    assert turrishw.utils.get_device_from_db("168c", "003c") == "QCA986x/988x 802.11ac Wireless Network Adapter"
+    assert turrishw.utils.get_device_from_db("168c", "003d") is None
+    assert (
+        turrishw.utils.get_subsystem_from_db("168c", "003c", "168c", "3223")
+        == "Killer Wireless-N 1103 Half-size Mini PCIe Card"
+    )
+
+
+def test_index_is_rebuilt_when_db_changes(pci_db):
+    assert turrishw.utils.get_vendor_from_db("14c3") == "MEDIATEK Corp."
+
+    pci_db.write_text(PCI_IDS.replace("MEDIATEK Corp.", "MediaTek Inc."))
+    stat = pci_db.stat()
+    os.utime(pci_db, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    _new_process()
+
+    assert turrishw.utils.get_vendor_from_db("14c3") == "MediaTek Inc."
+
+    _new_process()
+    db = turrishw.pciids.load(turrishw.utils.PCI_VENDORS_DB, turrishw.utils.PCI_VENDORS_DB_INDEX)
+    assert isinstance(db, turrishw.pciids.MappedPciIds)
+    assert db.vendor("14c3") == "MediaTek Inc."
+
+
+def test_index_not_writable(pci_db, monkeypatch, tmp_path):
+    blocker = tmp_path / "blocker"
+    blocker.write_text("not a directory")
+    monkeypatch.setattr(turrishw.utils, "PCI_VENDORS_DB_INDEX", str(blocker / "pci.ids.idx"))
+
+    # lookups still work, only the index is not shared
+    assert turrishw.utils.get_vendor_from_db("168c") == "Qualcomm Atheros"
@@ -0,0 +1,116 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import pathlib
+
+import pytest
+
+import turrishw
+import turrishw.publish
+import turrishw.utils
+from turrishw.daemon import Daemon
+from turrishw.publish import PUBLISHED_HEADER, publish
+
+from .test_daemon import _wait_for
+
+
+@pytest.fixture
+def published(tmp_path, monkeypatch):
+    path = tmp_path / "run" / "ifaces"
+    monkeypatch.setattr(turrishw.utils, "PUBLISHED_IFACES", str(path))
+    monkeypatch.setattr(turrishw.publish, "_loaded", {})
+    return path
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    """Count parsing of published files"""
+    calls = []
+    loads = json.loads
+
+    def counted(data, **kwargs):
+        if isinstance(data, bytes):  # published payload
+            calls.append(data)
+        return loads(data, **kwargs)
+
+    monkeypatch.setattr(json, "loads", counted)
+    return calls
+
+
+@pytest.mark.parametrize("tar_root", ["omnia", "mox-ac-6.0-vlans"], indirect=True)
+def test_publish_and_load(tar_root, mock_pci_db, published, parsed):
+    with open(tar_root) as f:
+        expected = json.load(f)
+
+    generation = publish()
+    assert published.exists()
+    ifaces = turrishw.load_published_ifaces()
+    assert ifaces == expected
+    assert list(ifaces.keys()) == list(expected.keys())
+    assert turrishw.load_published_ifaces(["eth"]) == turrishw.get_ifaces(["eth"])
+    objects = turrishw.load_published_ifaces(as_objects=True)
+    detected = turrishw.get_ifaces(as_objects=True)
+    assert objects == detected
+    # parent is not compared by `==`
+    assert {name: iface.parent for name, iface in objects.items()} == {
+        name: iface.parent for name, iface in detected.items()
+    }
+    # file is parsed only once, callers get copies
+    assert len(parsed) == 1
+    ifaces[next(iter(ifaces))]["state"] = "modified"
+    assert turrishw.load_published_ifaces() == expected
+
+    # unchanged interfaces keep the generation
+    assert publish() == generation
+    assert turrishw.load_published_ifaces() == expected
+    assert len(parsed) == 1
+
+    changed = {name: {**data, "state": "down"} for name, data in expected.items()}
+    assert publish(changed) == generation + 1
+    assert turrishw.load_published_ifaces() == changed
+    assert len(parsed) == 2
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_load_fallback(tar_root, mock_pci_db, published):
+    expected = turrishw.get_ifaces()
+    fake = {"eth0": {**expected["eth2"], "slot": "fake"}}
+
+    # missing file
+    assert turrishw.load_published_ifaces() == expected
+
+    # stale file
+    publish(fake)
+    assert turrishw.load_published_ifaces() == fake
+    assert turrishw.load_published_ifaces(max_age=-1) == expected
+
+    # malformed files
+    data = published.read_bytes()
+    for broken in (b"", data[: PUBLISHED_HEADER.size - 1], data[:-1], b"X" + data[1:]):
+        published.write_bytes(broken)
+        turrishw.publish._loaded.clear()
+        assert turrishw.load_published_ifaces() == expected
+
+    # malformed file is replaced by publisher
+    publish(fake)
+    assert turrishw.load_published_ifaces() == fake
+
+
+@pytest.mark.parametrize("set_root", ["omnia"], indirect=True)
+def test_daemon_publishes(set_root, mock_pci_db, published, tmp_path):
+    with Daemon(str(tmp_path / "turrishw.sock"), interval=0.01, poll=True, publish_path=str(published)):
+        assert turrishw.load_published_ifaces() == turrishw.get_ifaces()
+        pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net/lan3/operstate").write_text("down\n")
+        _wait_for(lambda: turrishw.load_published_ifaces()["lan3"]["state"] == "down")
@@ -0,0 +1,78 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import logging
+
+import pytest
+
+import turrishw
+import turrishw.stats
+
+from .test_pciids import pci_db  # noqa: F401
+
+
+@pytest.mark.usefixtures("pci_db")
+@pytest.mark.parametrize("tar_root", ["omnia", "mox-ad-6.0-vlans"], indirect=True)
+def test_collect_stats(tar_root, caplog):
+    with open(tar_root) as f:
+        expected = json.load(f)
+
+    with caplog.at_level(logging.DEBUG, logger="turrishw.stats"):
+        with turrishw.collect_stats(log=True) as stats:
+            assert turrishw.get_ifaces() == expected
+    assert turrishw.stats._current is None
+
+    model = turrishw.get_model().lower()
+    assert {"model", f"classify.{model}", "enumerate", "vlans", "attributes", "serialize"} <= stats.phases.keys()
+    assert stats.calls[f"classify.{model}"] == 1
+    assert 0 < stats.phases[f"classify.{model}"] <= stats.total
+    # every interface is resolved to its device and its state is read at least
+    assert stats.io["resolve"] >= len(expected)
+    assert stats.io["open"] >= len(expected)
+    assert stats.io["listdir"] >= 1
+
+    vendors = sum(1 for e in expected.values() if e.get("vendor"))
+    assert stats.vendor_hits + stats.vendor_misses == vendors
+    assert ("vendor" in stats.phases) == (vendors > 0)
+    assert "Detection statistics: total" in caplog.text
+
+    # vendors are cached now
+    with turrishw.collect_stats() as stats:
+        turrishw.get_ifaces()
+    assert stats.vendor_hits == vendors
+    assert stats.vendor_hit_rate == (1.0 if vendors else None)
+
+
+@pytest.mark.parametrize("tar_root", ["omnia"], indirect=True)
+def test_collect_stats_backend(tar_root, mock_pci_db):
+    # files in memory are counted too, same as on the real filesystem
+    with turrishw.collect_stats() as stats:
+        turrishw.get_ifaces()
+    assert stats.io["open"] > 0 and stats.io["resolve"] > 0
+    assert stats.vendor_hit_rate is None  # lookup is mocked
+
+
+def test_disabled():
+    turrishw.stats.count("open")
+    with turrishw.stats.phase("model"):
+        pass
+    assert turrishw.stats._current is None
+
+    with turrishw.collect_stats() as outer:
+        with turrishw.collect_stats() as inner:
+            turrishw.stats.count("open")
+        turrishw.stats.count("stat")
+    assert (outer.io["open"], outer.io["stat"]) == (0, 1)
+    assert (inner.io["open"], inner.io["stat"]) == (1, 0)
@@ -0,0 +1,85 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import itertools
+import time
+
+import pytest
+
+import turrishw
+import turrishw.utils
+
+from .synthetic import Board, build
+
+BOARDS = [
+    Board("omnia"),
+    Board("omnia", vlans=3, modems=2, radios=3),
+    Board("omnia", modems=32),
+    Board("turris1x", vlans=2, modems=3, radios=2),
+    Board("omnia_ng", vlans=2, radios=5),
+    Board("mox", mox_modules=("sfp",)),
+    Board("mox", vlans=2, modems=2, radios=1, mox_modules=("pci", "topaz")),
+    Board("mox", vlans=1, radios=2, mox_modules=("pci", "peridot", "peridot", "topaz", "sfp")),
+]
+
+
+@pytest.fixture
+def synthetic_root(tmp_path, monkeypatch):
+    """Generate tree of the board and use it as root, return expected interfaces"""
+    roots = itertools.count()
+
+    def make(board: Board):
+        root = tmp_path / f"{next(roots)}-{board.name}"
+        expected = build(str(root), board)
+        monkeypatch.setattr(turrishw.utils, "TURRISHW_FILE_ROOT", str(root))
+        return expected
+
+    return make
+
+
+@pytest.mark.parametrize("board", BOARDS, ids=lambda e: e.name)
+def test_synthetic_board(board, synthetic_root, mock_pci_db):
+    expected = synthetic_root(board)
+    assert turrishw.get_ifaces() == expected
+
+
+def test_synthetic_invalid(tmp_path):
+    for board in [Board("omnia", radios=4), Board("omnia", mox_modules=("sfp",)), Board("mox", radios=2)]:
+        with pytest.raises(ValueError):
+            build(str(tmp_path), board)
+    assert not list(tmp_path.iterdir())
+
+
+def _best_time(repeat: int = 3) -> float:
+    res = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        turrishw.get_ifaces()
+        res.append(time.perf_counter() - start)
+    return min(res)
+
+
+def test_vlans_scaling(synthetic_root, mock_pci_db):
+    """Detection time grows linearly with number of VLANs
+
+    Omnia has 6 wired ports, so there are ~500 and ~4000 VLANs. Quadratic algorithm would be 64 times slower
+    on the larger tree, linear one 8 times, some slack is left for noise of the machine.
+    """
+    times = []
+    for vlans in (84, 667):
+        expected = synthetic_root(Board("omnia", vlans=vlans, modems=1, radios=3))
+        assert turrishw.get_ifaces() == expected
+        times.append(_best_time())
+
+    assert times[1] / times[0] < 24
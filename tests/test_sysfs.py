@@ -0,0 +1,146 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import os
+
+import pytest
+
+import turrishw
+import turrishw.fs
+import turrishw.sysfs
+from benchmarks.syscalls import WEIGHTS, SyscallCounter
+
+# Path based access used before the low level sysfs layer was introduced (weights of `SyscallCounter`):
+# file read by `open()` and `readline()`, link resolved by `Path.resolve()` (lstat of every path component).
+LEGACY_WEIGHTS = {
+    "read": WEIGHTS["open"],
+    "listdir": WEIGHTS["os.listdir"],
+    "list_links": WEIGHTS["os.listdir"],
+    "exists": WEIGHTS["os.stat"],
+    "is_dir": WEIGHTS["os.stat"],
+}
+
+
+def _legacy_syscalls(recorder: turrishw.fs.RecordingBackend) -> int:
+    """Estimate syscalls which path based access would need for the same file operations"""
+    total = 0
+    for op, path, count, _ in recorder.profile():
+        if op == "readlink":
+            weight = WEIGHTS["os.readlink"] + WEIGHTS["os.lstat"] * len(path.strip("/").split("/"))
+        else:
+            weight = LEGACY_WEIGHTS[op]
+        total += weight * count
+    return total
+
+
+@pytest.fixture
+def sys_root(tmp_path):
+    device = tmp_path / "sys/devices/platform/soc/f1034000.ethernet/net/eth2"
+    device.mkdir(parents=True)
+    (device / "operstate").write_bytes(b"up\n" + b"\x00" * 4093)
+    (device / "speed").write_bytes(b"\x00" * 4096)
+    (device / "address").write_text("d8:58:d7:00:92:9e\n")
+    (device / "queues").mkdir()
+    net = tmp_path / "sys/class/net"
+    net.mkdir(parents=True)
+    (net / "eth2").symlink_to("../../devices/platform/soc/f1034000.ethernet/net/eth2")
+    (net / "bonding_masters").write_text("\n")
+    turrishw.sysfs.forget_missing()
+    yield tmp_path
+    turrishw.sysfs.forget_missing()
+
+
+def test_list_and_resolve(sys_root):
+    net = str(sys_root / "sys/class/net")
+    assert turrishw.sysfs.list_links(net) == ["eth2"]
+    assert turrishw.sysfs.resolve_link(os.path.join(net, "eth2")) == str((sys_root / "sys/class/net/eth2").resolve())
+    assert turrishw.sysfs.resolve_link(os.path.join(net, "bonding_masters")) == os.path.join(net, "bonding_masters")
+
+
+@pytest.mark.parametrize("keep_open", [False, True])
+def test_net_dir_read(sys_root, keep_open):
+    net_dir = turrishw.sysfs.NetDir(str(sys_root / "sys/class/net/eth2"), keep_open=keep_open)
+
+    # same as `readline()` of the file
+    assert net_dir.read_line("operstate") == "up\n"
+    assert net_dir.read_line("speed") == "\x00" * 4096
+    assert net_dir.read_optional("address") == "d8:58:d7:00:92:9e\n"
+    assert net_dir.has_dir("queues")
+    assert not net_dir.has_dir("phy80211")
+    with pytest.raises(FileNotFoundError):
+        net_dir.read_line("device/vendor")
+    net_dir.close()
+
+
+def test_missing_attributes_are_cached(sys_root):
+    net_dir = turrishw.sysfs.NetDir(str(sys_root / "sys/class/net/eth2"), keep_open=True)
+    assert net_dir.read_optional("device/vendor") is None
+    assert not net_dir.has_dir("phy80211")
+
+    with SyscallCounter() as counter:
+        assert net_dir.read_optional("device/vendor") is None
+        assert not net_dir.has_dir("phy80211")
+    assert counter.total == 0
+
+    turrishw.sysfs.forget_missing()
+    with SyscallCounter() as counter:
+        assert net_dir.read_optional("device/vendor") is None
+    assert counter.total == 1
+    net_dir.close()
+
+
+def test_session_closes_directories(sys_root):
+    path = str(sys_root / "sys/class/net/eth2")
+    with turrishw.sysfs.session():
+        net_dir = turrishw.sysfs.net_dir(path)
+        with turrishw.sysfs.session():
+            assert turrishw.sysfs.net_dir(path) is net_dir
+            net_dir.read_line("operstate")
+        assert net_dir._fd is not None
+    assert net_dir._fd is None
+
+    # without session nothing is kept open
+    net_dir = turrishw.sysfs.net_dir(path)
+    net_dir.read_line("operstate")
+    assert net_dir._fd is None
+
+
+def test_session_run(sys_root):
+    path = str(sys_root / "sys/class/net/eth2")
+    session = turrishw.sysfs.Session()
+    net_dir = session.run(turrishw.sysfs.net_dir, path)
+    assert session.run(turrishw.sysfs.net_dir, path) is net_dir
+    # session is current only within `run()`
+    assert turrishw.sysfs.current_session() is None
+    assert turrishw.sysfs.net_dir(path) is not net_dir
+
+    net_dir.read_line("operstate")
+    assert net_dir._fd is not None
+    session.close()
+    assert net_dir._fd is None
+
+
+@pytest.mark.parametrize("set_root", ["omnia", "mox-abc-wwan-7.0", "turris-1.1-wwan-7.0"], indirect=True)
+def test_syscalls_count(set_root, mock_pci_db):
+    turrishw.sysfs.forget_missing()
+    with SyscallCounter() as counter:
+        expected = turrishw.get_ifaces()
+
+    # same detection through backend, which records file operations instead of doing them relative to open dirs
+    turrishw.sysfs.forget_missing()
+    with turrishw.record() as recorder:
+        assert turrishw.get_ifaces() == expected
+
+    # at least 40 % less syscalls than path based access
+    assert counter.total < _legacy_syscalls(recorder) * 0.6, counter.calls
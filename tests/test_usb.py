@@ -0,0 +1,66 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import shutil
+
+import pytest
+
+import turrishw
+import turrishw.usb
+import turrishw.utils
+
+MODEM = "sys/devices/platform/soc/soc:internal-regs@d0000000/d0058000.usb/usb3/3-1"
+
+
+def _set_driver(root: str, driver: str):
+    """Turn QMI modem wwan1 into modem with different driver"""
+    shutil.rmtree(os.path.join(root, MODEM, "3-1:1.4/net/wwan1/qmi"))
+    os.unlink(os.path.join(root, MODEM, "3-1:1.4/driver"))
+    os.symlink(f"../../../../../../../../bus/usb/drivers/{driver}", os.path.join(root, MODEM, "3-1:1.4/driver"))
+
+
+@pytest.mark.parametrize("tar_root", ["mox-abc-wwan-7.0"], indirect=True)
+def test_topology(tar_root):
+    root = turrishw.utils.TURRISHW_FILE_ROOT
+    topology = turrishw.usb.UsbTopology.scan(root)
+
+    iface_path = os.path.join(root, MODEM, "3-1:1.4/net/wwan1")
+    assert topology.control_device(iface_path) == "/dev/cdc-wdm1"
+    assert topology.serial_ports(iface_path) == ["/dev/ttyUSB1", "/dev/ttyUSB3", "/dev/ttyUSB5", "/dev/ttyUSB7"]
+    assert topology.control_device(os.path.join(root, "sys/devices/platform/soc/d0030000.ethernet/net/eth0")) is None
+
+
+@pytest.mark.parametrize("set_root", ["mox-abc-wwan-7.0"], indirect=True)
+def test_mbim_modem(set_root, mock_pci_db):
+    _set_driver(turrishw.utils.TURRISHW_FILE_ROOT, "cdc_mbim")
+    with open(set_root) as f:
+        expected = json.load(f)["wwan1"]
+    del expected["qmi_device"]
+    expected.update({"control_device": "/dev/cdc-wdm1", "wwan_protocol": "mbim"})
+
+    assert turrishw.get_ifaces()["wwan1"] == expected
+
+
+@pytest.mark.parametrize("set_root", ["mox-abc-wwan-7.0"], indirect=True)
+def test_ncm_modem_without_wdm(set_root, mock_pci_db):
+    root = turrishw.utils.TURRISHW_FILE_ROOT
+    _set_driver(root, "huawei_cdc_ncm")
+    os.unlink(os.path.join(root, "sys/class/usbmisc/cdc-wdm1"))
+
+    iface = turrishw.get_ifaces()["wwan1"]
+    assert iface["type"] == "wwan"
+    assert iface["control_device"] == "/dev/ttyUSB1"
+    assert iface["wwan_protocol"] == "ncm"
@@ -0,0 +1,191 @@
+# Copyright 2025, CZ.NIC z.s.p.o. (http://www.nic.cz/)
+#
+# TurrisHW is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# TurrisHW is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with TurrisHW.  If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+import pathlib
+import struct
+import threading
+import time
+
+import pytest
+
+import turrishw.utils
+from turrishw.interface import State
+from turrishw.watch import (
+    IFINFOMSG,
+    IFLA_IFNAME,
+    IFLA_OPERSTATE,
+    NLMSGHDR,
+    RTATTR,
+    RTM_DELLINK,
+    RTM_NEWLINK,
+    LinkWatcher,
+    parse_messages,
+)
+
+IF_OPER_DOWN = 2
+IF_OPER_UP = 6
+
+
+def link_message(name: str, operstate: int = IF_OPER_UP, index: int = 1, msg_type: int = RTM_NEWLINK) -> bytes:
+    def attr(attr_type: int, payload: bytes) -> bytes:
+        data = RTATTR.pack(RTATTR.size + len(payload), attr_type) + payload
+        return data + b"\x00" * (-len(data) % 4)
+
+    body = IFINFOMSG.pack(0, 1, index, 0, 0)
+    body += attr(IFLA_IFNAME, name.encode() + b"\x00")
+    body += attr(IFLA_OPERSTATE, bytes([operstate]))
+    return NLMSGHDR.pack(NLMSGHDR.size + len(body), msg_type, 0, 0, 0) + body
+
+
+class ReplaySource:
+    """Replays recorded netlink datagrams, timeout is reported when all datagrams were consumed"""
+
+    def __init__(self, datagrams):
+        self.datagrams = list(datagrams)
+        self.closed = False
+
+    def recv(self, timeout=None):
+        return self.datagrams.pop(0) if self.datagrams else None
+
+    def close(self):
+        self.closed = True
+
+
+class BlockingSource:
+    """No event ever comes, waiting without timeout blocks forever"""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def recv(self, timeout=None):
+        if timeout is None:
+            threading.Event().wait()
+        self.closed.wait(timeout)
+        return None
+
+    def close(self):
+        self.closed.set()
+
+
+def _write_sys(iface: str, attr: str, value: str):
+    path = pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net", iface, attr)
+    path.write_text(value + "\n")
+
+
+def test_parse_messages():
+    datagram = link_message("lan2", IF_OPER_UP, 5) + link_message("wwan0", IF_OPER_DOWN, 7, RTM_DELLINK)
+    # unrelated message (RTM_NEWADDR) is skipped
+    datagram += NLMSGHDR.pack(NLMSGHDR.size + 8, 20, 0, 0, 0) + b"\x00" * 8
+    events = parse_messages(datagram)
+
+    assert [(e.removed, e.index, e.name, e.state) for e in events] == [
+        (False, 5, "lan2", State.UP),
+        (True, 7, "wwan0", State.DOWN),
+    ]
+    # truncated message is dropped
+    assert [e.name for e in parse_messages(datagram[:-30])] == ["lan2"]
+    assert parse_messages(struct.pack("=I", 1000) + b"\x00" * 20) == []
+
+
+@pytest.mark.parametrize("set_root", ["omnia-lan2-flapping"], indirect=True)
+def test_watch_flapping_port_is_coalesced(set_root, mock_pci_db):
+    # port flapping - a lot of events for lan2 which end in `up` state
+    flaps = [link_message("lan2", state, 3) for state in [IF_OPER_UP, IF_OPER_DOWN] * 10 + [IF_OPER_UP]]
+    _write_sys("lan2", "speed", "100")
+
+    watcher = LinkWatcher(ReplaySource(flaps), coalesce=10)
+    assert watcher.interfaces["lan2"].state == State.DOWN
+
+    changes = list(watcher.events(timeout=0))
+    assert len(changes) == 1
+    assert changes[0].keys() == {"lan2"}
+    assert changes[0]["lan2"].state == State.UP
+    assert changes[0]["lan2"].link_speed == 100
+    assert watcher.interfaces["lan2"] is changes[0]["lan2"]
+
+
+@pytest.mark.parametrize("set_root", ["omnia-lan2-flapping"], indirect=True)
+def test_watch_callbacks(set_root, mock_pci_db):
+    datagrams = [
+        link_message("lan2", IF_OPER_DOWN),  # no change
+        link_message("br-lan", IF_OPER_UP),  # interface we don't track
+        link_message("lan3", IF_OPER_DOWN),
+        link_message("wwan0", IF_OPER_DOWN, msg_type=RTM_DELLINK),
+    ]
+    source = ReplaySource(datagrams)
+    received = []
+
+    with LinkWatcher(source, coalesce=0) as watcher:
+        watcher.add_callback(received.append)
+        watcher.run(timeout=0)
+
+        assert [{k: v and v.state for k, v in e.items()} for e in received] == [{"lan3": State.DOWN}, {"wwan0": None}]
+        assert "wwan0" not in watcher.interfaces
+
+    assert source.closed
+
+
+@pytest.mark.parametrize("set_root", ["omnia-lan2-flapping"], indirect=True)
+def test_watch_new_interface_rescan(set_root, mock_pci_db):
+    watcher = LinkWatcher(ReplaySource([]), coalesce=0)
+    del watcher.interfaces["wlan0"]
+    watcher._present.discard("wlan0")
+
+    watcher.source = ReplaySource([link_message("wlan0", IF_OPER_UP)])
+    changes = watcher.poll(timeout=0)
+    assert changes.keys() == {"wlan0"}
+    assert changes["wlan0"].type == "wifi"
+    assert watcher.poll(timeout=0) == {}
+
+
+@pytest.mark.parametrize("tar_root", ["omnia-lan2-flapping"], indirect=True)
+def test_watch_cancel_and_stop(tar_root, mock_pci_db):
+    watcher = LinkWatcher(BlockingSource(), coalesce=0)
+
+    async def consume():
+        async for _ in watcher.events_async():
+            pass
+
+    async def cancel():
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    # `asyncio.run()` waits for the executor thread too
+    start = time.monotonic()
+    asyncio.run(cancel())
+    assert time.monotonic() - start < 5
+
+    thread = threading.Thread(target=watcher.run)
+    thread.start()
+    time.sleep(0.1)
+    watcher.stop()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+@pytest.mark.parametrize("set_root", ["omnia-lan2-flapping"], indirect=True)
+def test_watch_rescan_forgets_missing(set_root, mock_pci_db):
+    path = str(pathlib.Path(turrishw.utils.TURRISHW_FILE_ROOT, "sys/class/net/lan2"))
+    watcher = LinkWatcher(ReplaySource([]), coalesce=0)
+    assert turrishw.sysfs.net_dir(path).read_optional("carrier_up_count") is None
+
+    # attribute appears (e.g. interface was re-created by another driver), it's remembered as missing until rescan
+    _write_sys("lan2", "carrier_up_count", "3")
+    assert turrishw.sysfs.net_dir(path).read_optional("carrier_up_count") is None
+    watcher.rescan()
+    assert turrishw.sysfs.net_dir(path).read_optional("carrier_up_count") == "3\n"
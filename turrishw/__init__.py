@@ -24,7 +24,56 @@
 # EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+from .identity import PlatformIdentity
 from .interface import Interface
-from .turrishw import get_ifaces, get_model
+from .turrishw import (
+    collect_stats,
+    configure_backend,
+    configure_cache,
+    configure_parallel,
+    get_ifaces,
+    get_model,
+    get_platform,
+    get_topology,
+    invalidate,
+    iter_interfaces,
+    record,
+    refresh_dynamic,
+)
 
-__all__ = ["get_model", "get_ifaces", "Interface"]
+__all__ = [
+    "get_model",
+    "get_platform",
+    "get_ifaces",
+    "get_topology",
+    "iter_interfaces",
+    "refresh_dynamic",
+    "configure_backend",
+    "configure_cache",
+    "configure_parallel",
+    "invalidate",
+    "collect_stats",
+    "record",
+    "Interface",
+    "PlatformIdentity",
+    "get_ifaces_async",
+    "get_topology_async",
+    "iter_interfaces_async",
+    "load_published_ifaces",
+]
+
+# asyncio API and reading of published interfaces are imported only when used, importing asyncio is expensive
+_LAZY_API = {
+    "get_ifaces_async": "aio",
+    "get_topology_async": "aio",
+    "iter_interfaces_async": "aio",
+    "load_published_ifaces": "publish",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_API:
+        import importlib
+
+        return getattr(importlib.import_module(f".{_LAZY_API[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,98 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""asyncio API
+
+Interfaces are classified in executor and then attributes of interfaces (state, link speed, vendor, ...)
+are read concurrently in batches of `batch_size` interfaces, so the event loop is never blocked by sysfs.
+Results are the same as results of the synchronous API.
+"""
+
+import asyncio
+import concurrent.futures
+import typing
+
+from . import stats, sysfs, turrishw, utils
+from .interface import Interface
+
+# maximal number of interfaces which attributes are read at once
+DEFAULT_BATCH_SIZE = 16
+
+
+async def _detect_interfaces(
+    executor: typing.Optional[concurrent.futures.Executor], batch_size: int
+) -> typing.List[Interface]:
+    loop = asyncio.get_running_loop()
+    # own session, the global one would be shared with (and closed by) detections running meanwhile
+    session = sysfs.Session()
+    try:
+        ifaces = await loop.run_in_executor(executor, session.run, turrishw._classify_interfaces)
+        with stats.phase("attributes"):
+            for stage in utils.attribute_plan(ifaces):
+                for start in range(0, len(stage), batch_size):
+                    batch = stage[start : start + batch_size]
+                    # wait for the whole batch even on error, so nothing reads from the session once it's closed
+                    results = await asyncio.gather(
+                        *(loop.run_in_executor(executor, session.run, call) for call in batch), return_exceptions=True
+                    )
+                    for res in results:
+                        if isinstance(res, BaseException):
+                            raise res
+    finally:
+        session.close()
+    return ifaces
+
+
+async def get_topology_async(
+    filter_types: typing.Optional[list[str]] = None,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> turrishw.Table:
+    """Same as `get_topology()`, blocking calls are made in `executor` (default executor of the loop by default)"""
+    if turrishw._cache.ttl > 0:
+        # cache has to serialize detection and refreshing, results are cheap anyway once it's filled
+        return await asyncio.get_running_loop().run_in_executor(executor, turrishw.get_topology, filter_types)
+    return turrishw._make_table(await _detect_interfaces(executor, max(batch_size, 1)), filter_types)
+
+
+async def iter_interfaces_async(
+    filter_types: typing.Optional[list[str]] = None,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> typing.AsyncIterator[Interface]:
+    """Iterate over detected interfaces sorted by name, same as `iter_interfaces()`"""
+    for iface in (await get_topology_async(filter_types, executor, batch_size)).values():
+        yield iface
+
+
+async def get_ifaces_async(
+    filter_types: typing.Optional[list[str]] = None,
+    as_objects: bool = False,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
+    """Same as `get_ifaces()` without blocking the event loop"""
+    return turrishw._output(await get_topology_async(filter_types, executor, batch_size), as_objects)
@@ -0,0 +1,184 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Classification of interfaces based on declarative description of the board
+
+Every board is described by `Profile`, ordered list of `Rule`s. Rule is selected by a marker
+(e.g. `f1072004.mdio`) found in the device path of the interface and says on which bus and slot
+the interface is. First matching rule wins, same as the `if/elif` chains it replaced.
+
+Rules are tried in order with plain substring checks of their literals (`marker` and `also`), which is
+cheaper than any regular expression over the whole profile. Only the `extract` expression of the selected
+rule is searched, expressions are compiled once per profile.
+"""
+
+import enum
+import functools
+import logging
+import re
+import typing
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from . import stats, utils
+from .interface import Interface
+
+
+class Action(str, enum.Enum):
+    IFACE = "iface"  # interface is reported
+    IGNORE = "ignore"  # interface is silently skipped (e.g. CPU ports connected to the switch)
+    VIRTUAL = "virtual"  # virtual interface, only VLANs of physical interfaces are reported
+
+
+@dataclass(frozen=True)
+class Rule:
+    marker: str  # literal part of the device path which selects the rule
+    bus: str = ""
+    slot: str = ""
+    type: typing.Optional[str] = None  # `None` means the type is detected from sysfs (wifi, wwan or eth)
+    action: Action = Action.IFACE
+    also: str = ""  # another literal part of the path, which has to be present too
+    # regex which has to match the path, otherwise the interface is skipped with `warning`
+    # its `slot` group (if any) is used as slot label, translated through `slot_map`
+    extract: str = ""
+    slot_map: typing.Mapping[str, str] = field(default_factory=dict)
+    warning: str = ""
+    label: bool = False  # slot label is read from device tree (`of_node/label`)
+    # changes of the rule based on the label, e.g. switch port labeled "SFP" is on the SFP module
+    label_overrides: typing.Mapping[str, typing.Mapping[str, typing.Any]] = field(default_factory=dict)
+    module: typing.Union[int, str] = 0  # Mox module, see `Context.module_seq()`
+    condition: str = ""  # board specific condition, see `Context.check()`
+    slot_path: bool = False  # report `slot_path`
+    usb_parent: bool = False  # use the device as parent of QMI modem
+
+
+class Context:
+    """Board specific state of classification (e.g. present Mox modules)"""
+
+    def module_seq(self, module: typing.Union[int, str], iface_name: str) -> int:
+        return module if isinstance(module, int) else 0
+
+    def check(self, condition: str) -> bool:
+        return True
+
+
+class Profile:
+    def __init__(self, name: str, rules: typing.Sequence[Rule], require_macaddr: bool = False):
+        self.name = name
+        self.rules = tuple(rules)
+        self.require_macaddr = require_macaddr  # skip interfaces without MAC address
+        self.logger = logging.getLogger(name)
+
+    @functools.cached_property
+    def _extracts(self) -> typing.Tuple[typing.Optional[re.Pattern], ...]:
+        return tuple(re.compile(rule.extract, re.DOTALL) if rule.extract else None for rule in self.rules)
+
+    def match(self, path: str) -> typing.Tuple[typing.Optional[Rule], typing.Optional[str], bool]:
+        """Find rule for the device path
+
+        Return the rule (`None` when nothing matches), extracted slot and whether extraction succeeded.
+        """
+        for idx, rule in enumerate(self.rules):
+            if rule.marker not in path or (rule.also and rule.also not in path):
+                continue
+            extract = self._extracts[idx]
+            if extract is None:
+                return rule, None, True
+            # extraction is optional, so rule is selected even when it fails and warning can be logged
+            m = extract.search(path)
+            if m is None:
+                return rule, None, False
+            return rule, m.groupdict().get("slot"), True
+        return None, None, False
+
+
+def _make_iface(
+    rule: Rule, iface_name: str, iface_abspath: Path, path: str, macaddr: str, slot: str, context: Context
+) -> typing.Optional[Interface]:
+    if rule.label:
+        slot = utils.get_iface_label(iface_name)
+        if slot in rule.label_overrides:
+            rule = replace(rule, **rule.label_overrides[slot])
+
+    if_type, wwan_protocol = (rule.type, None) if rule.type else utils.find_iface_type(iface_name)
+    return utils.make_iface(
+        iface_name,
+        if_type,
+        rule.bus,
+        slot,
+        macaddr,
+        slot_path=path if rule.slot_path else None,
+        parent_device_abs_path=iface_abspath if rule.usb_parent else None,
+        module_seq=context.module_seq(rule.module, iface_name),
+        wwan_protocol=wwan_protocol,
+    )
+
+
+def classify_interfaces(profile: Profile, context: typing.Optional[Context] = None) -> typing.List[Interface]:
+    """Classify interfaces of the board, attributes of interfaces (state, vendor, ...) are not read yet"""
+    context = context or Context()
+    logger = profile.logger
+    ifaces: typing.List[Interface] = []
+    virtual_ifaces: typing.List[typing.Dict[str, str]] = []
+    with stats.phase("enumerate"):
+        vlans = utils.get_vlan_interfaces()
+        iface_names = list(utils.get_ifaces())
+
+    # First pass - process the detected physical interfaces
+    for iface_name in iface_names:
+        iface_abspath: Path = utils.get_iface_device_path(iface_name)
+        path = str(iface_abspath)
+        macaddr = utils.get_iface_macaddr(iface_name)
+        if macaddr is None and profile.require_macaddr:
+            logger.warning("File 'address' is missing. Skipping interface '%s'", iface_name)
+            continue
+
+        rule, slot, extracted = profile.match(path)
+        if rule is None:
+            logger.warning("unknown interface type: %s", iface_name)
+        elif rule.action == Action.VIRTUAL:
+            # virtual ifaces (loopback, bridges, ...) - we don't care about these
+            #
+            # `utils.get_ifaces` can return interfaces in random order, so interfaces with VLAN assigned
+            # will be processed in second pass to ensure that its parent interface exists and is already processed.
+            if iface_name in vlans:
+                virtual_ifaces.append({"name": iface_name, "macaddr": macaddr})
+        elif rule.action == Action.IGNORE or not context.check(rule.condition):
+            pass
+        elif not extracted:
+            logger.warning(rule.warning)
+        else:
+            if slot is not None:
+                slot = rule.slot_map.get(slot) or slot
+            iface = _make_iface(rule, iface_name, iface_abspath, path, macaddr, slot or rule.slot, context)
+            if iface is not None:
+                ifaces.append(iface)
+
+    # Second pass - process virtual interfaces with VLAN assigned.
+    with stats.phase("vlans"):
+        vlan_ifaces = utils.make_vlan_interfaces(ifaces, virtual_ifaces, vlans)
+
+    return ifaces + vlan_ifaces
@@ -0,0 +1,220 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Command line interface of turrishw
+
+```
+turrishw [--json] [--type eth,wifi] [--iface NAME] [--watch [--interval SECONDS]]
+         [--record FILE | --snapshot FILE] [--stats]
+turrishw --daemon [--socket PATH] [--interval SECONDS] [--snapshot FILE] [--publish [FILE]]
+```
+
+In `--watch` mode interfaces are detected only once and then only their state and link speed
+is re-read every interval. Full detection runs again only when the set of interfaces changes.
+
+`--record` stores files read during the detection as small snapshot (e.g. for bug reports),
+which can be inspected later with `--snapshot`. `--stats` prints where the detection spent its time.
+
+`--daemon` keeps interfaces up to date in memory and serves them to other processes on Unix socket,
+see `turrishw.daemon`. `--publish` stores interfaces to file, which other processes read
+by `turrishw.load_published_ifaces()` (see `turrishw.publish`), daemon keeps the file up to date.
+"""
+
+import argparse
+import contextlib
+import json
+import signal
+import sys
+import time
+import typing
+
+from . import fs, turrishw, utils
+from .interface import Interface, State
+
+COLUMNS = ("name", "type", "bus", "slot", "state", "link_speed", "macaddr")
+
+
+def _parse_args(argv: typing.Optional[typing.List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="turrishw", description="Detect network interfaces of Turris router.")
+    parser.add_argument("--json", action="store_true", help="print interfaces as JSON")
+    parser.add_argument(
+        "--type",
+        type=lambda value: [e for e in value.split(",") if e],
+        help="show only interfaces of given types (comma separated, e.g. eth,wifi)",
+    )
+    parser.add_argument(
+        "--iface", action="append", metavar="NAME", help="show only given interface (can be used multiple times)"
+    )
+    parser.add_argument("--watch", action="store_true", help="keep running and print interfaces when they change")
+    parser.add_argument(
+        "--interval", type=float, default=1.0, metavar="SECONDS", help="how often to check interfaces in --watch mode"
+    )
+    snapshot = parser.add_mutually_exclusive_group()
+    snapshot.add_argument("--record", metavar="FILE", help="store files read during detection as snapshot")
+    snapshot.add_argument("--snapshot", metavar="FILE", help="read interfaces from snapshot (recorded or tarball)")
+    parser.add_argument("--stats", action="store_true", help="print statistics of detection to stderr")
+    parser.add_argument(
+        "--publish",
+        nargs="?",
+        const=utils.PUBLISHED_IFACES,
+        metavar="FILE",
+        help="publish interfaces for other processes (default: %(const)s)",
+    )
+    parser.add_argument("--daemon", action="store_true", help="serve interfaces to other processes on Unix socket")
+    parser.add_argument("--socket", metavar="PATH", help="socket of --daemon (default: /var/run/turrishw.sock)")
+    return parser.parse_args(argv)
+
+
+def _load_snapshot(path: str) -> fs.Backend:
+    if path.endswith((".tar", ".tar.gz", ".tgz")):
+        return fs.TarBackend(path)
+    return fs.MemoryBackend.load(path)
+
+
+def _select(table: turrishw.Table, names: typing.Optional[typing.List[str]]) -> turrishw.Table:
+    if names is None:
+        return table
+    return {name: iface for name, iface in table.items() if name in names}
+
+
+def _format(value: typing.Any) -> str:
+    return value.value if isinstance(value, State) else str(value)
+
+
+def _print_table(ifaces: typing.Iterable[Interface]):
+    rows = [[name.upper() for name in COLUMNS]]
+    rows.extend([_format(getattr(iface, name)) for name in COLUMNS] for iface in ifaces)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(COLUMNS))]
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths, strict=True)).rstrip())
+
+
+def _print_changes(changes: turrishw.Changes, as_json: bool):
+    if as_json:
+        print(json.dumps({name: iface and iface.to_dict() for name, iface in changes.items()}), flush=True)
+        return
+    for name, iface in changes.items():
+        if iface is None:
+            print(f"{name}: removed")
+        else:
+            print(f"{name}: {iface.state.value} {iface.link_speed}")
+    sys.stdout.flush()
+
+
+def _detect(args: argparse.Namespace) -> typing.Tuple[turrishw.Table, typing.Set[str]]:
+    # names of all interfaces in sysfs, the topology has to be detected again when they change
+    present = set(utils.get_ifaces())
+    return _select(turrishw.get_topology(args.type), args.iface), present
+
+
+def _watch(args: argparse.Namespace, table: turrishw.Table, present: typing.Set[str]):
+    while True:
+        time.sleep(args.interval)
+        if set(utils.get_ifaces()) != present:
+            new_table, present = _detect(args)
+            changes: turrishw.Changes = {name: None for name in table.keys() - new_table.keys()}
+            changes.update({name: iface for name, iface in new_table.items() if table.get(name) != iface})
+            table = new_table
+        else:
+            changes = turrishw.refresh_dynamic(table)
+        if changes:
+            _print_changes(changes, args.json)
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from .daemon import DEFAULT_SOCKET, Daemon
+
+    # interfaces in snapshot never change, there are no link events for them
+    daemon = Daemon(
+        args.socket or DEFAULT_SOCKET, args.interval, poll=args.snapshot is not None, publish_path=args.publish
+    )
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"turrishw: can't start daemon: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    if args.daemon:
+        return _serve(args)
+    with contextlib.ExitStack() as stack:
+        recorder = stack.enter_context(turrishw.record()) if args.record else None
+        detection = stack.enter_context(turrishw.collect_stats()) if args.stats else None
+        table, present = _detect(args)
+    if recorder is not None:
+        recorder.save(args.record)
+    if detection is not None:
+        print(f"turrishw: {detection}", file=sys.stderr)
+    if args.publish:
+        from . import publish
+
+        # all interfaces are published, not only the selected ones
+        ifaces = None if args.type or args.iface else {k: v.to_dict(parent=True) for k, v in table.items()}
+        try:
+            publish.publish(ifaces, args.publish)
+        except OSError as e:
+            print(f"turrishw: can't publish interfaces: {e}", file=sys.stderr)
+            return 1
+    missing = [name for name in args.iface or [] if name not in table]
+    if missing and not args.watch:
+        print(f"turrishw: unknown interface: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps({name: iface.to_dict() for name, iface in table.items()}, indent=2))
+    else:
+        _print_table(table.values())
+
+    if args.watch:
+        sys.stdout.flush()
+        try:
+            _watch(args, table, present)
+        except KeyboardInterrupt:
+            pass
+
+    return 0
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if not args.snapshot:
+        return _run(args)
+
+    try:
+        backend = _load_snapshot(args.snapshot)
+    except (OSError, ValueError) as e:
+        print(f"turrishw: can't load snapshot: {e}", file=sys.stderr)
+        return 1
+    turrishw.configure_backend(backend)
+    try:
+        return _run(args)
+    finally:
+        turrishw.configure_backend()
@@ -0,0 +1,162 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Traffic counters of detected interfaces attributed to physical ports
+
+All counters are read from `/proc/net/dev` at once (instead of files in `/sys/class/net/*/statistics/`)
+and stored into ring buffer of preallocated arrays, so sampling doesn't allocate any new objects
+for the values and rates are computed from the stored samples.
+
+```
+counters = Counters()  # interfaces detected by `get_topology()`
+counters.sample()
+time.sleep(1)
+counters.sample()
+counters.rate("LAN1", "rx_bytes")  # bytes per second received on port LAN1
+```
+"""
+
+import array
+import time
+import typing
+
+from . import fs, turrishw, utils
+from .interface import Interface
+
+# counters which are kept, see columns of `/proc/net/dev`
+FIELDS = ("rx_bytes", "rx_packets", "rx_errors", "rx_dropped", "tx_bytes", "tx_packets", "tx_errors", "tx_dropped")
+# column of `/proc/net/dev` (after the name of interface) of every field
+_COLUMNS = (0, 1, 2, 3, 8, 9, 10, 11)
+_FIELD_INDEX = {name: idx for idx, name in enumerate(FIELDS)}
+
+# number of samples kept by default
+DEFAULT_HISTORY = 60
+
+
+def port_labels(ifaces: typing.Iterable[Interface]) -> typing.Dict[str, str]:
+    """Label of physical port of every interface (name -> label)
+
+    Label is the slot of the interface (e.g. "LAN1", "SFP", "USB Front"), numeric slots are prefixed
+    by the bus ("PCI 1"), VLANs get their id appended ("LAN1.100"). Name of the interface is appended
+    to labels which would not be unique otherwise (e.g. two modems in the same slot of different Mox modules).
+    """
+    ifaces = sorted(ifaces, key=lambda e: e.sort_key)
+    labels = {}
+    for iface in ifaces:
+        label = f"{iface.bus.upper()} {iface.slot}" if iface.slot.isdigit() else iface.slot
+        if iface.vlan_id is not None:
+            label = f"{label}.{iface.vlan_id}"
+        labels[iface.name] = label
+
+    counts: typing.Dict[str, int] = {}
+    for label in labels.values():
+        counts[label] = counts.get(label, 0) + 1
+    return {name: label if counts[label] == 1 else f"{label} ({name})" for name, label in labels.items()}
+
+
+class Counters:
+    """Ring buffer of samples of traffic counters
+
+    ifaces: Interfaces to watch, interfaces detected by `get_topology()` by default.
+    size: Number of samples kept.
+    """
+
+    def __init__(self, ifaces: typing.Optional[typing.Iterable[Interface]] = None, size: int = DEFAULT_HISTORY):
+        if ifaces is None:
+            ifaces = turrishw.get_topology().values()
+        labels = port_labels(ifaces)
+        self.names: typing.Tuple[str, ...] = tuple(labels)
+        self.labels: typing.Tuple[str, ...] = tuple(labels.values())
+        self.size = max(size, 2)
+        self._positions = {name: idx for idx, name in enumerate(self.names)}
+        self._labels = {label: idx for idx, label in enumerate(self.labels)}
+        self._stride = len(self.names) * len(FIELDS)  # values of one sample
+        self._values = array.array("Q", bytes(8 * self.size * self._stride))
+        self._times = array.array("d", bytes(8 * self.size))
+        self._samples = 0  # number of samples taken so far
+
+    def __len__(self) -> int:
+        """Number of stored samples"""
+        return min(self._samples, self.size)
+
+    def sample(self, now: typing.Optional[float] = None):
+        """Read all counters from `/proc/net/dev` and store them as the latest sample
+
+        Counters of interfaces which are not present (anymore) are stored as zeros.
+        """
+        data = fs.get_backend().read(str(utils.inject_file_root("proc/net/dev")))
+        slot = self._samples % self.size
+        values, base, fields = self._values, slot * self._stride, len(FIELDS)
+        for idx in range(base, base + self._stride):
+            values[idx] = 0
+
+        # the first two lines are headers
+        for line in data.splitlines()[2:]:
+            name, _, columns = line.partition(":")
+            position = self._positions.get(name.strip())
+            if position is None:
+                continue
+            columns = columns.split()
+            offset = base + position * fields
+            for idx, column in enumerate(_COLUMNS):
+                values[offset + idx] = int(columns[column])
+
+        self._times[slot] = time.monotonic() if now is None else now
+        self._samples += 1
+
+    def _offset(self, label: str, field: str, age: int) -> int:
+        if not 0 <= age < len(self):
+            raise IndexError(f"sample {age} is not stored")
+        slot = (self._samples - 1 - age) % self.size
+        return slot * self._stride + self._labels[label] * len(FIELDS) + _FIELD_INDEX[field]
+
+    def value(self, label: str, field: str, age: int = 0) -> int:
+        """Counter `field` (see `FIELDS`) of port `label` in the latest sample (or in the sample `age` samples older)"""
+        return self._values[self._offset(label, field, age)]
+
+    def rate(self, label: str, field: str, window: int = 1) -> typing.Optional[float]:
+        """Change of counter per second between the latest sample and the sample `window` samples older
+
+        Return `None` when there are not enough samples. Counter which went down (e.g. interface was re-created)
+        is considered to be reset to zero.
+        """
+        window = min(window, len(self) - 1)
+        if window < 1:
+            return None
+        last, first = self._samples - 1, self._samples - 1 - window
+        elapsed = self._times[last % self.size] - self._times[first % self.size]
+        if elapsed <= 0:
+            return None
+        current, previous = self.value(label, field), self.value(label, field, window)
+        return (current - previous if current >= previous else current) / elapsed
+
+    def rates(self, window: int = 1) -> typing.Dict[str, typing.Dict[str, typing.Optional[float]]]:
+        """Rates of all counters of all ports (label -> field -> rate), see `rate()`"""
+        return {label: {field: self.rate(label, field, window) for field in FIELDS} for label in self.labels}
+
+    def totals(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """Counters of all ports in the latest sample (label -> field -> value)"""
+        return {label: {field: self.value(label, field) for field in FIELDS} for label in self.labels}
@@ -0,0 +1,326 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Daemon which keeps the table of interfaces in memory and serves it to other processes over Unix socket
+
+Interfaces are detected once and then kept up to date by link events from kernel (see `watch`),
+or by polling their state when rtnetlink is not available. Every client then gets the table
+without scanning sysfs on its own.
+
+Protocol is line based JSON, every request is one line and it is answered by one line:
+
+```
+> {"method": "get_ifaces", "filter_types": ["eth"]}
+< {"result": {"eth2": {"type": "eth", ...}}}
+> {"method": "rescan"}
+< {"result": null}
+> {"method": "unknown"}
+< {"error": "unknown method 'unknown'"}
+```
+
+With `"parents": true` the interfaces include `parent` of VLANs too (see `Interface.to_dict()`).
+Use `get_ifaces()` of this module as a drop-in replacement of `turrishw.get_ifaces()`.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+import typing
+
+from . import publish, sysfs, turrishw, utils
+from .interface import Interface, compatible_dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/var/run/turrishw.sock"
+# how often is the state of interfaces polled when link events are not available
+DEFAULT_INTERVAL = 1.0
+DEFAULT_TIMEOUT = 5.0
+MAX_REQUEST_SIZE = 65536
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def handle(self):
+        while line := self.rfile.readline(MAX_REQUEST_SIZE):
+            try:
+                request = json.loads(line)
+                response = {"result": self.server.daemon.call(request.get("method"), request)}
+            except (ValueError, AttributeError, TypeError) as e:
+                response = {"error": str(e)}
+            except OSError as e:
+                logger.warning("Failed to handle request: %s", e)
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, daemon: "Daemon"):
+        self.daemon = daemon
+        super().__init__(path, _Handler)
+
+
+class Daemon:
+    """Serve interfaces on Unix socket `path`
+
+    poll: Poll state of interfaces every `interval` seconds instead of waiting for link events.
+        Polling is used also when link events are not available (e.g. rtnetlink is not permitted).
+    source: Source of link events for `watch.LinkWatcher` (netlink socket by default).
+    publish_path: Publish interfaces also to this file, see `publish`.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SOCKET,
+        interval: float = DEFAULT_INTERVAL,
+        poll: bool = False,
+        source=None,
+        publish_path: typing.Optional[str] = None,
+    ):
+        self.path = path
+        self.interval = interval
+        self.poll = poll
+        self.source = source
+        self.publish_path = publish_path
+        self._published_at = 0.0
+        self._watcher = None
+        self._server: typing.Optional[_Server] = None
+        self._threads: typing.List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()  # interrupts waiting for the next poll
+        self._lock = threading.Lock()
+        self._rescan_requests: typing.List[threading.Event] = []
+        # Table is updated only by the thread of updates. Published table (name -> interface dict sorted by name)
+        # is replaced as a whole and never modified, so it is served without locking.
+        self._ifaces: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._working: turrishw.Table = {}  # table updated by polling
+        self._present: typing.Set[str] = set()
+
+    def _set_table(self, ifaces: typing.Iterable[Interface]):
+        table = turrishw._make_table(list(ifaces), None)
+        self._ifaces = {name: iface.to_dict(parent=True) for name, iface in table.items()}
+        self._write_published()
+
+    def _write_published(self):
+        if self.publish_path is None:
+            return
+        try:
+            publish.publish(self._ifaces, self.publish_path)
+        except OSError as e:
+            logger.warning("Failed to publish interfaces to '%s': %s", self.publish_path, e)
+        self._published_at = time.monotonic()
+
+    def _rescan(self):
+        if self._watcher is not None:
+            self._watcher.rescan()
+            self._set_table(self._watcher.interfaces.values())
+        else:
+            sysfs.forget_missing()  # same as `LinkWatcher.rescan()`
+            self._present = set(utils.get_ifaces())
+            self._working = {e.name: e for e in turrishw._detect_interfaces()}
+            self._set_table(self._working.values())
+
+    def _update(self, timeout: float) -> bool:
+        """Wait for changes of interfaces (at most `timeout` seconds) and publish them"""
+        if self._watcher is not None:
+            changes = self._watcher.poll(timeout)
+            if changes:
+                self._set_table(self._watcher.interfaces.values())
+            return bool(changes)
+
+        if self._wakeup.wait(timeout):
+            self._wakeup.clear()
+            return False
+        if set(utils.get_ifaces()) != self._present:
+            self._rescan()
+            return True
+        if turrishw.refresh_dynamic(self._working):
+            self._set_table(self._working.values())
+            return True
+        return False
+
+    def _run_updates(self):
+        while not self._stop.is_set():
+            with self._lock:
+                requests, self._rescan_requests = self._rescan_requests, []
+            try:
+                if requests:
+                    self._rescan()
+                elif not self._update(self.interval) and time.monotonic() - self._published_at >= publish.HEARTBEAT:
+                    self._write_published()  # file is rewritten, so readers don't consider it stale
+            except OSError as e:
+                logger.warning("Failed to update interfaces: %s", e)
+                self._stop.wait(self.interval)
+            except Exception:
+                # bug or unexpected content of sysfs, keep serving the last table and try again later
+                logger.exception("Failed to update interfaces")
+                self._stop.wait(self.interval)
+            finally:
+                for done in requests:
+                    done.set()
+
+    def rescan(self, timeout: typing.Optional[float] = None) -> bool:
+        """Detect interfaces again (e.g. after hardware change), return whether it was done within `timeout`"""
+        done = threading.Event()
+        with self._lock:
+            self._rescan_requests.append(done)
+        self._wakeup.set()
+        return done.wait(timeout)
+
+    def call(self, method: typing.Optional[str], params: typing.Mapping[str, typing.Any]) -> typing.Any:
+        """Handle request of a client"""
+        if method == "get_ifaces":
+            filter_types = params.get("filter_types")
+            ifaces = self._ifaces
+            if filter_types is not None:
+                ifaces = {name: iface for name, iface in ifaces.items() if iface["type"] in filter_types}
+            if params.get("parents"):
+                return ifaces
+            return {name: compatible_dict(iface) for name, iface in ifaces.items()}
+        if method == "rescan":
+            if not self.rescan(self.interval + DEFAULT_TIMEOUT):
+                raise TimeoutError("rescan takes too long")
+            return None
+        raise ValueError(f"unknown method '{method}'")
+
+    def _bind(self):
+        try:
+            if stat.S_ISSOCK(os.lstat(self.path).st_mode):
+                os.unlink(self.path)  # leftover of previous run
+        except FileNotFoundError:
+            pass
+        self._server = _Server(self.path, self)
+
+    def start(self):
+        """Detect interfaces and start serving them in background threads"""
+        if not self.poll:
+            from .watch import LinkWatcher
+
+            try:
+                self._watcher = LinkWatcher(self.source, coalesce=0.05)
+            except OSError as e:
+                logger.warning("Link events are not available, polling state of interfaces: %s", e)
+        if self._watcher is not None:
+            self._set_table(self._watcher.interfaces.values())
+        else:
+            self._rescan()
+
+        self._bind()
+        self._stop.clear()
+        self._wakeup.clear()
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="turrishw-server", daemon=True),
+            threading.Thread(target=self._run_updates, name="turrishw-updates", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        with self._lock:
+            requests, self._rescan_requests = self._rescan_requests, []
+        for done in requests:
+            done.set()
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def serve_forever(self):
+        """Serve until `stop()` is called (from another thread) or until interrupted"""
+        self.start()
+        try:
+            self._stop.wait()
+        finally:
+            self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def call(method: str, path: str = DEFAULT_SOCKET, timeout: float = DEFAULT_TIMEOUT, **params) -> typing.Any:
+    """Send request to the daemon, raise `OSError` when the daemon is not reachable
+    and `RuntimeError` when it reports an error
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps({"method": method, **params}).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionResetError(f"Daemon on '{path}' closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+
+def get_ifaces(
+    filter_types: typing.Optional[list[str]] = None,
+    as_objects: bool = False,
+    path: str = DEFAULT_SOCKET,
+    timeout: float = DEFAULT_TIMEOUT,
+    fallback: bool = False,
+):
+    """Same as `turrishw.get_ifaces()`, interfaces are obtained from the daemon
+
+    fallback: Detect interfaces in this process when the daemon is not running.
+    """
+    try:
+        ifaces = call("get_ifaces", path, timeout, filter_types=filter_types, parents=as_objects)
+    except OSError as e:
+        if not fallback:
+            raise
+        logger.debug("Daemon on '%s' is not available, detecting interfaces: %s", path, e)
+        return turrishw.get_ifaces(filter_types, as_objects)
+
+    if as_objects:
+        return {name: Interface.from_dict(name, data) for name, data in ifaces.items()}
+    return ifaces
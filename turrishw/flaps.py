@@ -0,0 +1,175 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Detection of flapping links based on carrier change counters of interfaces
+
+Instead of polling the state of interfaces rapidly, `carrier_changes` (number of link changes since
+the interface was created) is sampled. Only physical interfaces are watched and their directories
+are kept open between samples, so every sample costs a single `openat()`, `read()` and `close()`
+per interface and counter. `carrier_up_count` and `carrier_down_count` are read when the kernel has them.
+
+```
+detector = FlapDetector()  # interfaces detected by `get_topology()`
+while True:
+    detector.sample()
+    for label in detector.flapping():
+        print(label, detector.report()[label].changes_per_minute)
+    time.sleep(1)
+```
+"""
+
+import array
+import time
+import typing
+
+from . import sysfs, turrishw, utils
+from .counters import port_labels
+from .interface import Interface
+
+# number of samples kept by default
+DEFAULT_HISTORY = 60
+# link is flapping when it changes at least this many times per minute (i.e. goes down and up 3 times)
+DEFAULT_THRESHOLD = 6.0
+
+
+class PortFlaps(typing.NamedTuple):
+    name: str  # interface
+    carrier_changes: int  # in the latest sample
+    changes: int  # within the stored samples
+    changes_per_minute: typing.Optional[float]  # `None` until there are at least two samples
+    last_change: typing.Optional[float]  # time of the sample which noticed the last change, `None` if not seen
+    up_count: typing.Optional[int] = None  # `None` when not supported by the kernel
+    down_count: typing.Optional[int] = None
+
+
+def _read_counter(net_dir: sysfs.NetDir, attr: str) -> typing.Optional[int]:
+    value = net_dir.read_optional(attr)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class FlapDetector:
+    """Samples of carrier changes of physical interfaces kept in ring buffer
+
+    ifaces: Interfaces to watch (VLANs are skipped), interfaces detected by `get_topology()` by default.
+    size: Number of samples kept, flap rate is computed over all of them.
+    """
+
+    def __init__(self, ifaces: typing.Optional[typing.Iterable[Interface]] = None, size: int = DEFAULT_HISTORY):
+        if ifaces is None:
+            ifaces = turrishw.get_topology().values()
+        labels = port_labels(e for e in ifaces if e.vlan_id is None)
+        self.names: typing.Tuple[str, ...] = tuple(labels)
+        self.labels: typing.Tuple[str, ...] = tuple(labels.values())
+        self.size = max(size, 2)
+        self._dirs = [
+            sysfs.NetDir(str(utils.inject_file_root("sys/class/net", name)), keep_open=True) for name in self.names
+        ]
+        count = len(self.names)
+        self._changes = array.array("Q", bytes(8 * self.size * count))  # carrier_changes of every sample
+        # whether the counter was already read in the sample (or before it), there is no baseline until then
+        self._valid = array.array("B", bytes(self.size * count))
+        self._times = array.array("d", bytes(8 * self.size))
+        self._samples = 0
+        self._last_change: typing.List[typing.Optional[float]] = [None] * count
+        self._up_down: typing.List[typing.Tuple[typing.Optional[int], typing.Optional[int]]] = [(None, None)] * count
+
+    def __len__(self) -> int:
+        """Number of stored samples"""
+        return min(self._samples, self.size)
+
+    def sample(self, now: typing.Optional[float] = None):
+        """Read carrier counters of all interfaces, counters of interfaces which can't be read are kept"""
+        now = time.monotonic() if now is None else now
+        count = len(self.names)
+        slot, previous = (self._samples % self.size) * count, ((self._samples - 1) % self.size) * count
+        for idx, net_dir in enumerate(self._dirs):
+            baseline = self._samples and self._valid[previous + idx]
+            last = self._changes[previous + idx] if baseline else 0
+            try:
+                changes = int(net_dir.read_line("carrier_changes"))
+                self._up_down[idx] = (
+                    _read_counter(net_dir, "carrier_up_count"),
+                    _read_counter(net_dir, "carrier_down_count"),
+                )
+            except (OSError, ValueError):
+                # interface is gone, directory is opened again on the next sample in case it's re-created
+                net_dir.close()
+                changes = None
+            if changes is None:
+                self._changes[slot + idx] = last
+                self._valid[slot + idx] = baseline
+                continue
+            if baseline and changes != last:
+                self._last_change[idx] = now
+            self._changes[slot + idx] = changes
+            self._valid[slot + idx] = 1
+        self._times[self._samples % self.size] = now
+        self._samples += 1
+
+    def _changes_between(self, idx: int, first: int, last: int) -> int:
+        count, total = len(self.names), 0
+        for sample in range(first, last):
+            if not self._valid[(sample % self.size) * count + idx]:
+                continue  # the next sample is the first one with the counter read, it's just the baseline
+            before = self._changes[(sample % self.size) * count + idx]
+            after = self._changes[((sample + 1) % self.size) * count + idx]
+            total += after - before if after >= before else after  # counter was reset by re-creating interface
+        return total
+
+    def report(self) -> typing.Dict[str, PortFlaps]:
+        """Flaps of every port (label -> flaps) within the stored samples"""
+        last, first = self._samples - 1, self._samples - len(self)
+        elapsed = self._times[last % self.size] - self._times[first % self.size] if len(self) > 1 else 0.0
+        count = len(self.names)
+        res = {}
+        for idx, (name, label) in enumerate(zip(self.names, self.labels, strict=True)):
+            changes = self._changes_between(idx, first, last)
+            res[label] = PortFlaps(
+                name,
+                self._changes[(last % self.size) * count + idx] if self._samples else 0,
+                changes,
+                changes * 60 / elapsed if elapsed > 0 else None,
+                self._last_change[idx],
+                *self._up_down[idx],
+            )
+        return res
+
+    def flapping(self, threshold: float = DEFAULT_THRESHOLD) -> typing.List[str]:
+        """Labels of ports which changed at least `threshold` times per minute"""
+        return [label for label, e in self.report().items() if (e.changes_per_minute or 0) >= threshold]
+
+    def close(self):
+        for net_dir in self._dirs:
+            net_dir.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,532 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Access to files of the router (sysfs, procfs, ...) through replaceable backend
+
+Files are read from the real filesystem by default (`OsBackend`). Snapshots of routers can be read
+directly from tarball (`TarBackend`) or from dict (`MemoryBackend`) without extracting them to disk.
+`RecordingBackend` records files which are actually read, so they can be stored as small snapshot
+and replayed later (`MemoryBackend.load()`).
+
+Backends get absolute paths (including root of the router, see `utils.TURRISHW_FILE_ROOT`)
+and raise `OSError` same as the functions of `os` module would.
+"""
+
+import abc
+import errno
+import fnmatch
+import os
+import threading
+import time
+import typing
+
+from . import stats
+
+# sysfs attributes are at most one page long
+READ_SIZE = 4096
+# same as the kernel
+MAX_SYMLINKS = 40
+# version of snapshot file format, see `RecordingBackend.save()`
+SNAPSHOT_VERSION = 1
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class Backend(abc.ABC):
+    """Interface of backends, paths are strings"""
+
+    root: typing.Optional[str] = None  # root of the router in the backend, `None` when it's not known
+
+    @abc.abstractmethod
+    def read(self, path: str, size: int = -1) -> str:
+        """Read the whole file (or at most `size` bytes of it)"""
+
+    def read_first_line(self, path: str) -> str:
+        """Read the first line of file including the line break, same as `readline()` would"""
+        data = self.read(path)
+        end = data.find("\n")
+        return data if end < 0 else data[: end + 1]
+
+    @abc.abstractmethod
+    def readlink(self, path: str) -> str: ...
+
+    @abc.abstractmethod
+    def listdir(self, path: str) -> typing.List[str]: ...
+
+    @abc.abstractmethod
+    def list_links(self, path: str) -> typing.List[str]:
+        """Names of symlinks in directory"""
+
+    @abc.abstractmethod
+    def exists(self, path: str) -> bool: ...
+
+    @abc.abstractmethod
+    def is_dir(self, path: str) -> bool: ...
+
+    def resolve_link(self, path: str) -> str:
+        """Resolve sysfs link (e.g. class link `/sys/class/net/eth0`) to the absolute path of device
+
+        Targets of sysfs links are real directories, so it is enough to normalize the target relative to the link.
+        """
+        stats.count("resolve")
+        try:
+            target = self.readlink(path)
+        except OSError as e:
+            if e.errno != errno.EINVAL:  # EINVAL - not a symlink
+                raise
+            return os.path.normpath(path)
+        return os.path.normpath(os.path.join(os.path.dirname(path), target))
+
+    def glob(self, path: str, pattern: str) -> typing.List[str]:
+        """Names of files in directory matching shell-style `pattern`"""
+        return fnmatch.filter(self.listdir(path), pattern)
+
+
+class OsBackend(Backend):
+    """Real filesystem
+
+    - directories are listed with `os.scandir()`, symlinks are recognized by d_type without additional `lstat()`
+    - class links are resolved with single `readlink()`
+    """
+
+    def read(self, path: str, size: int = -1) -> str:
+        stats.count("open")
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            if size >= 0:
+                data = os.read(fd, size)
+            else:
+                chunks = []
+                while chunk := os.read(fd, READ_SIZE):
+                    chunks.append(chunk)
+                data = b"".join(chunks)
+        finally:
+            os.close(fd)
+        return data.decode("utf-8", errors="replace")
+
+    def readlink(self, path: str) -> str:
+        stats.count("readlink")
+        return os.readlink(path)
+
+    def listdir(self, path: str) -> typing.List[str]:
+        stats.count("listdir")
+        return os.listdir(path)
+
+    def list_links(self, path: str) -> typing.List[str]:
+        stats.count("listdir")
+        with os.scandir(path) as it:
+            return [e.name for e in it if e.is_symlink()]
+
+    def exists(self, path: str) -> bool:
+        stats.count("stat")
+        return os.path.exists(path)
+
+    def is_dir(self, path: str) -> bool:
+        stats.count("stat")
+        return os.path.isdir(path)
+
+
+class Link(typing.NamedTuple):
+    """Symlink in `MemoryBackend`"""
+
+    target: str
+
+
+# file content, symlink or directory (`None`)
+Node = typing.Union[str, bytes, Link, None]
+
+
+def _error(code: int, path: str) -> OSError:
+    return OSError(code, os.strerror(code), path)
+
+
+class MemoryBackend(Backend):
+    """Tree of files kept in memory
+
+    files: Path relative to the root -> node, parent directories are created automatically, e.g.
+        `{"sys/class/net/eth0": Link("../../devices/virtual/net/eth0"), "sys/devices/virtual/net/eth0/mtu": "1500\\n"}`
+    root: Path under which is the tree available, use it as root of the router.
+        Absolute symlinks in the tree are relative to this root.
+    """
+
+    def __init__(self, files: typing.Mapping[str, Node], root: str = "/"):
+        self.root = os.path.normpath(root)
+        self._nodes: typing.Dict[str, Node] = {"": None}
+        self._children: typing.Dict[str, typing.Dict[str, None]] = {"": {}}  # dict keeps order of insertion
+        for path, node in files.items():
+            self.add(path, node)
+
+    def add(self, path: str, node: Node):
+        """Add (or replace) file, symlink or directory"""
+        path = os.path.normpath(path).strip("/")
+        if path in ("", "."):
+            return
+        parent, name = os.path.split(path)
+        if parent not in self._nodes:
+            self.add(parent, None)
+        elif self._nodes[parent] is not None:
+            raise ValueError(f"'{parent}' is not a directory")
+        self._children[parent][name] = None
+        self._nodes[path] = node
+        if node is None:
+            self._children.setdefault(path, {})
+
+    def _relative(self, path: str) -> str:
+        # path is not normalized, `..` after symlink has to be resolved against the target of the symlink
+        prefix = self.root.rstrip("/") + "/"
+        if path.rstrip("/") == self.root.rstrip("/"):
+            return ""
+        if not path.startswith(prefix):
+            raise _error(errno.ENOENT, path)
+        return path[len(prefix) :]
+
+    def _lookup(self, path: str, follow: bool = True) -> typing.Tuple[str, Node]:
+        """Find node on the path, symlinks are followed (the last component only when `follow` is set)"""
+        parts = [e for e in self._relative(path).split("/") if e and e != "."]
+        parts.reverse()  # stack of components to process
+        resolved: typing.List[str] = []
+        links = 0
+        node: Node = None
+        while parts:
+            part = parts.pop()
+            if part == "..":
+                if resolved:
+                    resolved.pop()
+                node = None
+                continue
+
+            key = "/".join(resolved + [part])
+            if key not in self._nodes:
+                raise _error(errno.ENOENT, path)
+            node = self._nodes[key]
+            if isinstance(node, Link) and (parts or follow):
+                links += 1
+                if links > MAX_SYMLINKS:
+                    raise _error(errno.ELOOP, path)
+                if node.target.startswith("/"):
+                    resolved = []
+                parts.extend(reversed([e for e in node.target.split("/") if e and e != "."]))
+                node = None
+                continue
+            if parts and node is not None:
+                raise _error(errno.ENOTDIR, path)
+            resolved.append(part)
+
+        key = "/".join(resolved)
+        return key, self._nodes[key]
+
+    def read(self, path: str, size: int = -1) -> str:
+        stats.count("open")
+        _, node = self._lookup(path)
+        if node is None:
+            raise _error(errno.EISDIR, path)
+        data = node.encode() if isinstance(node, str) else node
+        return (data if size < 0 else data[:size]).decode("utf-8", errors="replace")
+
+    def readlink(self, path: str) -> str:
+        stats.count("readlink")
+        _, node = self._lookup(path, follow=False)
+        if not isinstance(node, Link):
+            raise _error(errno.EINVAL, path)
+        return node.target
+
+    def listdir(self, path: str) -> typing.List[str]:
+        stats.count("listdir")
+        key, node = self._lookup(path)
+        if node is not None:
+            raise _error(errno.ENOTDIR, path)
+        return list(self._children[key])
+
+    def list_links(self, path: str) -> typing.List[str]:
+        stats.count("listdir")
+        key, node = self._lookup(path)
+        if node is not None:
+            raise _error(errno.ENOTDIR, path)
+        prefix = f"{key}/" if key else ""
+        return [e for e in self._children[key] if isinstance(self._nodes[prefix + e], Link)]
+
+    def exists(self, path: str) -> bool:
+        stats.count("stat")
+        try:
+            self._lookup(path)
+        except OSError:
+            return False
+        return True
+
+    def is_dir(self, path: str) -> bool:
+        stats.count("stat")
+        try:
+            return self._lookup(path)[1] is None
+        except OSError:
+            return False
+
+    @classmethod
+    def load(cls, path: str, root: typing.Optional[str] = None) -> "MemoryBackend":
+        """Load snapshot stored by `RecordingBackend.save()`, tree is available under the path of the file by default"""
+        import json
+
+        with open(path, "rb") as f:
+            data = f.read()
+        if data.startswith(GZIP_MAGIC):
+            import gzip
+
+            data = gzip.decompress(data)
+        snapshot = json.loads(data)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version: {snapshot.get('version')}")
+
+        files: typing.Dict[str, Node] = {}
+        for directory in snapshot["dirs"]:
+            files[directory] = None
+        for link, target in snapshot["links"].items():
+            files[link] = Link(target)
+        files.update(snapshot["files"])
+        return cls(dict(sorted(files.items())), root or os.path.abspath(path))
+
+
+class TarBackend(MemoryBackend):
+    """Snapshot of the router in tarball (e.g. `tests/tests_roots/omnia.tar.gz`)
+
+    The whole tarball is read into memory at once, compressed tarballs can't be read at random offsets efficiently.
+    Tree is available under the path of the tarball by default, so snapshots don't share caches with each other.
+    """
+
+    def __init__(self, path: str, root: typing.Optional[str] = None):
+        import tarfile  # imported only when needed, it is slow to import
+
+        super().__init__({}, root or os.path.abspath(path))
+        with tarfile.open(path) as tar:
+            for member in tar:
+                if member.isdir():
+                    self.add(member.name, None)
+                elif member.issym():
+                    self.add(member.name, Link(member.linkname))
+                elif member.islnk():
+                    # hard link to previous member of the archive
+                    self.add(member.name, self._nodes.get(os.path.normpath(member.linkname).strip("/"), b""))
+                elif member.isfile():
+                    self.add(member.name, tar.extractfile(member).read())
+
+
+class RecordingBackend(Backend):
+    """Record files under `root` which are read through `backend` (paths, symlinks and contents)
+
+    Everything is stored at its real path (symlinks in the path are resolved and recorded),
+    so the recorded tree can be replayed by `MemoryBackend` exactly as it was read.
+    Number of operations and time spent in them are counted for every path, see `profile()`.
+    """
+
+    def __init__(self, backend: Backend, root: str):
+        self.backend = backend
+        self.root = os.path.normpath(root)
+        self._lock = threading.Lock()
+        self._files: typing.Dict[str, str] = {}
+        self._links: typing.Dict[str, typing.Optional[str]] = {}  # `None` - path is not a symlink
+        self._dirs: typing.Dict[str, typing.Set[str]] = {}
+        self._stats: typing.Dict[typing.Tuple[str, str], typing.List[float]] = {}  # (op, path) -> [count, seconds]
+
+    def _relative(self, path: str) -> typing.Optional[str]:
+        if path.rstrip("/") == self.root.rstrip("/"):
+            return ""
+        prefix = self.root.rstrip("/") + "/"
+        return path[len(prefix) :] if path.startswith(prefix) else None
+
+    def _link(self, rel: str) -> typing.Optional[str]:
+        if rel not in self._links:
+            try:
+                target: typing.Optional[str] = self.backend.readlink(os.path.join(self.root, rel))
+            except OSError:
+                target = None  # not a symlink or it doesn't exist
+            with self._lock:
+                self._links[rel] = target
+        return self._links[rel]
+
+    def _real(self, rel: str, follow: bool = True) -> str:
+        """Resolve symlinks in the path relative to root, symlinks on the way are recorded"""
+        parts = [e for e in rel.split("/") if e]
+        parts.reverse()
+        resolved: typing.List[str] = []
+        links = 0
+        while parts:
+            part = parts.pop()
+            if part == ".":
+                continue
+            if part == "..":
+                if resolved:
+                    resolved.pop()
+                continue
+            current = "/".join(resolved + [part])
+            target = self._link(current) if parts or follow else None
+            if target is None or links >= MAX_SYMLINKS:
+                resolved.append(part)
+                continue
+            links += 1
+            if target.startswith("/"):
+                resolved = []
+            parts.extend(reversed(target.split("/")))
+        return "/".join(resolved)
+
+    def _call(self, op: str, path: str, func: typing.Callable[[], typing.Any]) -> typing.Any:
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            elapsed = time.perf_counter() - start
+            rel = self._relative(path)
+            with self._lock:
+                stat = self._stats.setdefault((op, path if rel is None else rel), [0, 0.0])
+                stat[0] += 1
+                stat[1] += elapsed
+
+    def _add_dir(self, real: str, names: typing.Iterable[str] = ()):
+        with self._lock:
+            self._dirs.setdefault(real, set()).update(names)
+
+    def read(self, path: str, size: int = -1) -> str:
+        data = self._call("read", path, lambda: self.backend.read(path, size))
+        rel = self._relative(path)
+        if rel is not None:
+            real = self._real(rel)
+            with self._lock:
+                self._files[real] = data
+        return data
+
+    def readlink(self, path: str) -> str:
+        target = self._call("readlink", path, lambda: self.backend.readlink(path))
+        rel = self._relative(path)
+        if rel is not None:
+            real = self._real(rel, follow=False)
+            with self._lock:
+                self._links[real] = target
+        return target
+
+    def listdir(self, path: str) -> typing.List[str]:
+        names = self._call("listdir", path, lambda: self.backend.listdir(path))
+        rel = self._relative(path)
+        if rel is not None:
+            self._add_dir(self._real(rel), names)
+        return names
+
+    def list_links(self, path: str) -> typing.List[str]:
+        names = self._call("list_links", path, lambda: self.backend.list_links(path))
+        rel = self._relative(path)
+        if rel is not None:
+            real = self._real(rel)
+            self._add_dir(real)
+            for name in names:
+                self._link(f"{real}/{name}" if real else name)  # listed symlinks have to be symlinks in replay too
+        return names
+
+    def exists(self, path: str) -> bool:
+        res = self._call("exists", path, lambda: self.backend.exists(path))
+        rel = self._relative(path)
+        if res and rel is not None:
+            real = self._real(rel)
+            if self.backend.is_dir(path):
+                self._add_dir(real)
+            else:
+                with self._lock:
+                    self._files.setdefault(real, "")
+        return res
+
+    def is_dir(self, path: str) -> bool:
+        res = self._call("is_dir", path, lambda: self.backend.is_dir(path))
+        rel = self._relative(path)
+        if rel is not None and (res or self.backend.exists(path)):
+            real = self._real(rel)
+            if res:
+                self._add_dir(real)
+            else:
+                with self._lock:
+                    self._files.setdefault(real, "")
+        return res
+
+    def profile(self, by_attribute: bool = False) -> typing.List[typing.Tuple[str, str, int, float]]:
+        """Return (operation, path, count, seconds) sorted by time spent, the slowest first
+
+        by_attribute: Sum up paths with the same name, e.g. `operstate` of all interfaces.
+        """
+        res: typing.Dict[typing.Tuple[str, str], typing.List[float]] = {}
+        with self._lock:
+            for (op, path), (count, seconds) in self._stats.items():
+                stat = res.setdefault((op, os.path.basename(path) if by_attribute else path), [0, 0.0])
+                stat[0] += count
+                stat[1] += seconds
+        return sorted(((op, path, int(e[0]), e[1]) for (op, path), e in res.items()), key=lambda e: (-e[3], e[1]))
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        """Recorded tree, it is the same for the same files regardless of order in which they were read"""
+        with self._lock:
+            links = {path: target for path, target in self._links.items() if target is not None}
+            files = dict(self._files)
+            dirs = set(self._dirs)
+            listed = [f"{path}/{name}" if path else name for path, names in self._dirs.items() for name in names]
+        # parents of everything are directories
+        for path in [*files, *links, *dirs]:
+            while path:
+                path = os.path.dirname(path)
+                dirs.add(path)
+        dirs.discard("")
+        # listed entries, which were never read, are stored as empty files
+        for path in listed:
+            if path not in links and path not in dirs:
+                files.setdefault(path, "")
+        # directories which are implied by other entries are not stored
+        leafs = dirs - {os.path.dirname(e) for e in [*files, *links, *dirs]}
+        return {
+            "version": SNAPSHOT_VERSION,
+            "dirs": sorted(leafs),
+            "links": dict(sorted(links.items())),
+            "files": dict(sorted(files.items())),
+        }
+
+    def save(self, path: str):
+        """Store recorded tree as JSON (compressed when `path` ends with `.gz`)"""
+        import json
+
+        data = json.dumps(self.snapshot(), separators=(",", ":")).encode() + b"\n"
+        if path.endswith(".gz"):
+            import gzip
+
+            # no timestamp in the header, so the same tree is always stored as the same bytes
+            data = gzip.compress(data, mtime=0)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+OS = OsBackend()
+
+_lock = threading.Lock()
+_backend: Backend = OS
+
+
+def get_backend() -> Backend:
+    return _backend
+
+
+def set_backend(backend: typing.Optional[Backend]):
+    """Read files through `backend`, `None` switches back to the real filesystem"""
+    global _backend
+    with _lock:
+        _backend = backend or OS
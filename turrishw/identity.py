@@ -0,0 +1,104 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Identity of the board (model, Turris OS version, ...)
+
+Board identity can't change without reboot, so it is resolved only once per process.
+"""
+
+import os
+import threading
+import typing
+from dataclasses import dataclass
+
+from . import fs
+
+MODEL_MAP = {
+    "CZ.NIC Turris Mox Board": "MOX",
+    "Turris Omnia": "OMNIA",
+    "Turris": "TURRIS1X",  # model name on TOS 5.3.x and older
+    "Turris 1.x": "TURRIS1X",  # new model name for Turris 1.x from DTS
+    "Turris 1.0": "TURRIS1X",
+    "Turris 1.1": "TURRIS1X",
+    "CZ.NIC Turris Omnia NG": "OMNIANG",
+    # we might get blue Turris exact version from u-boot, so keep the model mapping future-proof
+}
+
+
+def _read_first_line(path: str) -> typing.Optional[str]:
+    try:
+        return fs.get_backend().read_first_line(path)
+    except FileNotFoundError:
+        return None
+
+
+@dataclass(frozen=True)
+class PlatformIdentity:
+    model: str  # e.g. "MOX", empty string for unsupported boards
+    dt_model: str  # raw model string from device tree, e.g. "CZ.NIC Turris Mox Board"
+    tos_version: typing.Optional[str] = None  # e.g. "7.0.0", `None` when not running Turris OS
+    moxtet_modules: typing.Tuple[str, ...] = ()  # Mox modules (moxtet-NAME.SEQUENCE) ordered by sequence
+
+    @property
+    def tos_major_version(self) -> typing.Optional[int]:
+        if not self.tos_version:
+            return None
+        return int(self.tos_version.split(".")[0])
+
+    @classmethod
+    def detect(cls, root: str) -> "PlatformIdentity":
+        dt_model = (_read_first_line(os.path.join(root, "sys/firmware/devicetree/base/model")) or "").rstrip("\x00")
+        model = MODEL_MAP.get(dt_model, "")
+
+        tos_version = _read_first_line(os.path.join(root, "etc/turris-version"))
+        tos_version = tos_version.strip() if tos_version is not None else None
+
+        moxtet_modules: typing.Tuple[str, ...] = ()
+        if model == "MOX":
+            modules = fs.get_backend().listdir(os.path.join(root, "sys/bus/moxtet/devices"))
+            # modules in /sys/bus/moxtet/devices/ are named moxtet-NAME.SEQUENCE
+            moxtet_modules = tuple(sorted(modules, key=lambda x: x.split(".")[-1]))
+
+        return cls(model, dt_model, tos_version, moxtet_modules)
+
+
+_lock = threading.Lock()
+# root -> identity, dropped by `forget()` when files are read through another backend
+_identities: typing.Dict[str, PlatformIdentity] = {}
+
+
+def get_platform(root: str, refresh: bool = False) -> PlatformIdentity:
+    """Get identity of the board with files in `root`, it is detected only on the first call or on `refresh`"""
+    with _lock:
+        identity = _identities.get(root)
+        if identity is None or refresh:
+            identity = _identities[root] = PlatformIdentity.detect(root)
+        return identity
+
+
+def forget():
+    """Drop all detected identities (e.g. after switching backend)"""
+    with _lock:
+        _identities.clear()
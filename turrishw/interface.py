@@ -22,9 +22,10 @@
 # LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
 # EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import functools
 import re
 import typing
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from enum import Enum
 
 
@@ -48,14 +49,57 @@ class Interface:
     qmi_device: typing.Optional[str] = None
     vendor: typing.Optional[str] = None
     pci_id: typing.Optional[str] = None
+    # LTE modems other than QMI (MBIM, NCM, ...), QMI modems use `qmi_device` for backward compatibility
+    control_device: typing.Optional[str] = None
+    wwan_protocol: typing.Optional[str] = None
+    # interface the VLAN is on (e.g. `eth2` for `eth2.100`), it is not part of the dict for backward compatibility
+    parent: typing.Optional[str] = field(default=None, compare=False)
 
     @property
     def sort_key(self):
-        # lan1.200 -> ("lan", 1, 200)
-        parts = [e for e in re.split(r"\.(\d+)$", self.name, maxsplit=1) if e]
-        name, suffix = (parts[0], int(parts[1])) if len(parts) == 2 else (parts[0], -1)
-
-        splitted = [e for e in re.split(r"(\d+)$", name, maxsplit=1) if e]
-        if len(splitted) == 1:
-            return splitted[0], -1, suffix  # eth preceeds eth0
-        return splitted[0], int(splitted[1]), suffix
+        return _sort_key(self.name)
+
+    def to_dict(self, parent: bool = False) -> typing.Dict[str, typing.Any]:
+        """Interface as dict compatible with older API (without `name` and attributes which are not set)
+
+        parent: Include `parent` too, e.g. when the dict is passed to another process, see `compatible_dict()`.
+        """
+        values = self.__dict__
+        res = {k: values[k] for k in _DICT_FIELDS if values[k] is not None}
+        if parent and self.parent is not None:
+            res["parent"] = self.parent
+        return res
+
+    @classmethod
+    def from_dict(cls, name: str, data: typing.Mapping[str, typing.Any]) -> "Interface":
+        """Inverse of `to_dict()`"""
+        values = {k: data[k] for k in _FROM_DICT_FIELDS if k in data}
+        if "state" in values:
+            values["state"] = State(values["state"])
+        return cls(name=name, **values)
+
+
+# fields in order of declaration, same as `dataclasses.asdict()` would produce
+_DICT_FIELDS = tuple(f.name for f in fields(Interface) if f.name not in ("name", "parent"))
+_FROM_DICT_FIELDS = (*_DICT_FIELDS, "parent")
+
+
+def compatible_dict(data: typing.Mapping[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """Dict from `Interface.to_dict(parent=True)` without attributes which are not part of older API"""
+    return {k: v for k, v in data.items() if k != "parent"}
+
+
+_VLAN_SUFFIX_REGEX = re.compile(r"\.(\d+)$")
+_INDEX_REGEX = re.compile(r"(\d+)$")
+
+
+@functools.lru_cache(maxsize=1024)
+def _sort_key(iface_name: str) -> typing.Tuple[str, int, int]:
+    # lan1.200 -> ("lan", 1, 200)
+    parts = [e for e in _VLAN_SUFFIX_REGEX.split(iface_name, maxsplit=1) if e]
+    name, suffix = (parts[0], int(parts[1])) if len(parts) == 2 else (parts[0], -1)
+
+    splitted = [e for e in _INDEX_REGEX.split(name, maxsplit=1) if e]
+    if len(splitted) == 1:
+        return splitted[0], -1, suffix  # eth preceeds eth0
+    return splitted[0], int(splitted[1]), suffix
@@ -22,100 +22,41 @@
 # LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
 # NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
 # EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
-import logging
-import re
+
 import typing
-from pathlib import Path
 
-from . import utils
+from . import classify, utils
+from .classify import Action, Rule
 from .interface import Interface
 
-logger = logging.getLogger(__name__)
-
-
-def get_interfaces() -> typing.List[Interface]:
-    ifaces: typing.List[Interface] = []
-    virtual_ifaces: typing.List[typing.Dict[str, str]] = []
-    vlan_ifaces: typing.List[str] = utils.get_vlan_interfaces()
-
-    # First pass - process the detected physical interfaces
-    for iface_name in utils.get_ifaces():
-        iface_path: Path = utils.inject_file_root("sys/class/net", iface_name)
-        iface_abspath: Path = iface_path.resolve()
-        iface_path_str = str(iface_abspath)
-        iface_type = utils.find_iface_type(iface_name)
-        macaddr = utils.get_first_line(iface_path / "address").strip()
+PROFILE = classify.Profile(
+    __name__,
+    [
+        Rule("f1072004.mdio", type="eth", bus="eth", label=True),  # switch
+        Rule("f1034000.ethernet", type="eth", bus="eth", slot="WAN"),  # WAN port
+        Rule(
+            "pci0000:00",  # PCI
+            type="wifi",
+            bus="pci",
+            extract=r"/0000:00:0(?P<slot>[0-3])\.0/",
+            warning="unknown PCI slot module",
+            slot_path=True,
+        ),
+        Rule("f10f0000.usb3", bus="usb", slot="USB Front", slot_path=True, usb_parent=True),  # front USB3.0
+        Rule("f10f8000.usb3", bus="usb", slot="USB Rear", slot_path=True, usb_parent=True),  # rear USB3.0
+        Rule("f1058000.usb", bus="pci", slot="3", slot_path=True, usb_parent=True),  # USB2.0 on the PCI connector 3
+        # ethernet interfaces connected to switch - ignore them
+        Rule("f1070000.ethernet", action=Action.IGNORE),
+        Rule("f1030000.ethernet", action=Action.IGNORE),
+        Rule("virtual", action=Action.VIRTUAL),
+        # TODO: add SFP - once it starts to work
+    ],
+)
 
-        if "f1072004.mdio" in iface_path_str:
-            # switch
-            port_label = utils.get_iface_label(iface_path)
-            ifaces.append(utils.make_iface(iface_name, "eth", "eth", port_label, macaddr))
 
-        elif "f1034000.ethernet" in iface_path_str:
-            # WAN port
-            ifaces.append(utils.make_iface(iface_name, "eth", "eth", "WAN", macaddr))
-        elif "pci0000:00" in iface_path_str:
-            # PCI
-            m = re.search(r"/0000:00:0([0-3])\.0/", iface_path_str)
-            if m:
-                slot = m.group(1)
-                ifaces.append(utils.make_iface(iface_name, "wifi", "pci", slot, macaddr, slot_path=iface_path_str))
-            else:
-                logger.warning("unknown PCI slot module")
-        elif "f10f0000.usb3" in iface_path_str:
-            # front USB3.0
-            ifaces.append(
-                utils.make_iface(
-                    iface_name,
-                    iface_type,
-                    "usb",
-                    "USB Front",
-                    macaddr,
-                    slot_path=iface_path_str,
-                    parent_device_abs_path=iface_abspath,
-                )
-            )
-        elif "f10f8000.usb3" in iface_path_str:
-            # rear USB3.0
-            ifaces.append(
-                utils.make_iface(
-                    iface_name,
-                    iface_type,
-                    "usb",
-                    "USB Rear",
-                    macaddr,
-                    slot_path=iface_path_str,
-                    parent_device_abs_path=iface_abspath,
-                )
-            )
-        elif "f1058000.usb" in iface_path_str:
-            # USB2.0 on the PCI connector 3
-            ifaces.append(
-                utils.make_iface(
-                    iface_name,
-                    iface_type,
-                    "pci",
-                    "3",
-                    macaddr,
-                    slot_path=iface_path_str,
-                    parent_device_abs_path=iface_abspath,
-                )
-            )
-        elif "f1070000.ethernet" in iface_path_str or "f1030000.ethernet" in iface_path_str:
-            # ethernet interfaces connected to switch - ignore them
-            pass
-        elif "virtual" in iface_path_str:
-            # virtual ifaces (loopback, bridges, ...) - we don't care about these
-            #
-            # `utils.get_ifaces` can return interfaces in random order, so interfaces with VLAN assigned
-            # will be processed in second pass to ensure that its parent interface exists and is already processed.
-            if iface_name in vlan_ifaces:
-                virtual_ifaces.append({"name": iface_name, "macaddr": macaddr})
-        # TODO: add SFP - once it starts to work
-        else:
-            logger.warning("unknown interface type: %s", iface_name)
+def classify_interfaces() -> typing.List[Interface]:
+    return classify.classify_interfaces(PROFILE)
 
-    # Second pass - process virtual interfaces with VLAN assigned.
-    vlan_ifaces = utils.make_vlan_interfaces(ifaces, virtual_ifaces)
 
-    return ifaces + vlan_ifaces
+def get_interfaces() -> typing.List[Interface]:
+    return utils.collect_attributes(classify_interfaces())
@@ -0,0 +1,317 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Index of PCI vendors, devices and subsystems from `pci.ids` database"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+import typing
+
+# Keys of the index are integers, so we don't need to keep thousands of short hex strings around:
+#   vendor    -> 0xVVVV
+#   device    -> 0xVVVV_DDDD
+#   subsystem -> 0xVVVV_DDDD_SSSS_ssss (vendor, device, subvendor, subdevice)
+IdLike = typing.Union[int, str]
+
+# Binary index file layout (little endian):
+#   header:  magic, mtime_ns and size of source pci.ids, number of vendors, devices and subsystems
+#   tables:  vendors, devices, subsystems; each is array of (key, name offset, name length) sorted by key
+#   strings: utf-8 encoded names referenced by offset from the start of the strings section
+INDEX_MAGIC = b"TRHWPCI1"
+INDEX_HEADER = struct.Struct("<8sQQIII")
+INDEX_RECORD = struct.Struct("<QII")
+
+logger = logging.getLogger(__name__)
+
+
+def _to_int(value: IdLike) -> int:
+    return value if isinstance(value, int) else int(value, 16)
+
+
+def device_key(ven: IdLike, dev: IdLike) -> int:
+    return (_to_int(ven) << 16) | _to_int(dev)
+
+
+def subsystem_key(ven: IdLike, dev: IdLike, subven: IdLike, subdev: IdLike) -> int:
+    return (device_key(ven, dev) << 32) | (_to_int(subven) << 16) | _to_int(subdev)
+
+
+class PciIds:
+    """Lookup table of names from `pci.ids` database.
+
+    The database is a text file with tab-indented hierarchy:
+
+    ```
+    168c  Qualcomm Atheros
+    \t003c  QCA986x/988x 802.11ac Wireless Network Adapter
+    \t\t168c 3223  Killer Wireless-N 1103 Half-size Mini PCIe Card
+    ```
+
+    Device classes (lines starting with `C `) follow after all vendors and are not indexed.
+    """
+
+    def __init__(
+        self, vendors: typing.Dict[int, str], devices: typing.Dict[int, str], subsystems: typing.Dict[int, str]
+    ):
+        self.vendors = vendors
+        self.devices = devices
+        self.subsystems = subsystems
+
+    @classmethod
+    def parse(cls, lines: typing.Iterable[str]) -> "PciIds":
+        vendors: typing.Dict[int, str] = {}
+        devices: typing.Dict[int, str] = {}
+        subsystems: typing.Dict[int, str] = {}
+        vendor = device = None
+
+        for line in lines:
+            if not line.strip() or line.startswith("#"):
+                continue
+            if line.startswith("C "):
+                break  # vendors section is over, the rest are device classes
+
+            try:
+                if not line.startswith("\t"):
+                    # `vvvv  vendor name`
+                    vendor, device = int(line[:4], 16), None
+                    vendors[vendor] = line[4:].strip()
+                elif not line.startswith("\t\t"):
+                    # `\tdddd  device name`
+                    if vendor is None:
+                        continue
+                    device = int(line[1:5], 16)
+                    devices[(vendor << 16) | device] = line[5:].strip()
+                else:
+                    # `\t\tssss ssss  subsystem name`
+                    if vendor is None or device is None:
+                        continue
+                    subven, subdev = int(line[2:6], 16), int(line[7:11], 16)
+                    key = (((vendor << 16) | device) << 32) | (subven << 16) | subdev
+                    subsystems[key] = line[11:].strip()
+            except ValueError:
+                # malformed line, just skip it
+                continue
+
+        return cls(vendors, devices, subsystems)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PciIds":
+        # pci.ids is not guaranteed to be pure ASCII
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return cls.parse(f)
+
+    def vendor(self, ven: IdLike) -> typing.Optional[str]:
+        try:
+            return self.vendors.get(_to_int(ven))
+        except ValueError:  # not a hex number
+            return None
+
+    def device(self, ven: IdLike, dev: IdLike) -> typing.Optional[str]:
+        try:
+            return self.devices.get(device_key(ven, dev))
+        except ValueError:
+            return None
+
+    def subsystem(self, ven: IdLike, dev: IdLike, subven: IdLike, subdev: IdLike) -> typing.Optional[str]:
+        try:
+            return self.subsystems.get(subsystem_key(ven, dev, subven, subdev))
+        except ValueError:
+            return None
+
+
+class _MappedTable(typing.Sequence[int]):
+    """Sorted keys of one table in memory-mapped index, so we can bisect it without unpacking it"""
+
+    def __init__(self, buf: mmap.mmap, offset: int, count: int):
+        self.buf = buf
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, idx):  # only integer access is needed by bisect
+        return INDEX_RECORD.unpack_from(self.buf, self.offset + idx * INDEX_RECORD.size)[0]
+
+    def get(self, key: int, strings: int) -> typing.Optional[str]:
+        idx = bisect.bisect_left(self, key)
+        if idx == self.count:
+            return None
+        found, name_off, name_len = INDEX_RECORD.unpack_from(self.buf, self.offset + idx * INDEX_RECORD.size)
+        if found != key:
+            return None
+        return self.buf[strings + name_off : strings + name_off + name_len].decode("utf-8", errors="replace")
+
+
+class MappedPciIds:
+    """Lookup table of names from binary index of `pci.ids` mapped into memory
+
+    Index is opened without parsing and searched with binary search,
+    so only few pages of the file are touched for every lookup.
+    """
+
+    def __init__(self, buf: mmap.mmap, counts: typing.Tuple[int, int, int]):
+        self.buf = buf
+        offset = INDEX_HEADER.size
+        tables = []
+        for count in counts:
+            tables.append(_MappedTable(buf, offset, count))
+            offset += count * INDEX_RECORD.size
+        self._vendors, self._devices, self._subsystems = tables
+        self._strings = offset
+
+    @classmethod
+    def open(cls, path: str, source: os.stat_result) -> "MappedPciIds":
+        """Open index file for given source `pci.ids` file
+
+        Raise `OSError` if the index can't be opened and `ValueError` if the index is stale or malformed.
+        """
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(buf) < INDEX_HEADER.size:
+                raise ValueError("index file is truncated")
+            magic, mtime_ns, size, *counts = INDEX_HEADER.unpack_from(buf)
+            if magic != INDEX_MAGIC:
+                raise ValueError("unknown index file format")
+            if (mtime_ns, size) != (source.st_mtime_ns, source.st_size):
+                raise ValueError("index file is stale")
+            if len(buf) < INDEX_HEADER.size + sum(counts) * INDEX_RECORD.size:
+                raise ValueError("index file is truncated")
+        except ValueError:
+            buf.close()
+            raise
+
+        return cls(buf, tuple(counts))
+
+    def vendor(self, ven: IdLike) -> typing.Optional[str]:
+        try:
+            return self._vendors.get(_to_int(ven), self._strings)
+        except ValueError:  # not a hex number
+            return None
+
+    def device(self, ven: IdLike, dev: IdLike) -> typing.Optional[str]:
+        try:
+            return self._devices.get(device_key(ven, dev), self._strings)
+        except ValueError:
+            return None
+
+    def subsystem(self, ven: IdLike, dev: IdLike, subven: IdLike, subdev: IdLike) -> typing.Optional[str]:
+        try:
+            return self._subsystems.get(subsystem_key(ven, dev, subven, subdev), self._strings)
+        except ValueError:
+            return None
+
+
+def write_index(db: PciIds, path: str, source: os.stat_result):
+    """Store parsed database as binary index
+
+    File is replaced atomically, so concurrent readers see either the old or the new index.
+    """
+    tables = []
+    strings = bytearray()
+    for table in (db.vendors, db.devices, db.subsystems):
+        records = bytearray()
+        for key in sorted(table):
+            name = table[key].encode("utf-8")
+            records += INDEX_RECORD.pack(key, len(strings), len(name))
+            strings += name
+        tables.append(records)
+
+    header = INDEX_HEADER.pack(
+        INDEX_MAGIC, source.st_mtime_ns, source.st_size, len(db.vendors), len(db.devices), len(db.subsystems)
+    )
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            for records in tables:
+                f.write(records)
+            f.write(strings)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# (path, cache_path), (mtime_ns, size) of the source when it was loaded and the loaded database
+_loaded: typing.Optional[
+    typing.Tuple[typing.Tuple[str, typing.Optional[str]], typing.Tuple[int, int], typing.Union[PciIds, MappedPciIds]]
+] = None
+
+
+def load(path: str, cache_path: typing.Optional[str] = None) -> typing.Union[PciIds, MappedPciIds]:
+    """Parse `pci.ids` file only once and reuse the index for all lookups
+
+    The file is checked by `os.stat()` on every call and loaded again when its mtime or size changes.
+    When `cache_path` is set, binary index of the database is stored there, so other processes
+    can use it without parsing `pci.ids` again. Index is rebuilt when mtime or size of `pci.ids` changes.
+
+    Raise `OSError` when the database can't be read, failures are not cached.
+    """
+    global _loaded
+    source = os.stat(path)
+    key, stamp = (path, cache_path), (source.st_mtime_ns, source.st_size)
+    loaded = _loaded
+    if loaded is not None and loaded[0] == key and loaded[1] == stamp:
+        return loaded[2]
+    db = _load(path, cache_path, source)
+    _loaded = (key, stamp, db)
+    return db
+
+
+def reset():
+    """Drop the loaded database, it is loaded again on the next lookup"""
+    global _loaded
+    _loaded = None
+
+
+def _load(path: str, cache_path: typing.Optional[str], source: os.stat_result) -> typing.Union[PciIds, MappedPciIds]:
+    if cache_path:
+        try:
+            return MappedPciIds.open(cache_path, source)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.debug("Can't use pci.ids index '%s': %s", cache_path, e)
+
+    db = PciIds.from_file(path)
+
+    if cache_path:
+        try:
+            write_index(db, cache_path, source)
+        except OSError as e:
+            logger.debug("Can't store pci.ids index '%s': %s", cache_path, e)
+
+    return db
@@ -0,0 +1,159 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Interfaces published in a file, so other processes can read them without detection
+
+File is replaced atomically, readers see either the old or the new table. Layout (little endian):
+    header:  magic, generation, time of publishing (ns since epoch), length of payload
+    payload: interfaces as JSON, same as returned by `get_ifaces()` plus `parent` of VLANs
+             (see `Interface.to_dict()`), so `as_objects=True` readers get the same objects as from detection
+
+Generation changes only when the interfaces change, so readers map the file, compare the generation
+and parse the payload only when it differs from the last one they have seen. Publisher rewrites the file
+(with the same generation) at least every `HEARTBEAT` seconds, readers consider older files stale.
+There should be only one publisher (e.g. `turrishw --daemon --publish`).
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import typing
+
+from . import turrishw, utils
+from .interface import Interface, compatible_dict
+
+PUBLISHED_MAGIC = b"TRHWIFC1"
+PUBLISHED_HEADER = struct.Struct("<8sQQI")
+
+# published file older than this (in seconds) is stale and interfaces are detected instead
+DEFAULT_MAX_AGE = 60.0
+# how often is unchanged file rewritten by publisher
+HEARTBEAT = DEFAULT_MAX_AGE / 3
+
+logger = logging.getLogger(__name__)
+
+
+class Header(typing.NamedTuple):
+    generation: int
+    timestamp_ns: int
+    length: int
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.timestamp_ns / 1e9
+
+
+def _read(path: str, generation: typing.Optional[int]) -> typing.Tuple[Header, typing.Optional[bytes]]:
+    """Read header and payload of published file, payload is not read when its generation is `generation`
+
+    Raise `OSError` if the file can't be read and `ValueError` if it is malformed.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        if len(buf) < PUBLISHED_HEADER.size:
+            raise ValueError("published file is truncated")
+        magic, *values = PUBLISHED_HEADER.unpack_from(buf)
+        if magic != PUBLISHED_MAGIC:
+            raise ValueError("unknown published file format")
+        header = Header(*values)
+        if header.generation == generation:
+            return header, None
+        if len(buf) < PUBLISHED_HEADER.size + header.length:
+            raise ValueError("published file is truncated")
+        return header, buf[PUBLISHED_HEADER.size : PUBLISHED_HEADER.size + header.length]
+
+
+def publish(ifaces: typing.Optional[typing.Dict[str, typing.Dict]] = None, path: typing.Optional[str] = None) -> int:
+    """Publish interfaces (dicts from `Interface.to_dict(parent=True)`, they are detected by default),
+    return generation of the file
+    """
+    path = path or utils.PUBLISHED_IFACES
+    if ifaces is None:
+        ifaces = {name: iface.to_dict(parent=True) for name, iface in turrishw.get_topology().items()}
+    payload = json.dumps(ifaces, separators=(",", ":")).encode()
+
+    try:
+        header, previous = _read(path, None)
+        generation = header.generation if previous == payload else header.generation + 1
+    except (OSError, ValueError):
+        # new file, its generation doesn't collide with generations of files published before (e.g. before reboot)
+        generation = time.time_ns()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(PUBLISHED_HEADER.pack(PUBLISHED_MAGIC, generation, time.time_ns(), len(payload)))
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return generation
+
+
+_lock = threading.Lock()
+# path -> (generation, interfaces) of the last read file
+_loaded: typing.Dict[str, typing.Tuple[int, typing.Dict[str, typing.Dict]]] = {}
+
+
+def load_published_ifaces(
+    filter_types: typing.Optional[list[str]] = None,
+    as_objects: bool = False,
+    path: typing.Optional[str] = None,
+    max_age: float = DEFAULT_MAX_AGE,
+):
+    """Same as `get_ifaces()`, interfaces are read from the published file
+
+    Interfaces are detected when the file is missing, malformed or older than `max_age` seconds.
+    """
+    path = path or utils.PUBLISHED_IFACES
+    with _lock:
+        generation, ifaces = _loaded.get(path, (None, {}))
+    try:
+        header, payload = _read(path, generation)
+        if header.age > max_age:
+            raise ValueError(f"published file is stale ({header.age:.0f} s old)")
+        if payload is not None:
+            ifaces = json.loads(payload)
+            with _lock:
+                _loaded[path] = (header.generation, ifaces)
+    except (OSError, ValueError) as e:
+        logger.debug("Can't use published interfaces '%s', detecting them: %s", path, e)
+        return turrishw.get_ifaces(filter_types, as_objects)
+
+    if filter_types is not None:
+        ifaces = {name: data for name, data in ifaces.items() if data["type"] in filter_types}
+    if as_objects:
+        return {name: Interface.from_dict(name, data) for name, data in ifaces.items()}
+    # callers get copies, so they can't modify the loaded data
+    return {name: compatible_dict(data) for name, data in ifaces.items()}
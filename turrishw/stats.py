@@ -0,0 +1,153 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Instrumentation of detection: wall time of its phases, number of file operations and vendor cache hits
+
+Nothing is collected outside of `collect()`, every hook is then only a check of one global variable.
+Phases may be nested (e.g. `classify.omnia` contains `enumerate` and `vlans`) and phases entered
+from multiple threads (`vendor` when attributes are read in parallel) sum time of all threads.
+"""
+
+import contextlib
+import logging
+import threading
+import time
+import typing
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# file operations which are counted
+IO_OPS = ("open", "readlink", "resolve", "listdir", "stat")
+
+
+@dataclass
+class Stats:
+    phases: typing.Dict[str, float] = field(default_factory=dict)  # phase -> seconds
+    calls: typing.Dict[str, int] = field(default_factory=dict)  # phase -> how many times it was entered
+    # operation -> count, see `IO_OPS`; every resolved link is one `readlink` too
+    io: typing.Dict[str, int] = field(default_factory=lambda: dict.fromkeys(IO_OPS, 0))
+    vendor_hits: int = 0
+    vendor_misses: int = 0
+    total: float = 0.0  # seconds spent within `collect()`
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def vendor_hit_rate(self) -> typing.Optional[float]:
+        """Ratio of vendor lookups answered from cache, `None` when no vendor was looked up"""
+        lookups = self.vendor_hits + self.vendor_misses
+        return self.vendor_hits / lookups if lookups else None
+
+    def add_phase(self, name: str, seconds: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def add_io(self, op: str):
+        with self._lock:
+            self.io[op] += 1
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "total": self.total,
+            "phases": dict(self.phases),
+            "calls": dict(self.calls),
+            "io": dict(self.io),
+            "vendor_hits": self.vendor_hits,
+            "vendor_misses": self.vendor_misses,
+        }
+
+    def __str__(self) -> str:
+        phases = ", ".join(f"{k} {v * 1000:.2f} ms" for k, v in sorted(self.phases.items(), key=lambda e: -e[1]))
+        io = ", ".join(f"{k} {v}" for k, v in self.io.items())
+        rate = self.vendor_hit_rate
+        vendor = "-" if rate is None else f"{rate:.0%} of {self.vendor_hits + self.vendor_misses}"
+        return f"total {self.total * 1000:.2f} ms; phases: {phases or '-'}; io: {io}; vendor cache hits: {vendor}"
+
+
+_current: typing.Optional[Stats] = None
+
+
+class _Phase:
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats: Stats, name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats.add_phase(self.name, time.perf_counter() - self.start)
+
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+def phase(name: str) -> typing.ContextManager:
+    """Measure wall time of the block as phase `name`"""
+    if _current is None:
+        return _NO_PHASE
+    return _Phase(_current, name)
+
+
+def count(op: str):
+    """Count file operation, see `IO_OPS`"""
+    if _current is not None:
+        _current.add_io(op)
+
+
+def _vendor_cache() -> typing.Tuple[int, int]:
+    from . import utils
+
+    # nothing is counted when the lookup is replaced (e.g. in tests)
+    info = utils._vendor_name.cache_info()
+    return info.hits, info.misses
+
+
+@contextlib.contextmanager
+def collect(log: bool = False) -> typing.Iterator[Stats]:
+    """Collect statistics of everything detected within the block (in all threads)
+
+    log: Log the statistics at debug level at the end of the block.
+    """
+    global _current
+    stats, previous = Stats(), _current
+    vendor_hits, vendor_misses = _vendor_cache()
+    start = time.perf_counter()
+    _current = stats
+    try:
+        yield stats
+    finally:
+        _current = previous
+        stats.total = time.perf_counter() - start
+        hits, misses = _vendor_cache()
+        stats.vendor_hits, stats.vendor_misses = hits - vendor_hits, misses - vendor_misses
+        if log:
+            logger.debug("Detection statistics: %s", stats)
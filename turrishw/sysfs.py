@@ -0,0 +1,265 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Low level access to sysfs with as few syscalls as possible
+
+- directories are listed with `os.scandir()`, symlinks are recognized by d_type without additional `lstat()`
+- class links (e.g. `/sys/class/net/eth0`) are resolved with single `readlink()`,
+  sysfs never links to another symlink, so there is no need to `lstat()` every path component
+- within `session()` every interface directory is opened only once and its attributes are read
+  relative to the directory fd with single small `read()`, i.e. `openat()`, `read()` and `close()` per attribute
+- attributes which the device doesn't have are remembered, so they are not looked up again
+
+Files are read through the current backend (see `fs`), directories are kept open only on the real filesystem.
+"""
+
+import contextlib
+import contextvars
+import errno
+import functools
+import os
+import stat
+import threading
+import typing
+
+from . import fs, stats
+from .fs import READ_SIZE
+
+_NOT_FOUND = (errno.ENOENT, errno.ENOTDIR)
+
+# (device path, attribute) of attributes which are missing
+# Device on the same path is always of the same class, so it will never have these attributes.
+MISSING_CACHE_SIZE = 4096
+_missing: typing.Set[typing.Tuple[str, str]] = set()
+
+_lock = threading.Lock()
+_session: typing.Optional["Session"] = None  # global session, see `session()`
+_session_depth = 0
+
+
+def list_links(path: str) -> typing.List[str]:
+    """Names of symlinks in directory"""
+    return fs.get_backend().list_links(path)
+
+
+def resolve_link(path: str) -> str:
+    """Resolve sysfs link (e.g. class link `/sys/class/net/eth0`) to the absolute path of device with one readlink"""
+    return fs.get_backend().resolve_link(path)
+
+
+def forget_missing():
+    """Drop cache of missing attributes (e.g. after hardware change)"""
+    with _lock:
+        _missing.clear()
+
+
+def _remember_missing(key: typing.Tuple[str, str]):
+    with _lock:
+        if len(_missing) >= MISSING_CACHE_SIZE:
+            _missing.clear()
+        _missing.add(key)
+
+
+class NetDir:
+    """Directory of network interface in sysfs (`/sys/class/net/<iface>`)
+
+    When `keep_open` is set, directory is opened once and all attributes are read relative to its fd.
+    Otherwise every attribute is read by its full path through `backend` and nothing is left open.
+    """
+
+    def __init__(self, path: str, keep_open: bool = False, backend: typing.Optional[fs.Backend] = None):
+        self.path = path
+        self.backend = backend or fs.get_backend()
+        self.keep_open = keep_open and isinstance(self.backend, fs.OsBackend)
+        self._fd: typing.Optional[int] = None
+        self._device_path: typing.Optional[str] = None
+
+    def _dir_fd(self) -> int:
+        if self._fd is None:
+            with _lock:
+                if self._fd is None:
+                    stats.count("open")
+                    self._fd = os.open(self.path, os.O_RDONLY | os.O_DIRECTORY)
+        return self._fd
+
+    def close(self):
+        with _lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    @property
+    def device_path(self) -> str:
+        """Real path of the interface (`/sys/devices/...`)"""
+        if self._device_path is None:
+            self._device_path = self.backend.resolve_link(self.path)
+        return self._device_path
+
+    def read(self, attr: str) -> str:
+        """Read the whole attribute, raise `OSError` if it can't be read"""
+        if not self.keep_open:
+            return self.backend.read(os.path.join(self.path, attr), READ_SIZE)
+        stats.count("open")
+        fd = os.open(attr, os.O_RDONLY, dir_fd=self._dir_fd())
+        try:
+            data = os.read(fd, READ_SIZE)
+        finally:
+            os.close(fd)
+        return data.decode("utf-8", errors="replace")
+
+    def read_line(self, attr: str) -> str:
+        """Read the first line of attribute including the line break, same as `readline()` would"""
+        data = self.read(attr)
+        end = data.find("\n")
+        return data if end < 0 else data[: end + 1]
+
+    def read_optional(self, attr: str, first_line: bool = True) -> typing.Optional[str]:
+        """Read attribute, return `None` if the device doesn't have it"""
+        key = (self.device_path, attr)
+        if key in _missing:
+            return None
+        try:
+            return self.read_line(attr) if first_line else self.read(attr)
+        except OSError as e:
+            if e.errno not in _NOT_FOUND:
+                raise
+        _remember_missing(key)
+        return None
+
+    def has_dir(self, attr: str) -> bool:
+        key = (self.device_path, attr)
+        if key in _missing:
+            return False
+        if self.keep_open:
+            stats.count("stat")
+            try:
+                is_dir = stat.S_ISDIR(os.stat(attr, dir_fd=self._dir_fd()).st_mode)
+            except OSError as e:
+                if e.errno not in _NOT_FOUND:
+                    raise
+                is_dir = False
+        else:
+            is_dir = self.backend.is_dir(os.path.join(self.path, attr))
+        if not is_dir:
+            _remember_missing(key)
+        return is_dir
+
+    def readlink(self, attr: str) -> str:
+        if self.keep_open:
+            stats.count("readlink")
+            return os.readlink(attr, dir_fd=self._dir_fd())
+        return self.backend.readlink(os.path.join(self.path, attr))
+
+
+class Session:
+    """Directories of interfaces kept open and values computed once until the session is closed
+
+    Session is current either globally (see `session()`) or only within `run()`, which allows
+    independent detections (e.g. from `asyncio`) to have their own sessions.
+    """
+
+    def __init__(self):
+        self._dirs: typing.Dict[str, NetDir] = {}
+        self._values: typing.Dict[str, typing.Any] = {}
+
+    def net_dir(self, path: str) -> NetDir:
+        with _lock:
+            res = self._dirs.get(path)
+            if res is None:
+                res = self._dirs[path] = NetDir(path, keep_open=True)
+            return res
+
+    def value(self, key: str, factory: typing.Callable[[], typing.Any]) -> typing.Any:
+        with _lock:
+            if key in self._values:
+                return self._values[key]
+        value = factory()
+        with _lock:
+            return self._values.setdefault(key, value)
+
+    def run(self, func: typing.Callable[..., typing.Any], *args) -> typing.Any:
+        """Call `func` with this session being the current session of the calling thread"""
+        token = _bound.set(self)
+        try:
+            return func(*args)
+        finally:
+            _bound.reset(token)
+
+    def close(self):
+        with _lock:
+            dirs, self._dirs, self._values = self._dirs, {}, {}
+        for net_dir in dirs.values():
+            net_dir.close()
+
+
+# session of the current thread (or task) set by `Session.run()`, it takes precedence over the global session
+_bound: contextvars.ContextVar[typing.Optional[Session]] = contextvars.ContextVar("turrishw_session", default=None)
+
+
+def current_session() -> typing.Optional[Session]:
+    """Session used by the calling thread, `None` when there is none"""
+    return _bound.get() or _session
+
+
+def bound(func: typing.Callable[..., typing.Any]) -> typing.Callable[..., typing.Any]:
+    """Bind `func` to the current session, so it uses it even when called from another thread"""
+    current = current_session()
+    return func if current is None else functools.partial(current.run, func)
+
+
+@contextlib.contextmanager
+def session():
+    """Keep directories of interfaces open until the end of the block
+
+    Sessions can be nested and shared between threads, directories are closed when the outermost session ends.
+    """
+    global _session, _session_depth
+    with _lock:
+        _session_depth += 1
+        if _session is None:
+            _session = Session()
+    try:
+        yield
+    finally:
+        with _lock:
+            _session_depth -= 1
+            if _session_depth == 0:
+                ended, _session = _session, None
+            else:
+                ended = None
+        if ended is not None:
+            ended.close()
+
+
+def net_dir(path: str) -> NetDir:
+    """Get directory of interface, it is kept open when there is an active session"""
+    current = current_session()
+    return NetDir(path) if current is None else current.net_dir(path)
+
+
+def session_value(key: str, factory: typing.Callable[[], typing.Any]) -> typing.Any:
+    """Value (e.g. index of devices) computed only once per session, it is computed on every call outside of session"""
+    current = current_session()
+    return factory() if current is None else current.value(key, factory)
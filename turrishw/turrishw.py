@@ -1,41 +1,216 @@
+import contextlib
+import copy
+import importlib
 import logging
+import os
+import threading
+import time
 import typing
-from dataclasses import asdict
 
-from . import mox, omnia, omnia_ng, turris1x, utils
+from . import fs, identity, stats, sysfs, utils
+from .identity import PlatformIdentity
+from .interface import Interface
 
 logger = logging.getLogger(__name__)
 
 
-def get_model():
-    MODEL_MAP = {
-        "CZ.NIC Turris Mox Board": "MOX",
-        "Turris Omnia": "OMNIA",
-        "Turris": "TURRIS1X",  # model name on TOS 5.3.x and older
-        "Turris 1.x": "TURRIS1X",  # new model name for Turris 1.x from DTS
-        "Turris 1.0": "TURRIS1X",
-        "Turris 1.1": "TURRIS1X",
-        "CZ.NIC Turris Omnia NG": "OMNIANG",
-        # we might get blue Turris exact version from u-boot, so keep the model mapping future-proof
-    }
+# name -> interface
+Table = typing.Dict[str, Interface]
+# name -> interface, `None` if the interface was removed
+Changes = typing.Dict[str, typing.Optional[Interface]]
 
-    model = utils.get_first_line(utils.inject_file_root("sys/firmware/devicetree/base/model"))
-    model = model.rstrip("\x00")
 
-    return MODEL_MAP.get(model, "")
+class _InterfacesCache:
+    """Cache of detected interfaces
 
+    Topology of interfaces (type, bus, slot, ...) is kept for `ttl` seconds.
+    Attributes that change often (state and link speed) are re-read from sysfs
+    for already known interfaces once they are older than `dynamic_ttl` seconds.
 
-def get_ifaces(filter_types: typing.Optional[list[str]] = None):
-    MODEL_MAP = {"MOX": mox, "OMNIA": omnia, "TURRIS1X": turris1x, "OMNIANG": omnia_ng}
+    Cache is disabled by default (`ttl` is 0).
+    """
 
-    hw_model = get_model()
-    model = MODEL_MAP.get(hw_model)
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ttl = 0.0
+        self.dynamic_ttl = 0.0
+        self._clear()
 
-    if model is None:
+    def _clear(self):
+        self.table: typing.Optional[Table] = None
+        self.root: typing.Optional[str] = None
+        self.backend: typing.Optional[fs.Backend] = None
+        self.detected_at = 0.0
+        self.refreshed_at = 0.0
+        self.stale: typing.Set[str] = set()
+
+    def configure(self, ttl: float, dynamic_ttl: typing.Optional[float]):
+        with self.lock:
+            self.ttl = max(ttl, 0.0)
+            self.dynamic_ttl = self.ttl if dynamic_ttl is None else min(max(dynamic_ttl, 0.0), self.ttl)
+            self._clear()
+
+    def invalidate(self, iface: typing.Optional[str]):
+        with self.lock:
+            if iface is None or self.table is None or iface not in self.table:
+                # we don't know anything about the interface (e.g. it was just plugged in), so we need full rescan
+                self._clear()
+            else:
+                self.stale.add(iface)
+
+    def get(self, detect: typing.Callable[[], typing.List[Interface]]) -> typing.List[Interface]:
+        if self.ttl <= 0:
+            return detect()
+
+        with self.lock:
+            now = time.monotonic()
+            if (
+                self.table is None
+                or self.root != utils.TURRISHW_FILE_ROOT
+                or self.backend is not fs.get_backend()
+                or now - self.detected_at >= self.ttl
+            ):
+                self._detect(detect, now)
+            else:
+                refresh_all = now - self.refreshed_at >= self.dynamic_ttl
+                changes = refresh_dynamic(self.table, None if refresh_all else self.stale)
+                if None in changes.values():
+                    # interface is gone, topology has changed
+                    self._detect(detect, now)
+                else:
+                    self.stale.clear()
+                    if refresh_all:
+                        self.refreshed_at = now
+
+            # callers get copies, so they can't modify the cached data
+            return [copy.copy(e) for e in self.table.values()]
+
+    def _detect(self, detect: typing.Callable[[], typing.List[Interface]], now: float):
+        self._clear()
+        self.table = {e.name: e for e in detect()}
+        self.root = utils.TURRISHW_FILE_ROOT
+        self.backend = fs.get_backend()
+        self.detected_at = self.refreshed_at = now
+
+
+_cache = _InterfacesCache()
+
+
+def configure_cache(ttl: float = 0.0, dynamic_ttl: typing.Optional[float] = None):
+    """Cache results of `get_ifaces()`
+
+    ttl: How long (in seconds) is the detected topology of interfaces reused. Use 0 to disable caching.
+    dynamic_ttl: How long (in seconds) are the interfaces state and link speed reused.
+        Defaults to `ttl`, it can't be longer than `ttl`.
+    """
+    _cache.configure(ttl, dynamic_ttl)
+
+
+def invalidate(iface: typing.Optional[str] = None):
+    """Drop cached results of `get_ifaces()`
+
+    iface: Re-read state and link speed of this interface on the next call only.
+        Unknown interface or `None` drops the whole cache, including vendor names from `pci.ids`.
+    """
+    if iface is None:
+        sysfs.forget_missing()
+        utils.forget_vendors()
+    _cache.invalidate(iface)
+
+
+def configure_parallel(workers: int = 0, threshold: int = utils.PARALLEL_THRESHOLD):
+    """Read attributes of interfaces (state, link speed, vendor, ...) in parallel
+
+    workers: Maximal number of threads, use 0 to read attributes serially (default).
+    threshold: Minimal number of interfaces to use threads, thread overhead dominates for few interfaces.
+    """
+    utils.PARALLEL_WORKERS = max(workers, 0)
+    utils.PARALLEL_THRESHOLD = max(threshold, 0)
+
+
+def configure_backend(backend: typing.Optional[fs.Backend] = None, root: typing.Optional[str] = None):
+    """Read files of the router through `backend`, e.g. snapshot in tarball (`fs.TarBackend`)
+
+    backend: `None` switches back to the real filesystem.
+    root: Root of the router, defaults to root of the backend or to `TURRISHW_ROOT` environment variable.
+    """
+    fs.set_backend(backend)
+    utils.TURRISHW_FILE_ROOT = root or (backend and backend.root) or os.getenv("TURRISHW_ROOT", "/")
+    identity.forget()  # identities detected through the previous backend, they would keep it alive
+    invalidate()
+
+
+@contextlib.contextmanager
+def record() -> typing.Iterator[fs.RecordingBackend]:
+    """Record files which are read within the block, e.g. to store minimal snapshot of the router
+
+    ```
+    with turrishw.record() as recorder:
+        turrishw.get_ifaces()
+    recorder.save("router.json.gz")
+    ```
+
+    Snapshot can be replayed by `configure_backend(fs.MemoryBackend.load("router.json.gz"))`.
+    """
+    backend, root = fs.get_backend(), utils.TURRISHW_FILE_ROOT
+    recorder = fs.RecordingBackend(backend, root)
+    configure_backend(recorder, root)  # drops caches, so everything is read again
+    try:
+        yield recorder
+    finally:
+        configure_backend(None if backend is fs.OS else backend, root)
+
+
+def collect_stats(log: bool = False) -> typing.ContextManager[stats.Stats]:
+    """Collect statistics of detection within the block: time of phases, file operations, vendor cache hits
+
+    ```
+    with turrishw.collect_stats() as detection:
+        turrishw.get_ifaces()
+    print(detection.phases, detection.io, detection.vendor_hit_rate)
+    ```
+
+    log: Log the statistics at debug level at the end of the block.
+    """
+    return stats.collect(log)
+
+
+def get_platform(refresh: bool = False) -> PlatformIdentity:
+    """Get identity of the board (model, Turris OS version, ...)
+
+    It is detected only once per process, use `refresh` to detect it again.
+    """
+    return identity.get_platform(utils.TURRISHW_FILE_ROOT, refresh)
+
+
+def get_model(refresh: bool = False) -> str:
+    return get_platform(refresh).model
+
+
+# model -> module with implementation of the board, only module of the detected board is imported
+BOARD_MODULES = {"MOX": "mox", "OMNIA": "omnia", "TURRIS1X": "turris1x", "OMNIANG": "omnia_ng"}
+
+
+def _classify_interfaces() -> typing.List[Interface]:
+    with stats.phase("model"):
+        hw_model = get_model()
+    module_name = BOARD_MODULES.get(hw_model)
+
+    if module_name is None:
         logger.warning("Unsupported model: %s", hw_model)
-        return {}
+        return []
+
+    with stats.phase(f"classify.{module_name}"):
+        model = importlib.import_module(f".{module_name}", __package__)
+        return model.classify_interfaces()
+
 
-    ifaces = model.get_interfaces()
+def _detect_interfaces() -> typing.List[Interface]:
+    with sysfs.session():
+        return utils.collect_attributes(_classify_interfaces())
+
+
+def _make_table(ifaces: typing.List[Interface], filter_types: typing.Optional[list[str]]) -> Table:
     if filter_types is not None:
         ifaces = [e for e in ifaces if e.type in filter_types]
 
@@ -44,9 +219,57 @@ def get_ifaces(filter_types: typing.Optional[list[str]] = None):
     #
     # It will be more useful for consumer of `turrishw` to get interfaces sorted in resulting dictionary
     # to avoid dealing with the possibly random order of interfaces.
-    return {
-        iface.name: {
-            k: v for k, v in asdict(iface).items() if v is not None and k not in ["name"]
-        }  # to be compatible with older API
-        for iface in sorted(ifaces, key=lambda e: e.sort_key)
-    }
+    return {iface.name: iface for iface in sorted(ifaces, key=lambda e: e.sort_key)}
+
+
+def get_topology(filter_types: typing.Optional[list[str]] = None) -> Table:
+    """Detect interfaces and return them as table (name -> Interface) sorted by name
+
+    Detection (classification of interfaces, vendor lookup, ...) is the expensive part.
+    Keep the table and use `refresh_dynamic()` to update state and link speed of interfaces.
+    """
+    return _make_table(_cache.get(_detect_interfaces), filter_types)
+
+
+def refresh_dynamic(table: Table, names: typing.Optional[typing.Iterable[str]] = None) -> Changes:
+    """Re-read only state and link speed of interfaces in table obtained from `get_topology()`
+
+    names: Refresh only these interfaces, all interfaces in table are refreshed by default.
+
+    Table is updated in place. Return changed interfaces, interfaces which disappeared
+    are removed from the table and reported as `None`.
+    """
+    changes: Changes = {}
+    with sysfs.session():
+        for name in list(table if names is None else names):
+            iface = table.get(name)
+            if iface is None:
+                continue
+            try:
+                if utils.refresh_iface_dynamic(iface):
+                    changes[name] = iface
+            except OSError:
+                del table[name]
+                changes[name] = None
+
+    return changes
+
+
+def iter_interfaces(filter_types: typing.Optional[list[str]] = None) -> typing.Iterator[Interface]:
+    """Iterate over detected interfaces sorted by name"""
+    yield from get_topology(filter_types).values()
+
+
+def get_ifaces(filter_types: typing.Optional[list[str]] = None, as_objects: bool = False):
+    """Detect interfaces, return dict interface name -> dict of its attributes
+
+    as_objects: Return `Interface` instances instead of dicts (name -> Interface).
+    """
+    return _output(get_topology(filter_types), as_objects)
+
+
+def _output(table: Table, as_objects: bool):
+    if as_objects:
+        return table
+    with stats.phase("serialize"):
+        return {name: iface.to_dict() for name, iface in table.items()}  # to be compatible with older API
@@ -0,0 +1,131 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Index of USB topology: which control devices and serial ports belong to which USB device
+
+LTE modems expose several USB interfaces (functions) of the same USB device, e.g.:
+
+```
+.../usb1/1-1/1-1:1.0/ttyUSB0/tty/ttyUSB0      serial port for AT commands
+.../usb1/1-1/1-1:1.4/net/wwan0                network interface
+.../usb1/1-1/1-1:1.4/usbmisc/cdc-wdm0         control device (QMI, MBIM, ...)
+```
+
+The index is built in a single pass over `/sys/class/usbmisc` and `/sys/class/tty`,
+so pairing network interface with its control device is a dictionary lookup.
+"""
+
+import functools
+import os
+import re
+import typing
+from dataclasses import dataclass, field
+
+from . import sysfs
+
+# USB interface directory is named <bus>-<port path>:<configuration>.<interface>, e.g. `1-1.2:1.4`
+# compiled on the first use as `USB_INTERFACE_REGEX`
+_USB_INTERFACE = r"^\d+-[\d.]+:\d+\.\d+$"
+# serial ports of modems (usb-serial drivers and CDC ACM)
+TTY_PREFIXES = ("ttyUSB", "ttyACM")
+
+
+@functools.cache
+def _usb_interface_regex() -> re.Pattern:
+    return re.compile(_USB_INTERFACE)
+
+
+def __getattr__(name: str):
+    if name == "USB_INTERFACE_REGEX":
+        return _usb_interface_regex()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _usb_interface(path: str) -> typing.Optional[str]:
+    """Get path of USB interface (function) to which device on the `path` belongs"""
+    while path and path != os.sep:
+        if _usb_interface_regex().match(os.path.basename(path)):
+            return path
+        path = os.path.dirname(path)
+    return None
+
+
+def _class_devices(root: str, class_name: str, prefixes: typing.Tuple[str, ...] = ()):
+    """Yield (name, USB interface path) of USB devices in device class, e.g. `usbmisc`"""
+    class_path = os.path.join(root, "sys/class", class_name)
+    try:
+        names = sysfs.list_links(class_path)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if prefixes and not name.startswith(prefixes):
+            continue  # skip consoles, ptys, ...
+        interface = _usb_interface(sysfs.resolve_link(os.path.join(class_path, name)))
+        if interface is not None:
+            yield name, interface
+
+
+def _natural_key(name: str) -> typing.Tuple[str, int]:
+    # ttyUSB2 < ttyUSB10
+    prefix, number = re.match(r"(\D*)(\d*)", name).groups()
+    return prefix, int(number or 0)
+
+
+@dataclass
+class UsbTopology:
+    # USB interface path -> control devices (cdc-wdmX) of the interface
+    control_devices: typing.Dict[str, typing.List[str]] = field(default_factory=dict)
+    # USB device path -> serial ports of all its interfaces
+    ttys: typing.Dict[str, typing.List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def scan(cls, root: str) -> "UsbTopology":
+        res = cls()
+        for name, interface in _class_devices(root, "usbmisc"):
+            res.control_devices.setdefault(interface, []).append(name)
+        for name, interface in _class_devices(root, "tty", TTY_PREFIXES):
+            res.ttys.setdefault(os.path.dirname(interface), []).append(name)
+        for names in res.ttys.values():
+            names.sort(key=_natural_key)
+        return res
+
+    def control_device(self, iface_path: str) -> typing.Optional[str]:
+        """Get control device (`/dev/cdc-wdmX`) of network interface on given device path"""
+        interface = _usb_interface(iface_path)
+        devices = self.control_devices.get(interface) if interface else None
+        return f"/dev/{devices[0]}" if devices else None
+
+    def serial_ports(self, iface_path: str) -> typing.List[str]:
+        """Get serial ports (`/dev/ttyUSBX`) of the USB device with network interface on given device path"""
+        interface = _usb_interface(iface_path)
+        if not interface:
+            return []
+        return [f"/dev/{e}" for e in self.ttys.get(os.path.dirname(interface), [])]
+
+
+def get_topology(root: str) -> UsbTopology:
+    """Get USB topology, it is scanned only once per `sysfs.session()`"""
+    return sysfs.session_value(f"usb:{root}", lambda: UsbTopology.scan(root))
@@ -27,14 +27,19 @@ import functools
 import logging
 import os
 import re
+import sys
 import typing
 from pathlib import Path
 
+from . import fs, identity, stats, sysfs
 from .interface import Interface, State
 
 # ENV variable is needed for blackbox testing with foris-controller
 TURRISHW_FILE_ROOT = os.getenv("TURRISHW_ROOT", "/")
-WIFI_PATH_REGEX = re.compile(r"sys/devices/platform/(.*)$")
+
+# Regular expressions (`WIFI_PATH_REGEX`, `QMI_PATH_REGEX` and `VENDOR`) are compiled on the first use
+# instead of at import time, which is noticeable for short-lived programs on Turris CPUs, see `__getattr__()`.
+_WIFI_PATH = r"sys/devices/platform/(.*)$"
 # matches mox and omnia
 QMI_OMNIA_MOX_PATH = (
     r"/sys/devices/platform/soc/soc:internal-regs"
@@ -47,29 +52,88 @@ QMI_TURRIS_PATH = (
 )
 
 # combination of above (OR)
-QMI_PATH_REGEX = re.compile(f"{QMI_TURRIS_PATH}|{QMI_OMNIA_MOX_PATH}")
+_QMI_PATH = f"{QMI_TURRIS_PATH}|{QMI_OMNIA_MOX_PATH}"
+
+# drivers of LTE modems (other than QMI, which is recognized by `qmi` directory) -> protocol
+WWAN_DRIVERS = {"qmi_wwan": "qmi", "cdc_mbim": "mbim", "huawei_cdc_ncm": "ncm"}
 
 # vendor regular expression
-VENDOR = re.compile(r"0x([0-9a-z]+)$")
+_VENDOR = r"0x([0-9a-z]+)$"
+
+_PATTERNS = {"WIFI_PATH_REGEX": _WIFI_PATH, "QMI_PATH_REGEX": _QMI_PATH, "VENDOR": _VENDOR}
 
 # vendor db path
 PCI_VENDORS_DB = "/usr/share/hwdata/pci.ids"
+# binary index of vendor db shared between processes, it is rebuilt whenever the db changes
+PCI_VENDORS_DB_INDEX = "/var/cache/turrishw/pci.ids.idx"
+
+# interfaces published for other processes, see `publish`
+PUBLISHED_IFACES = "/tmp/run/turrishw/ifaces"
+
+# Attributes of interfaces are read by pool of threads, when there are many of them (see `collect_attributes()`).
+# Parallel reading is disabled by default (0 workers), use `turrishw.configure_parallel()` to enable it.
+PARALLEL_WORKERS = 0
+PARALLEL_THRESHOLD = 32
 
 logger = logging.getLogger(__name__)
 
 
-@functools.lru_cache(200)
+@functools.cache
+def _pattern(name: str) -> re.Pattern:
+    return re.compile(_PATTERNS[name])
+
+
+def __getattr__(name: str):
+    if name in _PATTERNS:
+        return _pattern(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_vendor_from_db(ven: str) -> str:
     """Helper function for quries on file db
     containing information about PCI vendor and type"""
-    with open(PCI_VENDORS_DB, "r") as f:
-        for line in f.readlines():
-            if line.startswith(ven):
-                # the magic is because the string looks like:
-                # `<ven> <full vendor name with spaces>`
-                return line.split(" ", 1)[-1].strip() or ven
+    global _vendor_db
+    from . import pciids  # imported only when needed, most callers never look up vendors
+
+    db = pciids.load(PCI_VENDORS_DB, PCI_VENDORS_DB_INDEX)  # loaded again when pci.ids changes
+    if db is not _vendor_db:
+        _vendor_name.cache_clear()
+        _vendor_db = db
+    return _vendor_name(ven)
+
+
+# database from which are names in `_vendor_name()` cache
+_vendor_db: typing.Any = None
+
+
+@functools.lru_cache(200)
+def _vendor_name(ven: str) -> str:
     # return the hex number as fallback
-    return ven
+    return _vendor_db.vendor(ven) or ven
+
+
+def forget_vendors():
+    """Drop cached vendor names and the loaded PCI database (e.g. after `pci.ids` was updated)"""
+    global _vendor_db
+    _vendor_name.cache_clear()
+    _vendor_db = None
+    pciids = sys.modules.get(f"{__package__}.pciids")  # nothing to drop when it wasn't imported yet
+    if pciids is not None:
+        pciids.reset()
+
+
+def get_device_from_db(ven: str, dev: str) -> typing.Optional[str]:
+    """Get PCI device name from file db, e.g. ("168c", "003c")"""
+    from . import pciids
+
+    return pciids.load(PCI_VENDORS_DB, PCI_VENDORS_DB_INDEX).device(ven, dev)
+
+
+def get_subsystem_from_db(ven: str, dev: str, subven: str, subdev: str) -> typing.Optional[str]:
+    """Get PCI subsystem name from file db, e.g. ("168c", "003c", "168c", "3223")"""
+    from . import pciids
+
+    return pciids.load(PCI_VENDORS_DB, PCI_VENDORS_DB_INDEX).subsystem(ven, dev, subven, subdev)
 
 
 def inject_file_root(*paths) -> Path:
@@ -78,25 +142,60 @@ def inject_file_root(*paths) -> Path:
 
 
 def get_first_line(filename: Path) -> str:
-    with open(filename, "r") as f:
-        return f.readline()
+    return fs.get_backend().read_first_line(str(filename))
+
+
+def _net_dir(iface: str) -> sysfs.NetDir:
+    return sysfs.net_dir(str(inject_file_root("sys/class/net", iface)))
+
+
+def get_iface_device_path(iface: str) -> Path:
+    """Get absolute path of interface device, e.g. `/sys/devices/platform/.../net/eth0`"""
+    return Path(_net_dir(iface).device_path)
+
+
+def get_iface_macaddr(iface: str) -> typing.Optional[str]:
+    address = _net_dir(iface).read_optional("address")
+    return address.strip() if address is not None else None
+
+
+def read_iface_link(iface: str, attr: str) -> str:
+    """Read target of symlink in interface directory, e.g. `device/of_node`"""
+    return _net_dir(iface).readlink(attr)
 
 
 def get_iface_state(iface) -> State:
-    operstate = get_first_line(inject_file_root("sys/class/net/{}/operstate".format(iface)))
+    operstate = _net_dir(iface).read_line("operstate")
     if operstate.strip() == State.UP:
         return State.UP
     else:
         return State.DOWN
 
 
+def read_iface_dynamic(iface: str) -> typing.Tuple[State, int]:
+    """Read attributes of interface which are expected to change during its lifetime (state and link speed)"""
+    state = get_iface_state(iface)
+    speed = get_iface_speed(iface) if state == State.UP else 0
+    return state, speed
+
+
+def refresh_iface_dynamic(iface: Interface) -> bool:
+    """Update state and link speed of interface, return whether they have changed"""
+    state, speed = read_iface_dynamic(iface.name)
+    if (state, speed) == (iface.state, iface.link_speed):
+        return False
+    iface.state, iface.link_speed = state, speed
+    return True
+
+
 def get_pci_id(iface) -> typing.Optional[str]:
-    return parse_uevent(inject_file_root("sys/class/net/{}/device/uevent".format(iface))).get("PCI_ID")
+    uevent = _net_dir(iface).read_optional("device/uevent", first_line=False)
+    return parse_uevent_lines(uevent.splitlines()).get("PCI_ID") if uevent else None
 
 
 def get_iface_speed(iface):
     try:
-        speed = get_first_line(inject_file_root("sys/class/net/{}/speed".format(iface)))
+        speed = _net_dir(iface).read_line("speed")
         speed = int(speed)
         # sometimes we can get -1 from sysfs, meaning speed is not negotiated yet
         return max(speed, 0)
@@ -106,23 +205,27 @@ def get_iface_speed(iface):
 
 
 def get_iface_vendor(iface: str) -> typing.Optional[str]:
-    try:
-        # get base vendor string
-        vendor = get_first_line(inject_file_root("sys/class/net/{}/device/vendor".format(iface)))
-        # strip vendor `0x` prefix
-        vendor = VENDOR.match(vendor).groups()[0]
-        return get_vendor_from_db(vendor)
+    # get base vendor string, only PCI devices have it
+    vendor = _net_dir(iface).read_optional("device/vendor")
+    if vendor is None:
+        return None
 
+    # strip vendor `0x` prefix
+    vendor = _pattern("VENDOR").match(vendor).groups()[0]
+    try:
+        with stats.phase("vendor"):
+            return get_vendor_from_db(vendor)
     except FileNotFoundError:
+        # vendor db is not installed
         return None
 
 
-def get_iface_label(iface_path: Path) -> str:
-    """Get inteface label, e.g. lan1, by given interface path
+def get_iface_label(iface: str) -> str:
+    """Get inteface label, e.g. lan1, by given interface name
 
-    Search /sys subsystem for `<iface_path>/of_node/label`.
+    Search /sys subsystem for `/sys/class/net/<iface>/of_node/label`.
     """
-    return get_first_line(iface_path / "of_node/label").rstrip("\x00").upper()
+    return _net_dir(iface).read_line("of_node/label").rstrip("\x00").upper()
 
 
 def get_qmi_modem_device(interface_path: Path) -> typing.Optional[str]:
@@ -146,74 +249,118 @@ def get_qmi_modem_device(interface_path: Path) -> typing.Optional[str]:
     wwan0 -> cdc-wdm1
     wwan1 -> cdc-wdm0
 
+    Both have to belong to the same USB interface, see `usb.UsbTopology`.
+
     In case none device is found, return None.
     """
-    # pathlib.Path object is necessary here, so we can resolve symlink to the real path on filesystem
-    parent_dev_path = interface_path.resolve().parent.parent  # strip the 'net/wwanX' suffix
+    from . import usb  # imported only when there is a modem
+
+    return usb.get_topology(TURRISHW_FILE_ROOT).control_device(str(interface_path))
 
-    # Do lookup among usb devices and try to find the device that share the same parent with interface path.
-    # Basically the one that belongs to the same '/sys/class/.../usbX/<some_numbers>' parent.
-    usb_sys_devices_path = inject_file_root("sys/class/usbmisc")
-    for usbdev in usb_sys_devices_path.iterdir():
-        # ignore anything other that symlinks to prevent accidental reading of garbage
-        if usbdev.is_symlink():
-            usbdev_abspath = usbdev.resolve()
-            if parent_dev_path in usbdev_abspath.parents:
-                return f"/dev/{usbdev_abspath.name}"
 
-    return None
+def get_modem_control_device(interface_path: Path) -> typing.Optional[str]:
+    """Get the device used to control modem: cdc-wdm device (QMI, MBIM, ...) or the first serial port (AT commands)"""
+    from . import usb
 
+    topology = usb.get_topology(TURRISHW_FILE_ROOT)
+    control_device = topology.control_device(str(interface_path))
+    if control_device is None:
+        serial_ports = topology.serial_ports(str(interface_path))
+        control_device = serial_ports[0] if serial_ports else None
+    return control_device
 
-def find_iface_type(iface):
-    path = inject_file_root("sys/class/net", iface)
-    if path.joinpath("phy80211").is_dir():
-        return "wifi"
-    if path.joinpath("qmi").is_dir():
-        return "wwan"
-    # TODO: support other protocols of LTE modems
-    return "eth"
+
+def get_wwan_protocol(iface: str) -> typing.Optional[str]:
+    """Get protocol of LTE modem (qmi, mbim, ncm) based on its driver, `None` if the interface is not a modem"""
+    net_dir = _net_dir(iface)
+    if net_dir.has_dir("qmi"):
+        return "qmi"
+    try:
+        driver = os.path.basename(net_dir.readlink("device/driver"))
+    except OSError:
+        return None  # virtual interfaces, ...
+    return WWAN_DRIVERS.get(driver)
+
+
+def find_iface_type(iface: str) -> typing.Tuple[str, typing.Optional[str]]:
+    """Get type of interface and protocol of LTE modem (see `get_wwan_protocol()`), so it is not looked up again"""
+    net_dir = _net_dir(iface)
+    if net_dir.has_dir("phy80211"):
+        return "wifi", None
+    protocol = get_wwan_protocol(iface)
+    if protocol:
+        return "wwan", protocol
+    return "eth", None
 
 
 def get_ifaces():
-    path = inject_file_root("sys/class/net")
-    for f in path.iterdir():
-        # we only need links, not files
-        if f.is_symlink():
-            yield f.name
+    # we only need links, not files
+    yield from sysfs.list_links(str(inject_file_root("sys/class/net")))
 
 
-def get_vlan_interfaces() -> typing.List[str]:
-    """Get name of all interfaces, which has VLAN id set.
+class Vlan(typing.NamedTuple):
+    vlan_id: int
+    parent: str  # name of the interface the VLAN is on
 
-    Take a look into `/proc/net/vlan/` provided by kernel.
-    Based on the kernel documentation, there should be only only `config` and interface-like files
-    (i.e. <interface_name>.<vlan_number>) in `/proc/net/vlan`.
-    Ignore the `config` and fetch all interface-like looking files.
 
-    For instance:
+def parse_vlan_config(data: str) -> typing.Dict[str, Vlan]:
+    """Parse `/proc/net/vlan/config`, return VLAN interface name -> VLAN
 
     ```
-    # ls /proc/net/vlan/
-    config    eth2.128
+    VLAN Dev name    | VLAN ID
+    Name-Type: VLAN_NAME_TYPE_RAW_PLUS_VID_NO_PAD
+    eth2.100       | 100  | eth2
+    vlan200        | 200  | lan1
     ```
+    """
+    res = {}
+    for line in data.splitlines():
+        parts = [e.strip() for e in line.split("|")]
+        if len(parts) != 3:
+            continue  # headers
+        try:
+            res[parts[0]] = Vlan(int(parts[1]), parts[2])
+        except ValueError:
+            continue
+    return res
+
+
+def get_vlan_interfaces() -> typing.Dict[str, Vlan]:
+    """Get all interfaces, which has VLAN id set (name -> VLAN)
 
-    Please note that alternative approach could be to parse `/proc/net/vlan/config` as single source of truth,
-    to get all interfaces with VLAN id.
-    But that would mean parsing text file, which formatting could be less stable between kernel versions
-    than vlan interfaces representation on `/proc` subsystem.
+    VLANs are read from `/proc/net/vlan/config`, which has also VLANs with custom names (e.g. `vlan100` on `eth2`).
+    When it is not available (older kernels), VLANs are the interface-like files in `/proc/net/vlan`
+    (i.e. <interface_name>.<vlan_number>) and their parent and id are taken from their names:
 
-    Return list of interfaces names.
+    ```
+    # ls /proc/net/vlan/
+    config    eth2.128
+    ```
     """
 
-    path = inject_file_root("proc/net/vlan")
-    if not path.is_dir():
-        return []
+    path = str(inject_file_root("proc/net/vlan"))
+    backend = fs.get_backend()
+    if not backend.is_dir(path):
+        return {}
+
+    try:
+        vlans = parse_vlan_config(backend.read(os.path.join(path, "config")))
+    except OSError:
+        vlans = {}
+    if vlans:
+        return vlans
 
-    return [iface.name for iface in path.glob("*.*")]
+    for name in backend.glob(path, "*.*"):
+        parent, _, vlan_id = name.rpartition(".")
+        if vlan_id.isdigit():
+            vlans[name] = Vlan(int(vlan_id), parent)
+    return vlans
 
 
 def make_vlan_interfaces(
-    physical_ifaces: typing.List[Interface], virt_ifaces: typing.List[typing.Dict[str, str]]
+    physical_ifaces: typing.List[Interface],
+    virt_ifaces: typing.List[typing.Dict[str, str]],
+    vlans: typing.Dict[str, Vlan],
 ) -> typing.List[Interface]:
     """Process virtual interfaces that have VLAN ID assigned.
     Reuse its parent interface properties and fill in the differences.
@@ -223,36 +370,50 @@ def make_vlan_interfaces(
 
     physical_ifaces: Physical interfaces detected in first pass processing.
     virt_ifaces: Virtual interfaces that need to be matched to their parent interfaces.
+    vlans: VLANs from `get_vlan_interfaces()`.
+
+    Parent of VLAN can be another VLAN (QinQ, e.g. `eth2.100.200` on `eth2.100`), it is resolved recursively.
     """
     res = []
-    phy_map = {e.name: e for e in physical_ifaces}
-    for virt_iface in virt_ifaces:
-        iface_name = virt_iface["name"]
-        macaddr = virt_iface["macaddr"]
-        base_iface, vlan_id = iface_name.rsplit(".", maxsplit=1)
-        vlan_id_no = int(vlan_id)
+    built = {e.name: e for e in physical_ifaces}
+    pending = {e["name"]: e for e in virt_ifaces}
 
+    def resolve(name: str) -> typing.Optional[Interface]:
+        if name in built:
+            return built[name]
         # Parent interface (e.g. eth2) must be available and processed if we intend to reference it.
         # If we can't find the parent, ignore this interface.
-        if parent := phy_map.get(base_iface):
-            res.append(
-                iface_info(
-                    iface_name,
-                    parent.type,
-                    parent.bus,
-                    parent.slot,
-                    macaddr,
-                    vlan_id=vlan_id_no,
-                    module_id=parent.module_id,
-                )
-            )
+        virt_iface = pending.pop(name, None)  # removed before recursion, so cycles end here
+        if virt_iface is None:
+            return None
+        vlan = vlans[name]
+        parent = resolve(vlan.parent)
+        if parent is None:
+            return None
+        iface = iface_info(
+            name,
+            parent.type,
+            parent.bus,
+            parent.slot,
+            virt_iface["macaddr"],
+            vlan_id=vlan.vlan_id,
+            module_id=parent.module_id,
+        )
+        iface.parent = parent.name
+        built[name] = iface
+        res.append(iface)  # parents always precede their VLANs
+        return iface
+
+    for virt_iface in virt_ifaces:
+        resolve(virt_iface["name"])
     return res
 
 
-def get_TOS_major_version():
-    version = get_first_line(inject_file_root("etc/turris-version"))
-    parts = version.split(".")
-    return int(parts[0])
+def get_TOS_major_version() -> int:
+    version = identity.get_platform(TURRISHW_FILE_ROOT).tos_major_version
+    if version is None:
+        raise FileNotFoundError(f"Can't read Turris OS version from '{inject_file_root('etc/turris-version')}'")
+    return version
 
 
 def make_iface(
@@ -264,25 +425,46 @@ def make_iface(
     slot_path: typing.Optional[str] = None,
     parent_device_abs_path: typing.Optional[Path] = None,
     module_seq: int = 0,
+    wwan_protocol: typing.Optional[str] = None,
 ) -> typing.Optional[Interface]:
     """
     `slot_path` is optional argument, which is currently relevant only for wireless devices.
     If `slot_path` is reported by turrishw, then foris-controller can better match the present network devices
     to the uci configuration of wireless devices on Turris OS 6.0+.
 
-    `parent_device_abs_path` is optional argument, useful only for additional processing of QMI devices data
+    `parent_device_abs_path` is optional argument, useful only for additional processing of LTE modems data
     and usb devices in general.
 
     `module_id` is relevant only for Mox, fallback to 0 for other Turris models
+
+    `wwan_protocol` is protocol of LTE modem when the caller already knows it, it is looked up otherwise.
     """
     if if_type == "wifi" and slot_path:
         return iface_info(
             name, if_type, bus, port_label, macaddr, slot_path=wifi_strip_prefix(slot_path), module_id=module_seq
         )
     elif if_type == "wwan" and parent_device_abs_path:
-        qmi_control_dev_path = get_qmi_modem_device(parent_device_abs_path)
-        if not qmi_control_dev_path:
-            logger.warning(f"Failed to find qmi control device for interface '{name}', ignoring the interface.")
+        protocol = wwan_protocol or get_wwan_protocol(name)
+        if protocol == "qmi":
+            qmi_control_dev_path = get_qmi_modem_device(parent_device_abs_path)
+            if not qmi_control_dev_path:
+                logger.warning(f"Failed to find qmi control device for interface '{name}', ignoring the interface.")
+                return
+
+            return iface_info(
+                name,
+                if_type,
+                bus,
+                port_label,
+                macaddr,
+                slot_path=qmi_filter_slot_path(slot_path),
+                qmi_device=qmi_control_dev_path,
+                module_id=module_seq,
+            )
+
+        control_dev_path = get_modem_control_device(parent_device_abs_path)
+        if not control_dev_path:
+            logger.warning(f"Failed to find control device for interface '{name}', ignoring the interface.")
             return
 
         return iface_info(
@@ -292,7 +474,8 @@ def make_iface(
             port_label,
             macaddr,
             slot_path=qmi_filter_slot_path(slot_path),
-            qmi_device=qmi_control_dev_path,
+            control_device=control_dev_path,
+            wwan_protocol=protocol,
             module_id=module_seq,
         )
 
@@ -309,12 +492,10 @@ def iface_info(
     slot_path: typing.Optional[str] = None,
     qmi_device: typing.Optional[str] = None,
     module_id: int = 0,  # `module_id` is useful only for Mox, fallback to 0 for other HW
+    control_device: typing.Optional[str] = None,
+    wwan_protocol: typing.Optional[str] = None,
 ) -> Interface:
-    state = get_iface_state(iface_name)
-    iface_speed = get_iface_speed(iface_name) if state == State.UP else 0
-    vendor = get_iface_vendor(iface_name)
-    pci_id = get_pci_id(iface_name)
-
+    """Create classified interface, its attributes are read later by `read_iface_attributes()`"""
     return Interface(
         name=iface_name,
         type=if_type,
@@ -322,21 +503,94 @@ def iface_info(
         slot=port_label,
         macaddr=macaddr,
         module_id=module_id,
-        link_speed=iface_speed,
-        state=state,
         vlan_id=vlan_id,
         slot_path=slot_path,
         qmi_device=qmi_device,
-        vendor=vendor,
-        pci_id=pci_id,
+        control_device=control_device,
+        wwan_protocol=wwan_protocol,
     )
 
 
+def read_iface_attributes(iface: Interface) -> Interface:
+    """Read attributes of classified interface from sysfs (state, link speed, vendor, PCI id)"""
+    iface.state, iface.link_speed = read_iface_dynamic(iface.name)
+    iface.vendor = get_iface_vendor(iface.name)
+    iface.pci_id = get_pci_id(iface.name)
+    return iface
+
+
+def read_vlan_attributes(iface: Interface, device: Interface) -> Interface:
+    """Read attributes of VLAN, it has no device of its own, so device attributes are copied from `device`"""
+    iface.state, iface.link_speed = read_iface_dynamic(iface.name)
+    iface.vendor, iface.pci_id = device.vendor, device.pci_id
+    return iface
+
+
+def split_vlans(
+    ifaces: typing.List[Interface],
+) -> typing.Tuple[typing.List[Interface], typing.List[typing.Tuple[Interface, Interface]]]:
+    """Split classified interfaces to the interfaces with devices and VLANs paired with device they are on
+
+    Device of VLAN is found through the chain of parents, so it is the same for `eth2.100` and `eth2.100.200`.
+    """
+    by_name = {e.name: e for e in ifaces}
+    devices, vlans = [], []
+    for iface in ifaces:
+        if iface.parent is None:
+            devices.append(iface)
+            continue
+        device = iface
+        while device.parent is not None:
+            device = by_name[device.parent]
+        vlans.append((iface, device))
+    return devices, vlans
+
+
+def attribute_plan(ifaces: typing.List[Interface]) -> typing.List[typing.List[typing.Callable[[], Interface]]]:
+    """Plan of reading attributes of classified interfaces, one list of calls per stage
+
+    Stages have to be run in order, calls within stage may run concurrently. VLANs read only their state
+    and link speed, other attributes are copied from their devices, so they are read after all devices.
+    """
+    devices, vlans = split_vlans(ifaces)
+    return [
+        [functools.partial(read_iface_attributes, e) for e in devices],
+        [functools.partial(read_vlan_attributes, e, device) for e, device in vlans],
+    ]
+
+
+def collect_attributes(ifaces: typing.List[Interface]) -> typing.List[Interface]:
+    """Read attributes of all classified interfaces according to `attribute_plan()`
+
+    Attributes are read by `PARALLEL_WORKERS` threads when there are at least `PARALLEL_THRESHOLD` interfaces
+    (e.g. hundreds of VLANs). Interfaces are updated in place, so the result is the same as when read serially.
+    """
+    with stats.phase("attributes"):
+        plan = attribute_plan(ifaces)
+        workers = min(PARALLEL_WORKERS, len(ifaces))
+        if workers <= 1 or len(ifaces) < PARALLEL_THRESHOLD:
+            for stage in plan:
+                for call in stage:
+                    call()
+            return ifaces
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        # workers use the session of the caller, which may be bound only to its thread
+        run = sysfs.bound(lambda call: call())
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="turrishw") as executor:
+            for stage in plan:
+                # consume results, so the first exception is raised here
+                for _ in executor.map(run, stage):
+                    pass
+        return ifaces
+
+
 def wifi_strip_prefix(s: str) -> str:
     # Use re.search instead of re.match, because we can get various path prefixes ('/', '/tmp/pytest-of-user', ...),
     # based on environment (test vs on router).
     # Thus we are not always searching from the beginning of the string.
-    res = WIFI_PATH_REGEX.search(s)
+    res = _pattern("WIFI_PATH_REGEX").search(s)
     if not res:
         return s  # when in doubt, return the original string and let the consumer handle it
 
@@ -350,20 +604,24 @@ def qmi_filter_slot_path(s: str) -> str:
     # yet we don't necessarily need to share whole path, which is:
     #    `/sys/devices/platform/soc/soc:internal-regs/f1058000.usb/usb1/1-1/1-1:1.4/net/wwan0`
     # and we also might want to strip prefix in testing environment.
-    if res := QMI_PATH_REGEX.search(s):
+    if res := _pattern("QMI_PATH_REGEX").search(s):
         return res.group(0)
     else:
         return s
 
 
 def parse_uevent(path: Path) -> typing.Dict[str, str]:
-    if not path.exists():
+    backend = fs.get_backend()
+    if not backend.exists(str(path)):
         return {}
+    return parse_uevent_lines(backend.read(str(path)).splitlines())
+
+
+def parse_uevent_lines(lines: typing.Iterable[str]) -> typing.Dict[str, str]:
     res = {}
-    with path.open("r") as f:
-        for line in f.readlines():
-            if line := line.strip():
-                key, *val = line.split("=", 1)
-                res[key] = val[0] if val else ""
+    for line in lines:
+        if line := line.strip():
+            key, *val = line.split("=", 1)
+            res[key] = val[0] if val else ""
 
     return res
@@ -0,0 +1,294 @@
+# Copyright (c) 2025, CZ.NIC, z.s.p.o. (http://www.nic.cz/)
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#    * Neither the name of the CZ.NIC nor the
+#      names of its contributors may be used to endorse or promote products
+#      derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL CZ.NIC BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Keep table of interfaces up to date based on link notifications from kernel (rtnetlink)"""
+
+import asyncio
+import logging
+import select
+import socket
+import struct
+import time
+import typing
+from dataclasses import dataclass
+
+from . import sysfs, utils
+from .interface import Interface, State
+from .turrishw import _detect_interfaces
+
+logger = logging.getLogger(__name__)
+
+# see linux/netlink.h and linux/rtnetlink.h
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IF_OPER_UP = 6
+
+NLMSGHDR = struct.Struct("=IHHII")  # length, type, flags, seq, pid
+IFINFOMSG = struct.Struct("=BxHiII")  # family, type, index, flags, change
+RTATTR = struct.Struct("=HH")  # length, type
+
+RECV_BUFFER_SIZE = 65536
+# longest single wait for events, so `stop()` (or cancelled `events_async()`) is noticed within this time
+WAIT_SLICE = 0.5
+
+# name -> interface, `None` if the interface was removed
+Changes = typing.Dict[str, typing.Optional[Interface]]
+
+
+@dataclass
+class LinkEvent:
+    """Parsed RTM_NEWLINK/RTM_DELLINK message"""
+
+    removed: bool
+    index: int
+    name: str
+    state: typing.Optional[State] = None
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def parse_messages(data: bytes) -> typing.List[LinkEvent]:
+    """Parse link events from netlink datagram, other messages are ignored"""
+    events = []
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        msg_len, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+        if msg_len < NLMSGHDR.size or offset + msg_len > len(data):
+            logger.debug("Malformed netlink message, dropping rest of the datagram")
+            break
+
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK) and msg_len >= NLMSGHDR.size + IFINFOMSG.size:
+            _, _, index, _, _ = IFINFOMSG.unpack_from(data, offset + NLMSGHDR.size)
+            name, state = None, None
+
+            attr_offset = offset + NLMSGHDR.size + IFINFOMSG.size
+            while attr_offset + RTATTR.size <= offset + msg_len:
+                attr_len, attr_type = RTATTR.unpack_from(data, attr_offset)
+                if attr_len < RTATTR.size:
+                    break
+                payload = data[attr_offset + RTATTR.size : attr_offset + attr_len]
+                if attr_type == IFLA_IFNAME:
+                    name = payload.split(b"\x00", 1)[0].decode(errors="replace")
+                elif attr_type == IFLA_OPERSTATE and payload:
+                    state = State.UP if payload[0] == IF_OPER_UP else State.DOWN
+                attr_offset += _align(attr_len)
+
+            if name:
+                events.append(LinkEvent(msg_type == RTM_DELLINK, index, name, state))
+
+        offset += _align(msg_len)
+
+    return events
+
+
+class NetlinkSource:
+    """Netlink socket subscribed to link notifications
+
+    Any object with the same `recv()` and `close()` methods can be used as source of events for `LinkWatcher`,
+    e.g. to replay recorded messages.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        try:
+            self.sock.bind((0, RTMGRP_LINK))
+        except OSError:
+            self.sock.close()
+            raise
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def recv(self, timeout: typing.Optional[float] = None) -> typing.Optional[bytes]:
+        """Wait for next datagram, return `None` when timeout expires"""
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        if not readable:
+            return None
+        return self.sock.recv(RECV_BUFFER_SIZE)
+
+    def close(self):
+        self.sock.close()
+
+
+class LinkWatcher:
+    """Table of interfaces which is updated incrementally based on link events
+
+    Known interfaces only get their state and link speed updated.
+    Events for interfaces which were not present during the last scan (hotplugged USB modem, new VLAN, ...)
+    trigger full rescan.
+
+    Events are coalesced: after the first event, watcher keeps reading events for `coalesce` seconds
+    and applies only the last event of each interface, so flapping port is reported once per burst.
+    """
+
+    def __init__(self, source=None, coalesce: float = 0.2):
+        # subscribe before the initial scan, so no change is missed in between
+        self.source = source if source is not None else NetlinkSource()
+        self.coalesce = coalesce
+        self.interfaces: typing.Dict[str, Interface] = {}
+        self._present: typing.Set[str] = set()
+        self._callbacks: typing.List[typing.Callable[[Changes], None]] = []
+        self._running = False
+        self.rescan()
+
+    def rescan(self) -> Changes:
+        """Detect all interfaces again, return changes against the current table"""
+        # attributes of re-created (e.g. hotplugged) interfaces might not be missing anymore
+        sysfs.forget_missing()
+        self._present = set(utils.get_ifaces())
+        table = {e.name: e for e in _detect_interfaces()}
+        changes: Changes = {name: None for name in self.interfaces.keys() - table.keys()}
+        changes.update({name: iface for name, iface in table.items() if self.interfaces.get(name) != iface})
+        self.interfaces = table
+        return changes
+
+    def add_callback(self, callback: typing.Callable[[Changes], None]):
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: typing.Callable[[Changes], None]):
+        self._callbacks.remove(callback)
+
+    def poll(self, timeout: typing.Optional[float] = None) -> Changes:
+        """Wait for burst of events (up to `timeout` seconds) and apply it to the table
+
+        Return changed interfaces, empty dict when nothing has changed.
+        """
+        return self._wait(timeout) or {}
+
+    def _apply(self, events: typing.Iterable[LinkEvent]) -> Changes:
+        changes: Changes = {}
+        for event in events:
+            if event.removed:
+                self._present.discard(event.name)
+                if self.interfaces.pop(event.name, None) is not None:
+                    changes[event.name] = None
+                continue
+
+            iface = self.interfaces.get(event.name)
+            if iface is None:
+                if event.name in self._present:
+                    continue  # interface we don't care about (bridge, loopback, ...)
+                logger.debug("New interface '%s', rescanning", event.name)
+                changes.update(self.rescan())
+                continue
+
+            if event.state is None:
+                try:
+                    state, speed = utils.read_iface_dynamic(iface.name)
+                except OSError:
+                    # interface disappeared in the meantime, DELLINK should follow
+                    continue
+            else:
+                # link speed is not part of the message
+                state = event.state
+                speed = utils.get_iface_speed(iface.name) if state == State.UP else 0
+            if (state, speed) != (iface.state, iface.link_speed):
+                iface.state, iface.link_speed = state, speed
+                changes[iface.name] = iface
+
+        return changes
+
+    def events(self, timeout: typing.Optional[float] = None) -> typing.Iterator[Changes]:
+        """Yield changes of interfaces as they come
+
+        Generator ends when no event arrives within `timeout` seconds or when `stop()` is called.
+        """
+        self._running = True
+        while self._running:
+            changes = self._wait_running(timeout)
+            if changes is None:
+                return
+            if changes:
+                yield changes
+
+    async def events_async(self, timeout: typing.Optional[float] = None) -> typing.AsyncIterator[Changes]:
+        """Same as `events()`, events are awaited in the default executor, so the event loop isn't blocked
+
+        When the consumer is cancelled, the executor thread stops waiting within `WAIT_SLICE` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        self._running = True
+        try:
+            while self._running:
+                changes = await loop.run_in_executor(None, self._wait_running, timeout)
+                if changes is None:
+                    return
+                if changes:
+                    yield changes
+        finally:
+            # the executor thread may still be waiting, let it return
+            self._running = False
+
+    def _wait_running(self, timeout: typing.Optional[float]) -> typing.Optional[Changes]:
+        # `_wait()` in slices, so it ends soon after `stop()`, `None` when stopped or timeout expired
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._running:
+            remaining = WAIT_SLICE if deadline is None else max(min(WAIT_SLICE, deadline - time.monotonic()), 0)
+            changes = self._wait(remaining)
+            if changes is not None or (deadline is not None and time.monotonic() >= deadline):
+                return changes
+        return None
+
+    def _wait(self, timeout: typing.Optional[float]) -> typing.Optional[Changes]:
+        # `None` means timeout, empty dict means events without any relevant change
+        data = self.source.recv(timeout)
+        if data is None:
+            return None
+        latest: typing.Dict[str, LinkEvent] = {}
+        deadline = time.monotonic() + self.coalesce
+        while data is not None:
+            for event in parse_messages(data):
+                latest[event.name] = event
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            data = self.source.recv(remaining)
+        return self._apply(latest.values())
+
+    def run(self, timeout: typing.Optional[float] = None):
+        """Call registered callbacks for every change until `stop()` is called"""
+        for changes in self.events(timeout):
+            for callback in self._callbacks:
+                callback(changes)
+
+    def stop(self):
+        """Stop `run()` and `events()`, blocked wait for events ends within `WAIT_SLICE` seconds"""
+        self._running = False
+
+    def close(self):
+        self.stop()
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()